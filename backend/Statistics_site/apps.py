@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StatisticsSiteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Statistics_site'
+
+    def ready(self):
+        from . import signals  # noqa
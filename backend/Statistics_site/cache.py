@@ -0,0 +1,147 @@
+# Statistics_site/cache.py
+"""
+Кеш ответов /api/statistics/cert/*.
+
+Ключ: версия + эндпоинт + нормализованные query-параметры.
+Сброс — увеличением версии по сигналам (см. signals.py), поэтому
+«протухших» ответов после изменения писем/ответов/пользователей нет.
+Бэкенд задаётся алиасом CACHES["statistics"] (locmem / file / redis).
+"""
+import logging
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.utils.dateparse import parse_date
+from rest_framework.response import Response
+
+from backend import versions
+from backend.versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "statistics"
+NAMESPACE = "cert-stats"
+
+# какие параметры влияют на результат; остальные в ключ не попадают
+CACHED_PARAMS = ("year", "date_from", "date_to", "source")
+
+ENDPOINTS = []
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _normalize(name, value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    if name in ("date_from", "date_to"):
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        return parsed.isoformat() if parsed else value
+    if name == "year" and value.isdigit():
+        return str(int(value))
+    return value
+
+
+def cache_key(endpoint, query_params):
+    params = []
+    for name in CACHED_PARAMS:
+        value = _normalize(name, query_params.get(name))
+        if value is not None:
+            params.append((name, value))
+    version = get_version(NAMESPACE, alias=CACHE_ALIAS)
+    return f"{NAMESPACE}:v{version}:{endpoint}:{urlencode(params)}"
+
+
+def _count(kind, endpoint):
+    cache = _cache()
+    key = f"{NAMESPACE}:{kind}:{endpoint}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def cached_stat(endpoint):
+    """
+    Декоратор для action-ов CertStatisticsViewSet: отдаёт ответ из кеша,
+    при промахе считает и сохраняет (только успешные 200).
+    """
+    ENDPOINTS.append(endpoint)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            key = cache_key(endpoint, request.query_params)
+            data = _cache().get(key)
+            if data is not None:
+                _count("hits", endpoint)
+                response = Response(data)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _count("misses", endpoint)
+            response = func(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                _cache().set(key, response.data)
+            response["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
+
+def is_shared():
+    """Кеш виден другим процессам (не locmem)."""
+    return versions.is_shared(CACHE_ALIAS)
+
+
+def store(endpoint, query_params, data):
+    """
+    Положить готовый ответ в кеш (прогрев из фоновой задачи).
+    locmem — память процесса воркера, веб-процессы его не видят: прогрев
+    пропускается (нужен STATS_CACHE_BACKEND=file|redis). Возвращает,
+    был ли ответ сохранён.
+    """
+    if not is_shared():
+        logger.warning(
+            "Прогрев кеша %s пропущен: кеш статистики locmem не общий "
+            "для процессов (STATS_CACHE_BACKEND=file|redis)", endpoint)
+        return False
+    _cache().set(cache_key(endpoint, query_params), data)
+    return True
+
+
+def invalidate():
+    """Сбросить все закешированные ответы статистики."""
+    bump_version(NAMESPACE, alias=CACHE_ALIAS)
+
+
+def counters():
+    cache = _cache()
+    keys = [
+        f"{NAMESPACE}:{kind}:{endpoint}"
+        for endpoint in ENDPOINTS
+        for kind in ("hits", "misses")
+    ]
+    values = cache.get_many(keys)
+    endpoints = {}
+    for endpoint in ENDPOINTS:
+        hits = values.get(f"{NAMESPACE}:hits:{endpoint}", 0)
+        misses = values.get(f"{NAMESPACE}:misses:{endpoint}", 0)
+        total = hits + misses
+        endpoints[endpoint] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 3) if total else None,
+        }
+    return {
+        "backend": cache.__class__.__name__,
+        "version": get_version(NAMESPACE, alias=CACHE_ALIAS),
+        "endpoints": endpoints,
+    }
@@ -0,0 +1,197 @@
+# Statistics_site/compliance.py
+"""
+Поддержка материализованной таблицы LetterOrgCompliance.
+
+Все функции пересчитывают строки только для затронутых писем/пар,
+поэтому их можно дёргать из сигналов на каждое изменение.
+"""
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from cert_documents.models import CertLetter, CertLetterReply
+
+from .models import LetterOrgCompliance
+
+Status = LetterOrgCompliance.Status
+
+DestOrgs = CertLetter.dest_organizations.through
+
+
+def is_tracked(system, need_replies, has_deadline, deadline):
+    """Участвует ли письмо в статистике «вовремя / с опозданием / без ответа»."""
+    return system == "CERT-CBU" and need_replies and has_deadline and deadline is not None
+
+
+def classify(tracked, deadline, first_reply_date, today=None):
+    if not tracked:
+        return Status.NOT_TRACKED
+    if first_reply_date is None:
+        # ответить в день срока — ещё вовремя
+        if deadline >= (today or timezone.localdate()):
+            return Status.PENDING
+        return Status.NO_REPLY
+    if first_reply_date <= deadline:
+        return Status.ON_TIME
+    return Status.LATE
+
+
+def _first_replies(letter_ids, org_ids=None):
+    """{(letter_id, org_id): самая ранняя received_date} одним запросом."""
+    qs = CertLetterReply.objects.filter(
+        letter_id__in=letter_ids,
+        organization__isnull=False,
+        received_date__isnull=False,
+    )
+    if org_ids is not None:
+        qs = qs.filter(organization_id__in=org_ids)
+    rows = (
+        qs.values("letter_id", "organization_id")
+        .annotate(first=Min("received_date"))
+        .order_by()
+    )
+    return {(r["letter_id"], r["organization_id"]): r["first"] for r in rows}
+
+
+def _sync_letters(letters):
+    """
+    Приводит строки таблицы к актуальному состоянию для переданных писем.
+    letters — dict-ы из CertLetter.values(...).
+    """
+    letter_ids = [l["id"] for l in letters]
+    if not letter_ids:
+        return
+
+    dest = {}
+    for letter_id, org_id in (
+        DestOrgs.objects
+        .filter(certletter_id__in=letter_ids)
+        .values_list("certletter_id", "organization_id")
+    ):
+        dest.setdefault(letter_id, set()).add(org_id)
+
+    first = _first_replies(letter_ids)
+    existing = {
+        (row.letter_id, row.organization_id): row
+        for row in LetterOrgCompliance.objects.filter(letter_id__in=letter_ids)
+    }
+
+    now = timezone.now()
+    today = timezone.localdate()
+    to_create, to_update = [], []
+    for letter in letters:
+        tracked = is_tracked(
+            letter["system"], letter["need_replies"],
+            letter["has_deadline"], letter["deadline"],
+        )
+        for org_id in dest.get(letter["id"], ()):
+            key = (letter["id"], org_id)
+            first_date = first.get(key)
+            status = classify(tracked, letter["deadline"], first_date, today)
+            row = existing.pop(key, None)
+            if row is None:
+                to_create.append(LetterOrgCompliance(
+                    letter_id=letter["id"],
+                    organization_id=org_id,
+                    letter_date=letter["date"],
+                    deadline=letter["deadline"],
+                    performer_id=letter["performer_id"],
+                    first_reply_date=first_date,
+                    status=status,
+                ))
+                continue
+            if (row.letter_date, row.deadline, row.performer_id,
+                    row.first_reply_date, row.status) != (
+                letter["date"], letter["deadline"], letter["performer_id"],
+                first_date, status
+            ):
+                row.letter_date = letter["date"]
+                row.deadline = letter["deadline"]
+                row.performer_id = letter["performer_id"]
+                row.first_reply_date = first_date
+                row.status = status
+                row.updated_at = now
+                to_update.append(row)
+
+    with transaction.atomic():
+        # всё, что осталось в existing — организации, убранные из рассылки
+        if existing:
+            LetterOrgCompliance.objects.filter(
+                pk__in=[row.pk for row in existing.values()]
+            ).delete()
+        if to_create:
+            LetterOrgCompliance.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            LetterOrgCompliance.objects.bulk_update(
+                to_update,
+                ["letter_date", "deadline", "performer", "first_reply_date",
+                 "status", "updated_at"],
+                batch_size=500,
+            )
+
+
+LETTER_FIELDS = (
+    "id", "system", "date", "need_replies", "has_deadline", "deadline", "performer_id",
+)
+
+
+def sync_letter(letter_id):
+    """Пересчитать все строки одного письма (после сохранения письма / смены рассылки)."""
+    letters = list(CertLetter.objects.filter(pk=letter_id).values(*LETTER_FIELDS))
+    if not letters:
+        LetterOrgCompliance.objects.filter(letter_id=letter_id).delete()
+        return
+    _sync_letters(letters)
+
+
+def sync_pair(letter_id, org_id):
+    """Пересчитать одну пару (письмо, организация) — после изменения ответа."""
+    if not letter_id or not org_id:
+        return
+    row = (
+        LetterOrgCompliance.objects
+        .select_related("letter")
+        .filter(letter_id=letter_id, organization_id=org_id)
+        .first()
+    )
+    if row is None:
+        # организации нет в рассылке — ответ на статистику не влияет
+        return
+    letter = row.letter
+    first_date = _first_replies([letter_id], [org_id]).get((letter_id, org_id))
+    tracked = is_tracked(
+        letter.system, letter.need_replies, letter.has_deadline, letter.deadline
+    )
+    status = classify(tracked, letter.deadline, first_date)
+    if (row.first_reply_date, row.status) != (first_date, status):
+        row.first_reply_date = first_date
+        row.status = status
+        row.save(update_fields=["first_reply_date", "status", "updated_at"])
+
+
+def flip_overdue(today=None):
+    """
+    PENDING с прошедшим сроком → NO_REPLY одним UPDATE по индексу
+    (status, deadline). Возвращает число переведённых строк.
+    """
+    today = today or timezone.localdate()
+    return LetterOrgCompliance.objects.filter(
+        status=Status.PENDING, deadline__lt=today,
+    ).update(status=Status.NO_REPLY, updated_at=timezone.now())
+
+
+def rebuild_all(batch_size=1000):
+    """Полная пересборка таблицы пачками писем. Возвращает число обработанных писем."""
+    total = 0
+    batch = []
+    qs = CertLetter.objects.order_by("pk").values(*LETTER_FIELDS)
+    for letter in qs.iterator(chunk_size=batch_size):
+        batch.append(letter)
+        if len(batch) >= batch_size:
+            _sync_letters(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        _sync_letters(batch)
+        total += len(batch)
+    return total
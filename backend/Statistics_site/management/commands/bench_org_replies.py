@@ -0,0 +1,129 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cert_documents.models import CertLetter, CertLetterReply
+from organizations.models import Category, Organization
+from Statistics_site.compliance import rebuild_all
+from Statistics_site.queries import (
+    org_replies_live,
+    org_replies_materialized,
+    org_replies_python,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк статистики org-replies: засевает N писем × M организаций × K ответов "
+        "во временной транзакции (откатывается в конце) и сравнивает реализации"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--letters", type=int, default=10000)
+        parser.add_argument("--orgs", type=int, default=200)
+        parser.add_argument("--orgs-per-letter", type=int, default=5)
+        parser.add_argument("--replies", type=int, default=3,
+                            help="ответов на письмо (не больше --orgs-per-letter)")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--skip-python", action="store_true",
+                            help="не запускать старую Python-реализацию (долго на 100k+)")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        rnd = random.Random(opts["seed"])
+        with transaction.atomic():
+            self._seed(rnd, opts)
+
+            t0 = time.perf_counter()
+            rebuild_all()
+            self.stdout.write(
+                f"rebuild_compliance: {time.perf_counter() - t0:.3f}s")
+
+            impls = [("materialized", org_replies_materialized),
+                     ("live", org_replies_live)]
+            if not opts["skip_python"]:
+                impls.append(("python", org_replies_python))
+
+            results = {}
+            for name, fn in impls:
+                timings = []
+                for _ in range(opts["repeat"]):
+                    t0 = time.perf_counter()
+                    results[name] = fn()
+                    timings.append(time.perf_counter() - t0)
+                self.stdout.write(
+                    f"{name:>12}: best {min(timings):.3f}s, "
+                    f"avg {sum(timings) / len(timings):.3f}s")
+
+            reference = _by_org(results["materialized"])
+            for name, rows in results.items():
+                if _by_org(rows) != reference:
+                    self.stdout.write(self.style.ERROR(
+                        f"{name}: результат отличается от materialized"))
+
+            # ничего из засеянного не сохраняем
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Готово (данные откатены)"))
+
+    def _seed(self, rnd, opts):
+        n_letters = opts["letters"]
+        per_letter = min(opts["orgs_per_letter"], opts["orgs"])
+        n_replies = min(opts["replies"], per_letter)
+
+        cat = Category.objects.create(name="bench", slug="bench-org-replies")
+        orgs = Organization.objects.bulk_create([
+            Organization(
+                name=f"Bench org {i}", slug=f"bench-org-{i}", description="",
+                address="", lotus="", phone="", email="bench@example.com",
+                category=cat,
+            )
+            for i in range(opts["orgs"])
+        ])
+        org_ids = [o.pk for o in orgs]
+
+        start = date(2015, 1, 1)
+        through = CertLetter.dest_organizations.through
+        batch = 2000
+        t0 = time.perf_counter()
+        for offset in range(0, n_letters, batch):
+            size = min(batch, n_letters - offset)
+            letters = []
+            for _ in range(size):
+                d = start + timedelta(days=rnd.randrange(3650))
+                letters.append(CertLetter(
+                    number=f"B-{offset}", date=d, subject="bench",
+                    has_deadline=True, deadline=d + timedelta(days=10),
+                    need_replies=True,
+                ))
+            letters = CertLetter.objects.bulk_create(letters)
+
+            links, replies = [], []
+            for letter in letters:
+                dest = rnd.sample(org_ids, per_letter)
+                links.extend(
+                    through(certletter_id=letter.pk, organization_id=o)
+                    for o in dest
+                )
+                for org_id in dest[:n_replies]:
+                    replies.append(CertLetterReply(
+                        letter_id=letter.pk, organization_id=org_id,
+                        file="bench/reply.pdf",
+                        received_date=letter.date + timedelta(days=rnd.randrange(21)),
+                    ))
+            through.objects.bulk_create(links)
+            CertLetterReply.objects.bulk_create(replies)
+
+        self.stdout.write(
+            f"seed: {n_letters} писем × {per_letter} орг. (из {opts['orgs']}) × "
+            f"{n_replies} ответов — {time.perf_counter() - t0:.1f}s")
+
+
+def _by_org(rows):
+    return {
+        r["organization_id"]: (r["on_time"], r["late"], r["no_reply"], r["total_required"])
+        for r in rows
+    }
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from Statistics_site.compliance import flip_overdue
+from Statistics_site.tasks import schedule_flip
+
+
+class Command(BaseCommand):
+    help = ("Переводит обязательства с прошедшим сроком из «ожидает ответа» "
+            "в «нет ответа» (для cron или однократно)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schedule", action="store_true",
+                            help="поставить ежедневную фоновую задачу (выполняет runworker)")
+
+    def handle(self, *args, **opts):
+        if opts["schedule"]:
+            job = schedule_flip()
+            if job is None:
+                self.stdout.write("Задача уже стоит в очереди")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Задача #{job.pk} запланирована на {job.run_after:%Y-%m-%d %H:%M}"))
+            return
+
+        flipped = flip_overdue()
+        self.stdout.write(self.style.SUCCESS(f"Просрочено обязательств: {flipped}"))
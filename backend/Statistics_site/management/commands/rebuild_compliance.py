@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from Statistics_site.compliance import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Полностью пересобирает таблицу LetterOrgCompliance (письмо × организация)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        total = rebuild_all(batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Пересчитано писем: {total}"))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cert_documents', '0004_certletter_need_replies'),
+        ('organizations', '0004_organization_curator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LetterOrgCompliance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('letter_date', models.DateField()),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('first_reply_date', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('on_time', 'Ответ вовремя'), ('late', 'Ответ с опозданием'), ('no_reply', 'Нет ответа'), ('not_tracked', 'Не отслеживается')], max_length=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('letter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compliance_rows', to='cert_documents.certletter')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cert_compliance_rows', to='organizations.organization')),
+            ],
+            options={
+                'verbose_name': 'Статус ответа организации',
+                'verbose_name_plural': 'Статусы ответов организаций',
+                'indexes': [models.Index(fields=['status', 'letter_date'], name='Statistics__status_6c0d7f_idx'), models.Index(fields=['organization', 'status'], name='Statistics__organiz_d3de5f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('letter', 'organization'), name='uniq_compliance_letter_org')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """Первичное заполнение таблицы по уже существующим письмам."""
+    CertLetter = apps.get_model("cert_documents", "CertLetter")
+    CertLetterReply = apps.get_model("cert_documents", "CertLetterReply")
+    LetterOrgCompliance = apps.get_model("Statistics_site", "LetterOrgCompliance")
+
+    first = {}
+    for reply in CertLetterReply.objects.filter(
+        organization__isnull=False, received_date__isnull=False
+    ).values("letter_id", "organization_id", "received_date"):
+        key = (reply["letter_id"], reply["organization_id"])
+        if key not in first or reply["received_date"] < first[key]:
+            first[key] = reply["received_date"]
+
+    rows = []
+    for letter in CertLetter.objects.prefetch_related("dest_organizations"):
+        tracked = (
+            letter.system == "CERT-CBU" and letter.need_replies
+            and letter.has_deadline and letter.deadline is not None
+        )
+        for org in letter.dest_organizations.all():
+            first_date = first.get((letter.pk, org.pk))
+            if not tracked:
+                status = "not_tracked"
+            elif first_date is None:
+                status = "no_reply"
+            elif first_date <= letter.deadline:
+                status = "on_time"
+            else:
+                status = "late"
+            rows.append(LetterOrgCompliance(
+                letter_id=letter.pk,
+                organization_id=org.pk,
+                letter_date=letter.date,
+                deadline=letter.deadline,
+                first_reply_date=first_date,
+                status=status,
+            ))
+    LetterOrgCompliance.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Statistics_site', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
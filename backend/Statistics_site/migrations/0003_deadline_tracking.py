@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+
+def backfill(apps, schema_editor):
+    """Исполнитель письма в строки; «нет ответа» с непрошедшим сроком → pending."""
+    CertLetter = apps.get_model("cert_documents", "CertLetter")
+    LetterOrgCompliance = apps.get_model("Statistics_site", "LetterOrgCompliance")
+
+    LetterOrgCompliance.objects.update(performer_id=Subquery(
+        CertLetter.objects.filter(pk=OuterRef("letter_id")).values("performer_id")[:1]
+    ))
+    LetterOrgCompliance.objects.filter(
+        status="no_reply", deadline__gte=timezone.localdate(),
+    ).update(status="pending")
+
+
+def unfill(apps, schema_editor):
+    LetterOrgCompliance = apps.get_model("Statistics_site", "LetterOrgCompliance")
+    LetterOrgCompliance.objects.filter(status="pending").update(status="no_reply")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Statistics_site', '0002_backfill_letterorgcompliance'),
+        ('cert_documents', '0007_letter_files_storage'),
+        ('organizations', '0004_organization_curator'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='letterorgcompliance',
+            name='Statistics__organiz_d3de5f_idx',
+        ),
+        migrations.AddField(
+            model_name='letterorgcompliance',
+            name='performer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cert_compliance_rows', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='letterorgcompliance',
+            name='status',
+            field=models.CharField(choices=[('on_time', 'Ответ вовремя'), ('late', 'Ответ с опозданием'), ('pending', 'Ожидает ответа'), ('no_reply', 'Нет ответа'), ('not_tracked', 'Не отслеживается')], max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='letterorgcompliance',
+            index=models.Index(fields=['status', 'deadline'], name='Statistics__status_2be0ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='letterorgcompliance',
+            index=models.Index(fields=['organization', 'status', 'deadline'], name='Statistics__organiz_d5d541_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='letterorgcompliance',
+            index=models.Index(fields=['performer', 'status', 'deadline'], name='Statistics__perform_2515bd_idx'),
+        ),
+        migrations.RunPython(backfill, unfill),
+    ]
@@ -1,3 +1,76 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+from cert_documents.models import CertLetter
+from organizations.models import Organization
+
+
+class LetterOrgCompliance(models.Model):
+    """
+    Материализованная таблица «письмо CERT-CBU × организация-получатель».
+
+    Одна строка на каждую пару (CertLetter, dest_organizations):
+    самая ранняя дата ответа организации и итоговый статус.
+    Поддерживается инкрементально сигналами (см. signals.py),
+    полностью пересобирается командой rebuild_compliance.
+
+    Заодно это таблица обязательств по срокам: PENDING — ответа нет, срок
+    не прошёл; после срока строка переводится в NO_REPLY (flip_overdue —
+    задача compliance.flip_overdue / команда flip_overdue). Списки
+    «просрочено / срок через N дней / ожидает ответа» — диапазоны по
+    индексам (status, deadline), (organization, status, deadline),
+    (performer, status, deadline), см. DeadlineViewSet.
+    """
+    class Status(models.TextChoices):
+        ON_TIME = "on_time", "Ответ вовремя"
+        LATE = "late", "Ответ с опозданием"
+        # ответа нет, срок ещё не прошёл
+        PENDING = "pending", "Ожидает ответа"
+        NO_REPLY = "no_reply", "Нет ответа"
+        # need_replies=False или у письма нет срока — в статистике не участвует
+        NOT_TRACKED = "not_tracked", "Не отслеживается"
+
+    letter = models.ForeignKey(
+        CertLetter,
+        on_delete=models.CASCADE,
+        related_name="compliance_rows",
+    )
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="cert_compliance_rows",
+    )
+
+    # денормализованные поля письма — чтобы агрегат не делал JOIN
+    letter_date = models.DateField()
+    deadline = models.DateField(null=True, blank=True)
+    performer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="cert_compliance_rows",
+    )
+
+    first_reply_date = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Статус ответа организации"
+        verbose_name_plural = "Статусы ответов организаций"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["letter", "organization"],
+                name="uniq_compliance_letter_org",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "letter_date"]),
+            # сроки: просрочено / скоро срок — в целом и по организации/исполнителю
+            models.Index(fields=["status", "deadline"]),
+            models.Index(fields=["organization", "status", "deadline"]),
+            models.Index(fields=["performer", "status", "deadline"]),
+        ]
+
+    def __str__(self):
+        return f"{self.letter_id} × {self.organization_id}: {self.status}"
@@ -0,0 +1,177 @@
+# Statistics_site/queries.py
+"""
+Расчёт статистики «какие организации отвечают вовремя / с опозданием / не отвечают».
+"""
+from django.db.models import Count, Exists, OuterRef, Q
+
+from cert_documents.models import CertLetter, CertLetterReply
+
+from .models import LetterOrgCompliance
+
+Status = LetterOrgCompliance.Status
+
+TRACKED_STATUSES = (Status.ON_TIME, Status.LATE, Status.PENDING, Status.NO_REPLY)
+# «без ответа» в статистике — и просроченные, и ещё ожидающие (как в org_replies_live)
+UNANSWERED_STATUSES = (Status.PENDING, Status.NO_REPLY)
+
+
+def finalize_org_stats(rows):
+    """
+    Общий постпроцессинг: доля «вовремя» и сортировка по ней (по убыванию).
+    rows — итерируемое dict-ов с ключами organization_id, organization_name,
+    on_time, late, no_reply, total_required.
+    """
+    result = []
+    for item in rows:
+        item = dict(item)
+        tr = item["total_required"] or 1
+        item["on_time_ratio"] = round(item["on_time"] / tr, 3)
+        result.append(item)
+    result.sort(key=lambda x: x["on_time_ratio"], reverse=True)
+    return result
+
+
+def org_replies_materialized(date_from=None, date_to=None):
+    """Один GROUP BY по материализованной таблице LetterOrgCompliance."""
+    qs = LetterOrgCompliance.objects.filter(status__in=TRACKED_STATUSES)
+    if date_from:
+        qs = qs.filter(letter_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(letter_date__lte=date_to)
+
+    rows = (
+        qs.values("organization_id", "organization__name")
+        .annotate(
+            on_time=Count("id", filter=Q(status=Status.ON_TIME)),
+            late=Count("id", filter=Q(status=Status.LATE)),
+            no_reply=Count("id", filter=Q(status__in=UNANSWERED_STATUSES)),
+            total_required=Count("id"),
+        )
+        .order_by()
+    )
+    return finalize_org_stats(
+        {
+            "organization_id": r["organization_id"],
+            "organization_name": r["organization__name"],
+            "on_time": r["on_time"],
+            "late": r["late"],
+            "no_reply": r["no_reply"],
+            "total_required": r["total_required"],
+        }
+        for r in rows
+    )
+
+
+def org_replies_live(date_from=None, date_to=None):
+    """
+    Тот же расчёт «на лету», целиком в БД — без материализованной таблицы.
+
+    Идём по связке письмо × организация (M2M dest_organizations) и
+    считаем условные COUNT-ы по организациям. Самая ранняя дата ответа
+    <= deadline тогда и только тогда, когда есть хоть один ответ <= deadline,
+    поэтому вместо MIN(received_date) достаточно двух EXISTS по индексу
+    (letter, organization, received_date).
+    """
+    dest = CertLetter.dest_organizations.through.objects.filter(
+        certletter__system="CERT-CBU",
+        certletter__need_replies=True,
+        certletter__has_deadline=True,
+        certletter__deadline__isnull=False,
+    )
+    if date_from:
+        dest = dest.filter(certletter__date__gte=date_from)
+    if date_to:
+        dest = dest.filter(certletter__date__lte=date_to)
+
+    org_replies = CertLetterReply.objects.filter(
+        letter_id=OuterRef("certletter_id"),
+        organization_id=OuterRef("organization_id"),
+    )
+    replied_on_time = org_replies.filter(
+        received_date__lte=OuterRef("certletter__deadline"))
+
+    rows = (
+        dest.values("organization_id", "organization__name")
+        .annotate(
+            total_required=Count("id"),
+            on_time=Count("id", filter=Q(Exists(replied_on_time))),
+            no_reply=Count("id", filter=~Q(Exists(org_replies))),
+        )
+        .order_by()
+    )
+    return finalize_org_stats(
+        {
+            "organization_id": r["organization_id"],
+            "organization_name": r["organization__name"],
+            "on_time": r["on_time"],
+            "late": r["total_required"] - r["on_time"] - r["no_reply"],
+            "no_reply": r["no_reply"],
+            "total_required": r["total_required"],
+        }
+        for r in rows
+    )
+
+
+def org_replies_python(date_from=None, date_to=None):
+    """
+    Старая реализация (цикл письмо × организация × ответ в Python).
+    Оставлена только для сравнения в команде bench_org_replies.
+    """
+    letters_qs = CertLetter.objects.filter(
+        system="CERT-CBU",
+        need_replies=True,
+    ).prefetch_related(
+        "dest_organizations",
+        "replies__organization",
+    )
+    if date_from:
+        letters_qs = letters_qs.filter(date__gte=date_from)
+    if date_to:
+        letters_qs = letters_qs.filter(date__lte=date_to)
+
+    stats = {}
+    for letter in letters_qs:
+        if not letter.has_deadline or not letter.deadline:
+            continue
+        deadline = letter.deadline
+        replies = list(letter.replies.all())
+        for org in letter.dest_organizations.all():
+            item = stats.setdefault(org.id, {
+                "organization_id": org.id,
+                "organization_name": getattr(org, "name", str(org)),
+                "on_time": 0,
+                "late": 0,
+                "no_reply": 0,
+                "total_required": 0,
+            })
+            item["total_required"] += 1
+            org_replies = [
+                r for r in replies
+                if r.organization_id == org.id and r.received_date
+            ]
+            if not org_replies:
+                item["no_reply"] += 1
+                continue
+            earliest = min(r.received_date for r in org_replies)
+            if earliest <= deadline:
+                item["on_time"] += 1
+            else:
+                item["late"] += 1
+    return finalize_org_stats(stats.values())
+
+
+def org_replies(date_from=None, date_to=None, source=None):
+    """source=live — по письмам/ответам, иначе — по материализованной LetterOrgCompliance."""
+    if source == "live":
+        return org_replies_live(date_from, date_to)
+    return org_replies_materialized(date_from, date_to)
+
+
+ORG_REPLIES_HEADER = ["ID организации", "Организация", "Вовремя", "С опозданием",
+                      "Без ответа", "Всего", "Доля вовремя"]
+
+
+def org_replies_export_rows(results):
+    for r in results:
+        yield [r["organization_id"], r["organization_name"], r["on_time"], r["late"],
+               r["no_reply"], r["total_required"], r["on_time_ratio"]]
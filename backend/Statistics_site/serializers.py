@@ -0,0 +1,34 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import LetterOrgCompliance
+
+
+class DeadlineSerializer(serializers.ModelSerializer):
+    """Обязательство «письмо × организация» по сроку ответа."""
+    letter_number = serializers.CharField(source="letter.number", read_only=True)
+    letter_subject = serializers.CharField(source="letter.subject", read_only=True)
+    organization_name = serializers.CharField(source="organization.name", read_only=True)
+    performer_name = serializers.SerializerMethodField()
+    # >0 — дней до срока, 0 — срок сегодня, <0 — дней просрочки
+    days_left = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LetterOrgCompliance
+        fields = [
+            "id", "letter", "letter_number", "letter_subject", "letter_date",
+            "organization", "organization_name", "performer", "performer_name",
+            "deadline", "days_left", "status",
+        ]
+
+    def get_performer_name(self, obj):
+        user = obj.performer
+        if user is None:
+            return None
+        return user.get_full_name() or user.username
+
+    def get_days_left(self, obj):
+        if obj.deadline is None:
+            return None
+        today = self.context.get("today") or timezone.localdate()
+        return (obj.deadline - today).days
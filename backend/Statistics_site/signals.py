@@ -0,0 +1,103 @@
+# Statistics_site/signals.py
+"""
+Инкрементальное обновление LetterOrgCompliance:
+  - сохранение письма        → пересчёт всех строк письма (срок, need_replies, дата)
+  - изменение рассылки (M2M) → добавление/удаление строк
+  - ответ создан/изменён/удалён → пересчёт пары (письмо, организация)
+
+И сброс кеша ответов статистики при любых изменениях исходных данных.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from cert_documents.models import CertLetter, CertLetterReply
+from organizations.models import Organization
+
+from . import cache as stats_cache
+from . import compliance
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=CertLetter)
+def compliance_letter_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    compliance.sync_letter(instance.pk)
+
+
+@receiver(m2m_changed, sender=CertLetter.dest_organizations.through)
+def compliance_dest_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # letter.dest_organizations.add/remove/clear/set
+        if action in ("post_add", "post_remove", "post_clear"):
+            compliance.sync_letter(instance.pk)
+        return
+
+    # organization.cert_letters.add/remove/clear — pk_set содержит id писем
+    if action == "pre_clear":
+        instance._compliance_cleared_letters = list(
+            instance.cert_letters.values_list("pk", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        for letter_id in pk_set or ():
+            compliance.sync_letter(letter_id)
+    elif action == "post_clear":
+        for letter_id in getattr(instance, "_compliance_cleared_letters", ()):
+            compliance.sync_letter(letter_id)
+
+
+@receiver(pre_save, sender=CertLetterReply)
+def compliance_reply_remember_target(sender, instance, raw=False, **kwargs):
+    # запомним старую пару, если ответ «переезжает» на другое письмо/организацию
+    instance._compliance_old_pair = None
+    if raw or not instance.pk:
+        return
+    old = (
+        CertLetterReply.objects
+        .filter(pk=instance.pk)
+        .values_list("letter_id", "organization_id")
+        .first()
+    )
+    if old and old != (instance.letter_id, instance.organization_id):
+        instance._compliance_old_pair = old
+
+
+@receiver(post_save, sender=CertLetterReply)
+def compliance_reply_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_pair = getattr(instance, "_compliance_old_pair", None)
+    if old_pair:
+        compliance.sync_pair(*old_pair)
+    compliance.sync_pair(instance.letter_id, instance.organization_id)
+
+
+@receiver(post_delete, sender=CertLetterReply)
+def compliance_reply_deleted(sender, instance, **kwargs):
+    compliance.sync_pair(instance.letter_id, instance.organization_id)
+
+
+# ---- сброс кеша статистики ----
+
+def _invalidate_stats_cache(sender, action=None, update_fields=None, **kwargs):
+    if action is not None and not action.startswith("post_"):
+        return
+    # вход в систему обновляет только last_login — на статистику не влияет
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    # после коммита: иначе параллельный запрос успеет закешировать старые данные
+    transaction.on_commit(stats_cache.invalidate)
+
+
+for _model in (CertLetter, CertLetterReply, User, Organization):
+    post_save.connect(_invalidate_stats_cache, sender=_model,
+                      dispatch_uid=f"stats_cache_save_{_model._meta.label}")
+    post_delete.connect(_invalidate_stats_cache, sender=_model,
+                        dispatch_uid=f"stats_cache_delete_{_model._meta.label}")
+
+m2m_changed.connect(_invalidate_stats_cache,
+                    sender=CertLetter.dest_organizations.through,
+                    dispatch_uid="stats_cache_dest_orgs")
@@ -0,0 +1,72 @@
+# Statistics_site/tasks.py
+from datetime import timedelta
+
+from django.utils import timezone
+
+from backend.export import CONTENT_TYPES, export_chunks, stamped_filename
+from jobs.registry import task
+
+from . import cache as stats_cache
+from . import compliance
+from .queries import ORG_REPLIES_HEADER, org_replies, org_replies_export_rows
+
+
+@task("stats.org_replies", public=True)
+def org_replies_stats(job, date_from=None, date_to=None, source=None, export_format=None):
+    """
+    Статистика ответов организаций за произвольный период (хоть за все годы).
+    Без export_format — результат в job.result и прогрев кеша org-replies
+    (только при общем кеше статистики — file/redis, см. cache.store);
+    с export_format=csv|xlsx — файл в job.result_file.
+    """
+    params = {"date_from": date_from, "date_to": date_to, "source": source}
+    job.set_progress(message="расчёт")
+    results = org_replies(date_from, date_to, source)
+
+    if export_format:
+        if export_format not in CONTENT_TYPES:
+            raise ValueError(f"Неизвестный формат выгрузки: {export_format}")
+        job.save_result_file(
+            stamped_filename("org-replies", export_format),
+            export_chunks(ORG_REPLIES_HEADER, org_replies_export_rows(results), export_format),
+        )
+        return {"rows": len(results), "format": export_format}
+
+    # следующий GET org-replies с теми же параметрами возьмёт ответ из кеша
+    # (если он общий с веб-процессами)
+    stats_cache.store("org-replies", params, {"results": results})
+    return {"results": results}
+
+
+FLIP_TASK = "compliance.flip_overdue"
+
+
+def next_flip_at(now=None):
+    """Начало следующих местных суток (+1 мин) — когда истекают сроки «вчера»."""
+    local = timezone.localtime(now)
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + timedelta(days=1, minutes=1)
+
+
+def schedule_flip(run_after=None):
+    """Поставить flip_overdue в очередь, если там его ещё нет."""
+    from jobs.models import Job
+    from jobs.queue import submit
+
+    if Job.objects.filter(task=FLIP_TASK, status=Job.Status.PENDING).exists():
+        return None
+    return submit(FLIP_TASK, run_after=run_after or next_flip_at())
+
+
+@task(FLIP_TASK)
+def flip_overdue_task(job, reschedule=True):
+    """
+    Ежедневно: PENDING с прошедшим сроком → NO_REPLY. Задача сама ставит
+    следующий запуск на начало следующих суток (первый — командой
+    flip_overdue --schedule).
+    """
+    # статистика org-replies считает PENDING и NO_REPLY вместе — кеш не сбрасываем
+    flipped = compliance.flip_overdue()
+    if reschedule:
+        schedule_flip()
+    return {"flipped": flipped}
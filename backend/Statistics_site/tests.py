@@ -1,3 +1,54 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cert_documents.models import CertLetter
+from organizations.models import Category, Organization
+
+User = get_user_model()
+
+
+class DeadlineFilterTests(TestCase):
+    """?organization= / ?performer= — id; не число — 400, а не 500."""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        cls.user = User.objects.create_user("performer", password="x")
+        category = Category.objects.create(name="Банки", slug="banki")
+        cls.orgs = [
+            Organization.objects.create(
+                name=f"Банк {n}", slug=f"bank-{n}", description="", address="",
+                lotus="", phone="", email=f"bank{n}@example.com", category=category)
+            for n in (1, 2)
+        ]
+        letter = CertLetter.objects.create(
+            number="1", subject="Запрос", date=today - timedelta(days=30),
+            need_replies=True, has_deadline=True, deadline=today - timedelta(days=1),
+            performer=cls.user)
+        letter.dest_organizations.set(cls.orgs)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path, **params):
+        return self.client.get(f"/api/statistics/deadlines/{path}/", params)
+
+    def test_filters(self):
+        self.assertEqual(self.get("overdue").data["count"], 2)
+        self.assertEqual(self.get("overdue", organization=self.orgs[0].pk).data["count"], 1)
+        self.assertEqual(self.get("overdue", performer=self.user.pk).data["count"], 2)
+        self.assertEqual(self.get("overdue", performer=self.user.pk + 1).data["count"], 0)
+        self.assertEqual(self.get("overdue", organization="").data["count"], 2)
 
-# Create your tests here.
+    def test_invalid_ids(self):
+        for name in ("organization", "performer"):
+            for value in ("abc", "1.5", "0", "-1", str(2 ** 64)):
+                for path in ("overdue", "pending", "summary"):
+                    response = self.get(path, **{name: value})
+                    self.assertEqual(response.status_code, 400, (path, name, value))
+                    self.assertIn(name, response.data)
@@ -1,8 +1,9 @@
 # Statistics_site/urls.py
 from rest_framework.routers import DefaultRouter
-from .views import CertStatisticsViewSet
+from .views import CertStatisticsViewSet, DeadlineViewSet
 
 router = DefaultRouter()
 router.register("cert", CertStatisticsViewSet, basename="cert-statistics")
+router.register("deadlines", DeadlineViewSet, basename="deadlines")
 
 urlpatterns = router.urls
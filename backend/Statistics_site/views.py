@@ -1,16 +1,29 @@
 # Statistics_site/views.py
-from collections import defaultdict
-from datetime import date
+from datetime import timedelta
 
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.db.models import Count, Min, Q
 from django.db.models.functions import TruncMonth
+from django.utils import timezone
 
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from cert_documents.models import CertLetter, CertLetterReply
+from backend.export import export_format, export_response, is_async
+from cert_documents.models import CertLetter
+
+from . import cache as stats_cache
+from .cache import cached_stat
+from .models import LetterOrgCompliance
+from .queries import (
+    ORG_REPLIES_HEADER,
+    UNANSWERED_STATUSES,
+    org_replies,
+    org_replies_export_rows,
+)
+from .serializers import DeadlineSerializer
 
 User = get_user_model()
 
@@ -19,11 +32,13 @@ class CertStatisticsViewSet(viewsets.ViewSet):
     """
     Статистика по письмам CERT-CBU и работе организаций.
     Все методы только на чтение.
+    Ответы кешируются (см. cache.py) и сбрасываются сигналами при изменениях.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     # 1) Кол-во писем CERT-CBU по месяцам
     @action(detail=False, methods=["get"], url_path="letters-by-month")
+    @cached_stat("letters-by-month")
     def letters_by_month(self, request):
         """
         GET /api/statistics/cert/letters-by-month/?year=2025
@@ -68,6 +83,7 @@ class CertStatisticsViewSet(viewsets.ViewSet):
 
     # 2) Кол-во сотрудников CERT-CBU
     @action(detail=False, methods=["get"], url_path="employees-count")
+    @cached_stat("employees-count")
     def employees_count(self, request):
         """
         GET /api/statistics/cert/employees-count/
@@ -91,9 +107,15 @@ class CertStatisticsViewSet(viewsets.ViewSet):
 
     # 3) Статистика: какие организации отвечают вовремя / с опозданием / не отвечают
     @action(detail=False, methods=["get"], url_path="org-replies")
+    @cached_stat("org-replies")
     def org_replies_stats(self, request):
         """
         GET /api/statistics/cert/org-replies/?date_from=2025-01-01&date_to=2025-12-31
+        Опционально:
+          - source=live: считать напрямую по письмам/ответам (SQL-агрегат),
+            а не по материализованной таблице
+          - async=1: посчитать фоновой задачей (ответ 202 с задачей,
+            результат — в /api/jobs/<id>/ и в кеше этого эндпоинта)
 
         Считает по организациям:
           - сколько писем с обязательным ответом (need_replies=True)
@@ -101,85 +123,190 @@ class CertStatisticsViewSet(viewsets.ViewSet):
               * вовремя (до/включая deadline)
               * с опозданием (после deadline)
               * без ответа
-        Письма с need_replies=False НЕ учитываются.
+        Письма с need_replies=False НЕ учитываются,
+        как и письма без срока (has_deadline/deadline).
         """
-        date_from = request.query_params.get("date_from")
-        date_to = request.query_params.get("date_to")
-
-        letters_qs = CertLetter.objects.filter(
-            system="CERT-CBU",
-            need_replies=True,          # 🔹 учитываем только письма, где нужны ответы
-        ).prefetch_related(
-            "dest_organizations",
-            "replies__organization",
-        )
-
-        if date_from:
-            letters_qs = letters_qs.filter(date__gte=date_from)
-        if date_to:
-            letters_qs = letters_qs.filter(date__lte=date_to)
-
-        stats = {}  # org_id -> данные
-
-        for letter in letters_qs:
-            # Для "во время / не во время" логично учитывать только письма со сроком
-            if not letter.has_deadline or not letter.deadline:
-                # Если хочешь, можно добавить сюда отдельную логику,
-                # например считать просто "ответил / не ответил без срока".
-                continue
-
-            deadline = letter.deadline
-
-            # Все организации, которым отправлено это письмо
-            dest_orgs = list(letter.dest_organizations.all())
+        if is_async(request):
+            return self._submit_org_replies(request)
+        return Response({"results": self._org_replies(request)})
+
+    @staticmethod
+    def _org_replies_params(request):
+        return {
+            name: request.query_params.get(name)
+            for name in ("date_from", "date_to", "source")
+            if request.query_params.get(name)
+        }
+
+    def _org_replies(self, request):
+        # по умолчанию — по материализованной таблице LetterOrgCompliance
+        # (одна строка на письмо × организацию, обновляется сигналами)
+        return org_replies(**self._org_replies_params(request))
+
+    def _submit_org_replies(self, request, **params):
+        from jobs.queue import submit
+        from jobs.views import job_accepted
+
+        job = submit("stats.org_replies",
+                     {**self._org_replies_params(request), **params}, user=request.user)
+        return job_accepted(job, request)
+
+    # 3a) То же — файлом
+    @action(detail=False, methods=["get"], url_path="org-replies/export")
+    def org_replies_export(self, request):
+        """
+        GET /api/statistics/cert/org-replies/export/?export_format=csv|xlsx
+        Параметры — как у org-replies (в т.ч. async=1).
+        """
+        fmt = export_format(request)
+        if is_async(request):
+            return self._submit_org_replies(request, export_format=fmt)
+        rows = org_replies_export_rows(self._org_replies(request))
+        return export_response("org-replies", ORG_REPLIES_HEADER, rows, fmt)
+
+    # 4) Счётчики попаданий/промахов кеша статистики
+    @action(detail=False, methods=["get"], url_path="cache-stats")
+    def cache_stats(self, request):
+        """
+        GET /api/statistics/cert/cache-stats/
+        """
+        return Response(stats_cache.counters())
 
-            # Все ответы по этому письму (один или несколько от разных орг)
-            replies = list(letter.replies.all())
 
-            for org in dest_orgs:
-                org_id = org.id
-                if not org_id:
-                    continue
+def _int_param(request, name, default, minimum=0, maximum=365):
+    raw = request.query_params.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValidationError({name: "Ожидается целое число"})
+    if not minimum <= value <= maximum:
+        raise ValidationError({name: f"Допустимо от {minimum} до {maximum}"})
+    return value
 
-                if org_id not in stats:
-                    stats[org_id] = {
-                        "organization_id": org_id,
-                        "organization_name": getattr(org, "name", str(org)),
-                        "on_time": 0,      # ответ вовремя
-                        "late": 0,         # ответ с опозданием
-                        "no_reply": 0,     # нет ответа
-                        "total_required": 0,   # всего писем, по которым нужен ответ
-                    }
 
-                stats[org_id]["total_required"] += 1
+# верхняя граница BIGINT: больше — ошибка драйвера БД, а не пустой список
+MAX_ID = 2 ** 63 - 1
 
-                # ответы именно этой организации на данное письмо
-                org_replies = [
-                    r for r in replies
-                    if r.organization_id == org_id and r.received_date
-                ]
 
-                if not org_replies:
-                    stats[org_id]["no_reply"] += 1
-                    continue
+def _id_param(request, name):
+    """id для фильтра (None — не задан); не число — 400."""
+    return _int_param(request, name, None, minimum=1, maximum=MAX_ID)
 
-                # берём самую раннюю дату получения ответа
-                earliest = min(r.received_date for r in org_replies)
 
-                if earliest <= deadline:
-                    stats[org_id]["on_time"] += 1
-                else:
-                    stats[org_id]["late"] += 1
+class DeadlineViewSet(viewsets.GenericViewSet):
+    """
+    Сроки ответов организаций на письма CERT-CBU (по LetterOrgCompliance):
 
-        # Переводим в список
-        result = list(stats.values())
+      GET /api/statistics/deadlines/overdue/            срок прошёл, ответа нет
+      GET /api/statistics/deadlines/due-soon/?days=3    срок сегодня … через N дней
+      GET /api/statistics/deadlines/pending/            ждём ответа (срок не прошёл)
+      GET /api/statistics/deadlines/summary/?by=organization|performer
+                                                        счётчики по организациям/исполнителям
 
-        # Можно отсортировать, например, по доле вовремя
-        # (on_time / total_required) в убывающем порядке
-        for item in result:
-            tr = item["total_required"] or 1
-            item["on_time_ratio"] = round(item["on_time"] / tr, 3)
+    Фильтры списков: ?organization=<id>, ?performer=<id>, ?mine=1 (исполнитель — я).
+    Каждый список — диапазон по индексу (status, deadline) или, с фильтром,
+    (organization|performer, status, deadline); сортировка по сроку.
+    """
+    serializer_class = DeadlineSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # ?cursor= — keyset-пагинация в порядке индексов
+    keyset_ordering = ("deadline", "id")
+
+    def get_queryset(self):
+        qs = LetterOrgCompliance.objects.all()
+        organization = _id_param(self.request, "organization")
+        if organization is not None:
+            qs = qs.filter(organization_id=organization)
+        if self.request.query_params.get("mine") in ("1", "true"):
+            qs = qs.filter(performer=self.request.user)
+        else:
+            performer = _id_param(self.request, "performer")
+            if performer is not None:
+                qs = qs.filter(performer_id=performer)
+        return qs
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["today"] = timezone.localdate()
+        return context
+
+    def _list(self, qs):
+        qs = (
+            qs.select_related("letter", "organization", "performer")
+            .only("letter__number", "letter__subject", "organization__name",
+                  "performer__username", "performer__first_name", "performer__last_name",
+                  "letter_date", "deadline", "status")
+            .order_by("deadline", "id")
+        )
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(qs, many=True).data)
+
+    def _overdue(self):
+        # NO_REPLY, а также PENDING, если flip_overdue ещё не отработал сегодня
+        return self.get_queryset().filter(
+            status__in=UNANSWERED_STATUSES, deadline__lt=timezone.localdate(),
+        )
 
-        result.sort(key=lambda x: x["on_time_ratio"], reverse=True)
+    def _pending(self):
+        return self.get_queryset().filter(
+            status=LetterOrgCompliance.Status.PENDING,
+            deadline__gte=timezone.localdate(),
+        )
 
-        return Response({"results": result})
+    @action(detail=False, methods=["get"], url_path="overdue")
+    def overdue(self, request):
+        return self._list(self._overdue())
+
+    @action(detail=False, methods=["get"], url_path="due-soon")
+    def due_soon(self, request):
+        days = _int_param(request, "days", 3)
+        until = timezone.localdate() + timedelta(days=days)
+        return self._list(self._pending().filter(deadline__lte=until))
+
+    @action(detail=False, methods=["get"], url_path="pending")
+    def pending(self, request):
+        return self._list(self._pending())
+
+    @action(detail=False, methods=["get"], url_path="summary")
+    def summary(self, request):
+        by = request.query_params.get("by") or "organization"
+        if by == "organization":
+            group = ("organization_id", "organization__name")
+        elif by == "performer":
+            group = ("performer_id", "performer__username")
+        else:
+            raise ValidationError({"by": "Ожидается organization или performer"})
+
+        days = _int_param(request, "days", 3)
+        Status = LetterOrgCompliance.Status
+        today = timezone.localdate()
+        overdue = Q(deadline__lt=today)
+        pending = Q(status=Status.PENDING, deadline__gte=today)
+        rows = (
+            self.get_queryset()
+            .filter(status__in=UNANSWERED_STATUSES)
+            .values(*group)
+            .annotate(
+                overdue=Count("id", filter=overdue),
+                pending=Count("id", filter=pending),
+                due_soon=Count("id", filter=pending & Q(
+                    deadline__lte=today + timedelta(days=days))),
+                nearest_deadline=Min("deadline", filter=pending),
+            )
+            .order_by("-overdue", group[1])
+        )
+        return Response({"results": [
+            {
+                by: r[group[0]],
+                f"{by}_name": r[group[1]],
+                "overdue": r["overdue"],
+                "pending": r["pending"],
+                "due_soon": r["due_soon"],
+                "nearest_deadline": r["nearest_deadline"],
+            }
+            for r in rows
+        ]})
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class BackendConfig(AppConfig):
+    name = 'backend'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .db import configure_connection
+
+        # PRAGMA SQLite (WAL, busy_timeout, ...) на каждое новое соединение
+        connection_created.connect(configure_connection, dispatch_uid="backend.db")
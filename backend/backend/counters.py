@@ -0,0 +1,300 @@
+# backend/counters.py
+"""
+Денормализованные счётчики «родитель → число детей»
+(Category.objects_count, StaffProfile.curated_orgs_count, ...).
+
+Счётчик — колонка у родителя. Меняется атомарно одним
+UPDATE ... SET n = n ± k (F-выражение) в той же транзакции, что и запись
+ребёнка: сигналами на save/delete (в т.ч. queryset.delete() и каскадное
+удаление — они шлют post_delete по каждой строке), а для bulk_create —
+через CountedQuerySet или явный вызов bulk_created; после bulk_update,
+менявшего родителя, — bulk_moved. Чтение — без JOIN и COUNT.
+
+Счётчик может учитывать не всех детей, а только подходящих под when
+(поддерживаются lookup-и exact и isnull), например кураторства
+организаций: when={"organization__isnull": False}. Смена родителя или
+условия (retarget) — это -1 у прежнего и +1 у нового.
+
+Дневной счётчик («создано сегодня») хранит ещё и дату, к которой
+относится число: на другой день он читается как 0 (daily_value), а
+первый инкремент нового дня начинает отсчёт с 1.
+
+Изменения в обход сигналов (queryset.update, сырой SQL) и ручные правки
+чинит reconcile — команда reconcile_counters.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import models, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+COUNTERS = []
+
+
+@dataclass(frozen=True)
+class Counter:
+    parent: type
+    child: type
+    # FK ребёнка на родителя
+    fk: str
+    # колонка-счётчик у родителя
+    field: str
+    # дневной счётчик: (колонка-число, колонка-дата у родителя,
+    #                   поле даты создания у ребёнка)
+    daily: tuple = None
+    # учитывать только детей под условием {lookup: значение}
+    when: dict = None
+
+    @property
+    def name(self):
+        return f"{self.parent._meta.label}.{self.field}"
+
+    @property
+    def fk_attname(self):
+        return self.child._meta.get_field(self.fk).attname
+
+    def _conditions(self):
+        for lookup, expected in (self.when or {}).items():
+            name, _, kind = lookup.partition("__")
+            yield self.child._meta.get_field(name).attname, kind or "exact", expected
+
+    @property
+    def attnames(self):
+        """Поля ребёнка, от которых зависит вклад в счётчик."""
+        return {self.fk_attname, *(attname for attname, _, _ in self._conditions())}
+
+    def parent_of(self, values):
+        """
+        id родителя, в чей счётчик входит ребёнок (None — не входит).
+        values — объект или dict {attname: значение}.
+        """
+        get = values.get if isinstance(values, dict) else (
+            lambda name: getattr(values, name))
+        for attname, kind, expected in self._conditions():
+            value = get(attname)
+            if kind == "isnull":
+                if (value is None) != expected:
+                    return None
+            elif kind == "exact":
+                if value != expected:
+                    return None
+            else:
+                raise ValueError(f"Неподдерживаемый lookup в when: {kind}")
+        return get(self.fk_attname)
+
+
+def daily_value(count, day):
+    """Значение дневного счётчика на сегодня."""
+    return count if day == timezone.localdate() else 0
+
+
+def _created_today(counter, obj, today):
+    if not counter.daily:
+        return False
+    value = getattr(obj, counter.daily[2], None)
+    if value is None:
+        return False
+    if hasattr(value, "date"):
+        value = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value == today
+
+
+def _plus(field, delta):
+    return Greatest(F(field) + delta, Value(0), output_field=IntegerField())
+
+
+def add(counter, parent_id, delta, today_delta=0, today=None):
+    """
+    Один UPDATE: общий счётчик += delta, дневной += today_delta.
+    В минус счётчики не уходят (если значение уже разъехалось).
+    """
+    if parent_id is None or not (delta or today_delta):
+        return
+    values = {}
+    if delta:
+        values[counter.field] = _plus(counter.field, delta)
+    if counter.daily and today_delta:
+        count_field, date_field, _ = counter.daily
+        today = today or timezone.localdate()
+        current = When(**{date_field: today}, then=_plus(count_field, today_delta))
+        if today_delta > 0:
+            values[count_field] = Case(
+                current, default=Value(today_delta), output_field=IntegerField())
+            values[date_field] = today
+        else:
+            # счётчик за другой день и так читается как 0
+            values[count_field] = Case(
+                current, default=F(count_field), output_field=IntegerField())
+    counter.parent._default_manager.filter(pk=parent_id).update(**values)
+
+
+def _apply(counter, deltas, today):
+    for parent_id, (delta, today_delta) in deltas.items():
+        add(counter, parent_id, delta, today_delta, today)
+
+
+def _counters_for(model):
+    return [c for c in COUNTERS if c.child is model]
+
+
+def bulk_created(model, objs):
+    """После bulk_create: по одному UPDATE на затронутого родителя."""
+    today = timezone.localdate()
+    for counter in _counters_for(model):
+        deltas = defaultdict(lambda: [0, 0])
+        for obj in objs:
+            entry = deltas[counter.parent_of(obj)]
+            entry[0] += 1
+            entry[1] += _created_today(counter, obj, today)
+        deltas.pop(None, None)
+        _apply(counter, deltas, today)
+
+
+def bulk_moved(model, objs, old_values):
+    """
+    После bulk_update, менявшего FK на родителя (или поля из when).
+    old_values — {pk: {attname: прежнее значение}}; неуказанные поля не менялись.
+    """
+    today = timezone.localdate()
+    for counter in _counters_for(model):
+        deltas = defaultdict(lambda: [0, 0])
+        for obj in objs:
+            new = counter.parent_of(obj)
+            previous = {name: getattr(obj, name) for name in counter.attnames}
+            previous.update(old_values.get(obj.pk, {}))
+            old = counter.parent_of(previous)
+            if old == new:
+                continue
+            is_today = _created_today(counter, obj, today)
+            deltas[old][0] -= 1
+            deltas[old][1] -= is_today
+            deltas[new][0] += 1
+            deltas[new][1] += is_today
+        deltas.pop(None, None)
+        _apply(counter, deltas, today)
+
+
+class CountedQuerySet(models.QuerySet):
+    """
+    QuerySet, у которого и bulk_create ведёт счётчики (сигналов он не шлёт).
+    С ignore_conflicts / update_conflicts неизвестно, какие строки
+    вставились, — затронутые родители пересчитываются точно (recount).
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+            for counter in _counters_for(self.model):
+                recount(counter, {counter.parent_of(obj) for obj in objs} - {None})
+        else:
+            bulk_created(self.model, objs)
+        return objs
+
+
+# ---- сигналы ----
+
+def _remember_parent(sender, instance, raw=False, **kwargs):
+    instance._counter_old_parents = {}
+    if raw or instance.pk is None:
+        return
+    counters = _counters_for(sender)
+    old = (
+        sender._default_manager.filter(pk=instance.pk)
+        .values(*set().union(*(c.attnames for c in counters)))
+        .first()
+    )
+    if old:
+        instance._counter_old_parents = old
+
+
+def _child_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    today = timezone.localdate()
+    old_parents = getattr(instance, "_counter_old_parents", {})
+    for counter in _counters_for(sender):
+        new = counter.parent_of(instance)
+        is_today = int(_created_today(counter, instance, today))
+        if created:
+            add(counter, new, 1, is_today, today)
+            continue
+        old = counter.parent_of(old_parents) if old_parents else new
+        if old != new:
+            add(counter, old, -1, -is_today, today)
+            add(counter, new, 1, is_today, today)
+
+
+def _child_deleted(sender, instance, **kwargs):
+    today = timezone.localdate()
+    for counter in _counters_for(sender):
+        is_today = int(_created_today(counter, instance, today))
+        add(counter, counter.parent_of(instance), -1, -is_today, today)
+
+
+def register(counter):
+    """Подключить счётчик (вызывается из AppConfig.ready приложения-родителя)."""
+    if any(c.name == counter.name for c in COUNTERS):
+        return
+    COUNTERS.append(counter)
+    uid = f"counters:{counter.child._meta.label}"
+    pre_save.connect(_remember_parent, sender=counter.child, dispatch_uid=uid)
+    post_save.connect(_child_saved, sender=counter.child, dispatch_uid=uid)
+    post_delete.connect(_child_deleted, sender=counter.child, dispatch_uid=uid)
+
+
+# ---- сверка ----
+
+def reconcile(counter, batch_size=500, parent_ids=None):
+    """
+    Пересчитывает счётчик одним GROUP BY по детям и записывает только
+    разъехавшиеся значения (bulk_update). parent_ids — только этих родителей.
+    Возвращает число исправленных строк.
+    """
+    fk = counter.fk_attname
+    children = counter.child._default_manager.filter(**(counter.when or {})).order_by()
+    parents = counter.parent._default_manager.all()
+    if parent_ids is not None:
+        children = children.filter(**{f"{fk}__in": parent_ids})
+        parents = parents.filter(pk__in=parent_ids)
+    actual = dict(
+        children.values(fk).annotate(n=Count("pk")).values_list(fk, "n")
+    )
+    fields = [counter.field]
+    actual_today = {}
+    today = timezone.localdate()
+    if counter.daily:
+        count_field, date_field, created_field = counter.daily
+        fields += [count_field, date_field]
+        actual_today = dict(
+            children.filter(**{f"{created_field}__date": today})
+            .values(fk).annotate(n=Count("pk")).values_list(fk, "n")
+        )
+
+    drifted = []
+    for parent in parents.only("pk", *fields).iterator():
+        changed = False
+        total = actual.get(parent.pk, 0)
+        if getattr(parent, counter.field) != total:
+            setattr(parent, counter.field, total)
+            changed = True
+        if counter.daily:
+            stored = daily_value(getattr(parent, count_field), getattr(parent, date_field))
+            if stored != actual_today.get(parent.pk, 0):
+                setattr(parent, count_field, actual_today.get(parent.pk, 0))
+                setattr(parent, date_field, today)
+                changed = True
+        if changed:
+            drifted.append(parent)
+
+    with transaction.atomic():
+        counter.parent._default_manager.bulk_update(drifted, fields, batch_size=batch_size)
+    return len(drifted)
+
+
+def recount(counter, parent_ids):
+    """Точный пересчёт счётчика у указанных родителей."""
+    if parent_ids:
+        reconcile(counter, parent_ids=list(parent_ids))
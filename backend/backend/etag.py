@@ -0,0 +1,118 @@
+# backend/etag.py
+"""
+Условные GET-запросы (ETag / If-None-Match) для списков.
+
+Версия коллекции = счётчик, который увеличивается сигналами при изменении
+самой модели и всего, что попадает во вложенные поля ответа (ответы,
+файлы, категории...), плюс MAX(updated) и COUNT(*) по отфильтрованному
+queryset — на случай массовых .update(), которые сигналы не шлют.
+Если клиент прислал тот же ETag, отвечаем 304 до сериализации.
+
+Версии лежат в кеше default. На locmem (по умолчанию) каждый процесс
+видит только свои увеличения версии, и под gunicorn другие воркеры
+отдавали бы 304 на устаревшие вложенные данные, — поэтому без общего
+кеша (CACHE_BACKEND=file|redis) ETag-и выключены.
+"""
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versions import bump_version, get_version, is_shared
+
+
+def _namespace(name):
+    return f"etag:{name}"
+
+
+def collection_version(name):
+    return get_version(_namespace(name))
+
+
+def bump_collection(name):
+    bump_version(_namespace(name))
+
+
+def track_collection(name, models=(), m2m=()):
+    """
+    Подписывает коллекцию name на изменения моделей (save/delete)
+    и M2M-связей (through-модели). Вызывать из AppConfig.ready().
+    """
+    def handler(sender, action=None, update_fields=None, **kwargs):
+        if action is not None and not action.startswith("post_"):
+            return
+        # вход пользователя меняет только last_login
+        if update_fields is not None and set(update_fields) == {"last_login"}:
+            return
+        # после коммита: иначе параллельный GET посчитает новый ETag
+        # по ещё старым строкам и будет отдавать 304 на устаревшие данные
+        transaction.on_commit(lambda: bump_collection(name))
+
+    for model in models:
+        post_save.connect(handler, sender=model, weak=False,
+                          dispatch_uid=f"etag_save_{name}_{model}")
+        post_delete.connect(handler, sender=model, weak=False,
+                            dispatch_uid=f"etag_delete_{name}_{model}")
+    for through in m2m:
+        m2m_changed.connect(handler, sender=through, weak=False,
+                            dispatch_uid=f"etag_m2m_{name}_{through}")
+
+
+def _etag_matches(etag, header):
+    # слабое сравнение (RFC 9110): W/"x" совпадает с "x"
+    for candidate in parse_etags(header):
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ConditionalListMixin:
+    """
+    Миксин для ViewSet-ов со списком:
+
+        class CertLetterViewSet(ConditionalListMixin, viewsets.ModelViewSet):
+            etag_collection = "cert-letters"
+            etag_updated_field = "updated_at"
+    """
+    etag_collection = None
+    etag_updated_field = None
+
+    def get_list_etag(self, queryset):
+        """ETag списка; None — версии коллекций не общие для процессов."""
+        if not is_shared():
+            return None
+        agg = {"count": Count("pk")}
+        if self.etag_updated_field:
+            agg["last"] = Max(self.etag_updated_field)
+        values = queryset.order_by().aggregate(**agg)
+
+        user = self.request.user
+        raw = "|".join(str(part) for part in (
+            collection_version(self.etag_collection),
+            values.get("last"),
+            values["count"],
+            # разные фильтры/страницы — разные представления
+            self.request.get_full_path(),
+            # ответ может зависеть от пользователя (права и т.п.)
+            user.pk if user and user.is_authenticated else "",
+            self.request.accepted_renderer.format,
+        ))
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.get_list_etag(queryset)
+        if etag is None:
+            return super().list(request, *args, **kwargs)
+
+        if _etag_matches(etag, request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED,
+                            headers={"ETag": etag})
+
+        response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
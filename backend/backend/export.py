@@ -0,0 +1,359 @@
+# backend/export.py
+"""
+Потоковая выгрузка списков в CSV / XLSX.
+
+Строки берутся проекцией values_list(...).iterator(chunk_size=...) и сразу
+уходят клиенту через StreamingHttpResponse — память не растёт с размером
+выборки. XLSX собирается вручную (SpreadsheetML, строки inlineStr) и
+пишется в zip по мере чтения строк, без сторонних библиотек.
+
+Формат — параметр ?export_format=csv|xlsx (имя ?format= занято DRF).
+С ?async=1 (если у ViewSet задан export_task) выгрузка ставится фоновой
+задачей (jobs): ответ 202, файл потом забирается через /api/jobs/<id>/download/.
+"""
+import csv
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+FORMAT_PARAM = "export_format"
+ASYNC_PARAM = "async"
+CSV = "csv"
+XLSX = "xlsx"
+CONTENT_TYPES = {
+    CSV: "text/csv; charset=utf-8",
+    XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+CHUNK_SIZE = 2000
+# сколько строк копить перед отправкой очередного куска ответа
+FLUSH_ROWS = 500
+# Excel с русской локалью ждёт «;» как разделитель
+CSV_DELIMITER = ";"
+
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# с этих символов Excel/LibreOffice начинают формулу (CSV/formula injection):
+# такой текст выгружается с апострофом впереди
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@dataclass(frozen=True)
+class Column:
+    """Колонка выгрузки: заголовок, поля для values_list и (опц.) формат значения."""
+    title: str
+    lookups: tuple
+    render: object = None
+
+    def value(self, values):
+        if self.render is not None:
+            return self.render(*values)
+        return values[0]
+
+
+def column(title, *lookups, render=None):
+    return Column(title, lookups, render)
+
+
+def export_format(request):
+    fmt = (request.query_params.get(FORMAT_PARAM) or CSV).lower()
+    if fmt not in CONTENT_TYPES:
+        raise ValidationError({FORMAT_PARAM: f"Ожидается {CSV} или {XLSX}"})
+    return fmt
+
+
+def queryset_rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Строки выгрузки из queryset: один SELECT нужных полей, чтение курсором."""
+    lookups = list(dict.fromkeys(l for c in columns for l in c.lookups))
+    positions = [[lookups.index(l) for l in c.lookups] for c in columns]
+    for values in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+        yield [
+            c.value([values[i] for i in pos]) for c, pos in zip(columns, positions)
+        ]
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "да" if value else "нет"
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return _safe_text(value)
+    return str(value)
+
+
+def _safe_text(text):
+    """Строка, которую табличный редактор не примет за формулу."""
+    if text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+class _Echo:
+    """Файлоподобный объект для csv.writer: write() просто возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(header, rows):
+    writer = csv.writer(_Echo(), delimiter=CSV_DELIMITER)
+    # BOM — чтобы Excel распознал UTF-8
+    yield ("\ufeff" + writer.writerow(header)).encode("utf-8")
+    for chunk in chunked(rows, FLUSH_ROWS):
+        yield "".join(
+            writer.writerow([_text(v) for v in row]) for row in chunk
+        ).encode("utf-8")
+
+
+# ---- XLSX ----
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+class _Sink:
+    """Приёмник для zipfile без seek/tell: накопленные байты забираются drain()."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell(ref, value):
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub("", _text(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(number, letters, values):
+    cells = "".join(_cell(f"{letter}{number}", v) for letter, v in zip(letters, values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def xlsx_chunks(header, rows, sheet="Export"):
+    sink = _Sink()
+    letters = [_column_letter(i) for i in range(len(header))]
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content.replace("{sheet}", escape(sheet)))
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as fh:
+            fh.write((_SHEET_HEAD + _row(1, letters, header)).encode("utf-8"))
+            number = 1
+            for chunk in chunked(rows, FLUSH_ROWS):
+                parts = []
+                for values in chunk:
+                    number += 1
+                    parts.append(_row(number, letters, values))
+                fh.write("".join(parts).encode("utf-8"))
+                data = sink.drain()
+                if data:
+                    yield data
+            fh.write(_SHEET_TAIL.encode("utf-8"))
+    yield sink.drain()
+
+
+def export_chunks(header, rows, fmt):
+    return xlsx_chunks(header, rows) if fmt == XLSX else csv_chunks(header, rows)
+
+
+def stamped_filename(filename, fmt):
+    return f"{filename}-{timezone.localdate().isoformat()}.{fmt}"
+
+
+def export_response(filename, header, rows, fmt):
+    response = StreamingHttpResponse(
+        export_chunks(header, rows, fmt), content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = (
+        f'attachment; filename="{stamped_filename(filename, fmt)}"')
+    return response
+
+
+# ---- фоновая выгрузка (jobs) ----
+
+# параметры, не влияющие на выборку
+_SKIP_PARAMS = {ASYNC_PARAM, FORMAT_PARAM, "format", "page", "page_size", "cursor", "fields"}
+
+
+def is_async(request):
+    return request.query_params.get(ASYNC_PARAM) in ("1", "true")
+
+
+def query_params_for_job(request):
+    """Query-параметры запроса в JSON-виде для Job.params: [[имя, [значения]], ...]."""
+    return [
+        [name, values] for name, values in request.query_params.lists()
+        if name not in _SKIP_PARAMS
+    ]
+
+
+def build_view(viewset_class, user, query=(), action="export"):
+    """
+    Экземпляр ViewSet с синтетическим GET-запросом — чтобы вне HTTP
+    (в воркере) получить ту же выборку: фильтры, поиск, права пользователя.
+    """
+    from django.contrib.auth.models import AnonymousUser
+    from django.http import HttpRequest, QueryDict
+    from rest_framework.request import Request
+
+    http = HttpRequest()
+    http.method = "GET"
+    http.GET = QueryDict(mutable=True)
+    for name, values in query or ():
+        http.GET.setlist(name, list(values))
+    request = Request(http)
+    request.user = user or AnonymousUser()
+
+    view = viewset_class()
+    view.action_map = {"get": action}
+    view.action = action
+    view.args, view.kwargs = (), {}
+    view.format_kwarg = None
+    view.request = request
+    view.headers = {}
+    return view
+
+
+def _with_progress(job, rows, total):
+    done = 0
+    for chunk in chunked(rows, CHUNK_SIZE):
+        yield from chunk
+        done += len(chunk)
+        job.set_progress(done, total, f"строк: {done}")
+
+
+def export_job(job, viewset_class, query=None, export_format=CSV):
+    """Тело задачи-выгрузки: пишет файл в job.result_file, возвращает число строк."""
+    if export_format not in CONTENT_TYPES:
+        raise ValueError(f"Неизвестный формат выгрузки: {export_format}")
+    view = build_view(viewset_class, job.created_by, query)
+    queryset = view.get_export_queryset()
+    total = queryset.count()
+    rows = _with_progress(job, view.get_export_rows(queryset), total)
+    job.save_result_file(
+        stamped_filename(view.export_filename, export_format),
+        export_chunks(view.get_export_header(), rows, export_format),
+    )
+    return {"rows": total, "format": export_format}
+
+
+class ExportMixin:
+    """
+    Миксин для ViewSet: GET <list>/export/?export_format=csv|xlsx — выгрузка
+    всей отфильтрованной выборки (те же фильтры, поиск и сортировка, что у
+    списка, без пагинации).
+
+        export_columns = (column("Номер", "number"), column("Дата", "date"))
+        export_filename = "cert-letters"
+        export_task = "cert.letters_export"   # для ?async=1 (см. export_job)
+    """
+    export_columns = ()
+    export_filename = "export"
+    export_chunk_size = CHUNK_SIZE
+    export_task = None
+
+    def get_export_queryset(self):
+        # нужна только проекция values_list — prefetch-и сериализатора не нужны
+        return self.filter_queryset(self.get_queryset()).prefetch_related(None)
+
+    def get_export_header(self):
+        return [c.title for c in self.export_columns]
+
+    def get_export_rows(self, queryset):
+        return queryset_rows(queryset, self.export_columns, self.export_chunk_size)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request, *args, **kwargs):
+        fmt = export_format(request)
+        if self.export_task and is_async(request):
+            from jobs.queue import submit
+            from jobs.views import job_accepted
+
+            job = submit(self.export_task, {
+                "query": query_params_for_job(request), "export_format": fmt,
+            }, user=request.user)
+            return job_accepted(job, request)
+        rows = self.get_export_rows(self.get_export_queryset())
+        return export_response(self.export_filename, self.get_export_header(), rows, fmt)
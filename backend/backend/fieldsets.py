@@ -0,0 +1,112 @@
+# backend/fieldsets.py
+"""
+Разреженные наборы полей для тяжёлых сериализаторов:
+
+    ?fields=id,name,date      — только перечисленные поля
+    ?expand=files,replies     — плюс перечисленные вложенные (тяжёлые) поля
+    ?expand=                  — все обычные поля, без вложенных
+
+Без параметров ответ прежний (все поля). Тяжёлые поля сериализатор
+перечисляет в Meta.expandable_fields. ViewSet с SparseQuerysetMixin
+подключает prefetch_related / select_related только для реально
+запрошенных полей — пропущенные связи не читаются из БД вовсе.
+Работает только для GET (ответы на запись всегда полные).
+"""
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+# поля, которые отдаются всегда
+ALWAYS = ("id",)
+
+
+def _param_list(request, name):
+    if name not in request.query_params:
+        return None
+    values = []
+    for raw in request.query_params.getlist(name):
+        values.extend(v.strip() for v in raw.split(",") if v.strip())
+    return values
+
+
+def selected_fields(request, field_names, expandable=()):
+    """
+    Множество полей для вывода или None — «все поля».
+    field_names — все поля сериализатора, expandable — тяжёлые из них.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = _param_list(request, FIELDS_PARAM)
+    expand = _param_list(request, EXPAND_PARAM)
+    if fields is None and expand is None:
+        return None
+
+    expandable = set(expandable)
+    if fields is None:
+        chosen = {name for name in field_names if name not in expandable}
+    else:
+        chosen = set(fields)
+    if expand:
+        chosen |= set(expand) & expandable
+    chosen.update(ALWAYS)
+    return chosen & set(field_names)
+
+
+class SparseFieldsMixin:
+    """
+    Миксин для ModelSerializer: отбрасывает незапрошенные поля
+    (только у сериализатора верхнего уровня, вложенные не трогаются).
+
+        class Meta:
+            expandable_fields = ("files", "replies")
+    """
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, ListSerializer) and parent.parent is None)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_top_level():
+            return fields
+        keep = selected_fields(
+            self.context.get("request"), fields.keys(),
+            getattr(self.Meta, "expandable_fields", ()),
+        )
+        if keep is None:
+            return fields
+        # write_only-поля в ответ не попадают, а для записи нужны — оставляем
+        return {
+            name: field for name, field in fields.items()
+            if name in keep or field.write_only
+        }
+
+
+class SparseQuerysetMixin:
+    """
+    Миксин для ViewSet: связи подгружаются только под запрошенные поля.
+
+        field_prefetches = {"files": ("files",)}
+        field_select_related = {"performer_name": ("performer",)}
+    """
+    field_prefetches = {}
+    field_select_related = {}
+
+    def get_serialized_fields(self):
+        # имена полей после отбора SparseFieldsMixin (по ?fields= / ?expand=)
+        return set(self.get_serializer().fields.keys())
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if not (self.field_prefetches or self.field_select_related):
+            return qs
+        fields = self.get_serialized_fields()
+        for name, lookups in self.field_select_related.items():
+            if name in fields:
+                qs = qs.select_related(*lookups)
+        for name, lookups in self.field_prefetches.items():
+            if name in fields:
+                qs = qs.prefetch_related(*lookups)
+        return qs
@@ -0,0 +1,141 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from backend.db import SQLITE_DEFAULT_PRAGMAS, sqlite_pragmas
+
+TABLE = "db_loadtest_write"
+
+
+class Command(BaseCommand):
+    help = ("Нагрузочный тест записи: N потоков параллельно пишут короткие "
+            "транзакции (как загрузки файлов и аудит). Для SQLite сравнивает "
+            "PRAGMA по умолчанию и настроенные (WAL и т.д.) на временных файлах БД")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--transactions", type=int, default=200,
+                            help="транзакций на поток")
+        parser.add_argument("--rows", type=int, default=3,
+                            help="INSERT в одной транзакции")
+        parser.add_argument("--payload", type=int, default=512,
+                            help="размер строки, байт")
+        parser.add_argument("--profile", choices=["both", "default", "tuned"],
+                            default="both", help="только для SQLite")
+
+    def handle(self, *args, **opts):
+        if opts["threads"] < 1 or opts["transactions"] < 1:
+            raise CommandError("--threads и --transactions должны быть > 0")
+        vendor = connections[DEFAULT_DB_ALIAS].vendor
+        if vendor != "sqlite":
+            # рабочая БД: временная таблица, после теста удаляется
+            self._report(vendor, self._run(DEFAULT_DB_ALIAS, opts))
+            return
+
+        profiles = {
+            "default": SQLITE_DEFAULT_PRAGMAS,
+            # временные файлы — WAL включаем независимо от DB_NAME
+            "tuned": sqlite_pragmas(wal=True) or SQLITE_DEFAULT_PRAGMAS,
+        }
+        if opts["profile"] != "both":
+            profiles = {opts["profile"]: profiles[opts["profile"]]}
+        with tempfile.TemporaryDirectory(prefix="db_loadtest_") as tmp:
+            for name, pragmas in profiles.items():
+                alias = self._sqlite_alias(name, pragmas, os.path.join(tmp, f"{name}.sqlite3"))
+                try:
+                    self._report(f"sqlite {name} ({self._describe(pragmas)})",
+                                 self._run(alias, opts))
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+
+    def _sqlite_alias(self, name, pragmas, path):
+        config = dict(connections.settings[DEFAULT_DB_ALIAS], NAME=path, PRAGMAS=pragmas)
+        options = dict(config.get("OPTIONS", {}))
+        if name == "default":
+            # как было до настройки: таймаут sqlite3 по умолчанию, BEGIN DEFERRED
+            options = {"timeout": pragmas["busy_timeout"] / 1000}
+        config["OPTIONS"] = options
+        alias = f"loadtest_{name}"
+        connections.settings[alias] = connections.configure_settings(
+            {DEFAULT_DB_ALIAS: config})[DEFAULT_DB_ALIAS]
+        return alias
+
+    @staticmethod
+    def _describe(pragmas):
+        return ", ".join(f"{k}={v}" for k, v in pragmas.items())
+
+    def _run(self, alias, opts):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cursor.execute(
+                f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, "
+                f"worker INTEGER NOT NULL, payload TEXT NOT NULL)"
+                if connections[alias].vendor == "sqlite" else
+                f"CREATE TABLE {TABLE} (id BIGSERIAL PRIMARY KEY, "
+                f"worker INTEGER NOT NULL, payload TEXT NOT NULL)"
+            )
+        payload = "x" * opts["payload"]
+        latencies, errors = [], []
+        lock = threading.Lock()
+        start = threading.Barrier(opts["threads"])
+
+        def worker(number):
+            connection = connections[alias]
+            mine, failed = [], 0
+            try:
+                connection.ensure_connection()
+                start.wait()
+                for _ in range(opts["transactions"]):
+                    began = time.perf_counter()
+                    try:
+                        with transaction.atomic(using=alias), connection.cursor() as cursor:
+                            for _ in range(opts["rows"]):
+                                cursor.execute(
+                                    f"INSERT INTO {TABLE} (worker, payload) VALUES (%s, %s)",
+                                    [number, payload])
+                    except OperationalError:
+                        # «database is locked» — не дождались блокировки
+                        failed += 1
+                        continue
+                    mine.append(time.perf_counter() - began)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(mine)
+                    errors.append(failed)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(opts["threads"])]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+            rows = cursor.fetchone()[0]
+            cursor.execute(f"DROP TABLE {TABLE}")
+        return {"elapsed": elapsed, "latencies": latencies,
+                "errors": sum(errors), "rows": rows}
+
+    def _report(self, title, result):
+        latencies = sorted(result["latencies"])
+        done = len(latencies)
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(
+            f"  транзакций: {done}, ошибок блокировки: {result['errors']}, "
+            f"строк: {result['rows']}, время: {result['elapsed']:.2f} с")
+        if not done:
+            return
+        p95 = latencies[min(done - 1, int(done * 0.95))]
+        self.stdout.write(
+            f"  {done / result['elapsed']:.0f} транзакций/с; задержка мс: "
+            f"p50 {statistics.median(latencies) * 1000:.1f}, "
+            f"p95 {p95 * 1000:.1f}, max {latencies[-1] * 1000:.1f}")
@@ -0,0 +1,151 @@
+# backend/pagination.py
+"""
+Пагинация API.
+
+По умолчанию — обычные страницы (?page=N, COUNT(*) + OFFSET), как раньше.
+Если view задаёт keyset_ordering, а в запросе есть ?cursor= (можно пустой —
+первая страница), включается keyset-режим: WHERE (date, id) < (:date, :id)
+ORDER BY date DESC, id DESC LIMIT N — без COUNT и OFFSET, время не растёт
+с глубиной. Под каждый keyset_ordering заведён составной индекс.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPaginator:
+    """
+    Keyset-пагинация по составному упорядочиванию, например ("-date", "-id").
+    Последнее поле должно быть уникальным (обычно id).
+    Курсор — base64(JSON): значения ключа последней/первой строки и направление.
+    """
+    invalid_cursor_message = "Неверный курсор."
+
+    def __init__(self, ordering, page_size, cursor_query_param="cursor"):
+        self.ordering = tuple(ordering)
+        self.fields = [o.lstrip("-") for o in self.ordering]
+        self.descending = [o.startswith("-") for o in self.ordering]
+        self.page_size = page_size
+        self.cursor_query_param = cursor_query_param
+
+    # ---- курсор ----
+    def _encode(self, obj, reverse):
+        values = []
+        for name in self.fields:
+            value = getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        raw = json.dumps({"v": values, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode(self, token, model):
+        if not token:
+            return None, False
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_values = data["v"]
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, raw_values)
+            ]
+            return values, bool(data.get("r"))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    # ---- условие «после позиции» ----
+    def _after(self, values, reverse):
+        """(f1, f2, ...) строго после values в порядке выдачи (или до — при reverse)."""
+        condition = Q()
+        for i, (name, desc) in enumerate(zip(self.fields, self.descending)):
+            # для DESC «дальше» — меньше; при движении назад — наоборот
+            lookup = "lt" if desc != reverse else "gt"
+            step = Q(**{f"{name}__{lookup}": values[i]})
+            for prev_name, prev_value in zip(self.fields[:i], values[:i]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        # ограничение по первому полю — чтобы планировщик взял range scan по индексу
+        first_lookup = "lte" if self.descending[0] != reverse else "gte"
+        return Q(**{f"{self.fields[0]}__{first_lookup}": values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        values, reverse = self._decode(
+            request.query_params.get(self.cursor_query_param), queryset.model)
+
+        if reverse:
+            order = [o[1:] if o.startswith("-") else f"-{o}" for o in self.ordering]
+        else:
+            order = list(self.ordering)
+        queryset = queryset.order_by(*order)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+
+        self.first, self.last = (rows[0], rows[-1]) if rows else (None, None)
+        self.page = rows
+        return rows
+
+    def _link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self._encode(obj, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self._link(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self._link(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+
+class HybridPagination(PageNumberPagination):
+    """
+    Номера страниц по умолчанию; keyset-режим по ?cursor=, если у view есть
+    keyset_ordering (кортеж полей, как в Meta.ordering).
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, "keyset_ordering", None)
+        self.keyset = None
+        if ordering and self.cursor_query_param in request.query_params:
+            self.keyset = KeysetPaginator(
+                ordering, self.get_page_size(request), self.cursor_query_param)
+            return self.keyset.paginate_queryset(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,6 +1,9 @@
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from backend.db import database_from_env
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-^+h9s!q#4_mjim(t+)fe2uh-mupyt8ti6*mvdd!4*!$=(9+xej'
@@ -29,7 +32,13 @@ INSTALLED_APPS = [
     'organizationsStaff',
     'external_letters',
     'cert_documents',
-    'Statistics_site'
+    'Statistics_site',
+    'letter_search',
+    'letter_files',
+    'directory_import',
+    'jobs',
+    # общие модули проекта: настройка соединений БД, db_loadtest
+    'backend.apps.BackendConfig',
 ]
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -43,7 +52,8 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # ?page=N как раньше; ?cursor= — keyset-режим там, где у view есть keyset_ordering
+    "DEFAULT_PAGINATION_CLASS": "backend.pagination.HybridPagination",
     "PAGE_SIZE": 20,
 }
 MIDDLEWARE = [
@@ -67,6 +77,20 @@ CORS_ALLOW_HEADERS = [
     "authorization",
     "content-type",
     "x-csrftoken",
+    "if-none-match",
+    "if-modified-since",
+    "if-range",
+    "range",
+    # загрузка по частям (letter_files)
+    "content-range",
+]
+# чтобы фронт мог прочитать ETag для условных запросов и заголовки файлов
+CORS_EXPOSE_HEADERS = [
+    "etag",
+    "last-modified",
+    "accept-ranges",
+    "content-range",
+    "content-disposition",
 ]
 
 # Для CSRF проверки с другого origin:
@@ -94,11 +118,49 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+# База данных (подробно — backend/db.py).
+# DB_ENGINE: sqlite (по умолчанию, dev) | postgres
+# sqlite: busy_timeout/mmap (DB_SQLITE_BUSY_MS, DB_SQLITE_MMAP_MB;
+#   DB_SQLITE_TUNING=0 — без настройки); WAL + synchronous=NORMAL — только
+#   при явном DB_NAME (db.sqlite3 из репозитория не переписывается)
+# postgres: DATABASE_URL или DB_NAME/DB_USER/DB_PASSWORD/DB_HOST/DB_PORT;
+#   DB_CONN_MAX_AGE (сек), DB_CONN_HEALTH_CHECKS, DB_POOL=1 — пул psycopg
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': database_from_env(BASE_DIR),
+}
+
+# Кеши.
+# <PREFIX>_BACKEND: locmem (по умолчанию, для тестов/dev) | file | redis
+# <PREFIX>_LOCATION: каталог для file, URL для redis (redis://127.0.0.1:6379/1)
+# При нескольких процессах (gunicorn) нужен общий бэкенд — file или redis:
+# на нём лежат счётчики версий для сброса кешей и ETag-ов (backend/versions.py).
+# На locmem ETag-и списков выключены (версии не видны другим процессам).
+_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+
+
+def _cache_from_env(prefix, name, redis_db, timeout):
+    backend = os.environ.get(f"{prefix}_BACKEND", "locmem")
+    default_location = {
+        "locmem": name,
+        "file": str(BASE_DIR / "cache" / name),
+        "redis": f"redis://127.0.0.1:6379/{redis_db}",
+    }[backend]
+    return {
+        "BACKEND": _CACHE_BACKENDS[backend],
+        "LOCATION": os.environ.get(f"{prefix}_LOCATION", default_location),
+        "TIMEOUT": int(os.environ.get(f"{prefix}_TIMEOUT", timeout)),
     }
+
+
+CACHES = {
+    "default": _cache_from_env("CACHE", "default", 0, 300),
+    # ответы /api/statistics/cert/*: сброс идёт по сигналам, TTL — лишь страховка;
+    # прогрев из фоновой задачи (?async=1) работает только с file/redis
+    "statistics": _cache_from_env("STATS_CACHE", "statistics", 1, 3600),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,6 +194,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Загрузка файлов по частям (letter_files): .part-файлы лежат в
+# CHUNKED_UPLOAD_DIR (по умолчанию MEDIA_ROOT/chunked_uploads — та же ФС,
+# чтобы готовый файл переносился переименованием)
+CHUNKED_UPLOAD_MAX_CHUNK = 16 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 1024 * 1024 * 1024
+
+# Отдача файлов /api/files/<kind>/<id>/: None — сам Django (FileResponse);
+# "nginx" — X-Accel-Redirect на internal-location FILES_ACCEL_REDIRECT_PREFIX
+# (alias на MEDIA_ROOT); "apache" — X-Sendfile (mod_xsendfile, lighttpd)
+FILES_SENDFILE_BACKEND = os.environ.get("FILES_SENDFILE_BACKEND") or None
+FILES_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# Индекс прав сотрудника (staffUsers/access.py) между запросами, секунды;
+# 0 — только в пределах запроса. Сброс — по версии в кеше default,
+# поэтому на locmem (кеш у каждого процесса свой) индекс между запросами
+# не кешируется независимо от этого значения
+STAFF_PERMISSIONS_CACHE_TIMEOUT = int(os.environ.get("STAFF_PERMISSIONS_CACHE_TIMEOUT", 300))
+
+# Хранение аудита (staffUsers/audit_archive.py): записи старше N дней
+# (целыми месяцами) переносятся в MEDIA_ROOT/audit_archive/*.jsonl.gz;
+# 0 — не архивировать
+AUDIT_RETENTION_DAYS = int(os.environ.get("AUDIT_RETENTION_DAYS", 365))
+AUDIT_ARCHIVE_BATCH_SIZE = 2000
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=180),
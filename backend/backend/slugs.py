@@ -0,0 +1,119 @@
+# backend/slugs.py
+"""
+Выдача уникальных slug-ов.
+
+Вместо перебора base, base-2, base-3... с запросом на каждую попытку
+занятые номера для основы читаются одним запросом (slug = base или
+slug LIKE 'base-%' — по индексу slug), номера разбираются в Python, и
+берётся наименьший свободный. Проверка «заранее» гонку не
+исключает, поэтому окончательно уникальность держит UNIQUE-индекс:
+при IntegrityError на slug выдаём следующий и повторяем (create_with_slug /
+save_with_slug). Для массового импорта — allocate_slugs: все slug-и пачки
+за один проход.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+DEFAULT_BASE = "item"
+# место под суффикс «-<N>» при обрезке длинных основ
+SUFFIX_RESERVE = 8
+ATTEMPTS = 5
+# сколько основ проверять одним запросом в allocate_slugs
+BATCH_BASES = 100
+
+
+def slug_base(model, source, field="slug", default=DEFAULT_BASE):
+    max_length = model._meta.get_field(field).max_length or 50
+    base = slugify(source or "")[:max_length - SUFFIX_RESERVE].strip("-")
+    return base or default
+
+
+def _number(base, slug):
+    """Номер slug-а в ряду base (1), base-2, base-3...; None — чужой slug."""
+    if slug == base:
+        return 1
+    tail = slug[len(base):]
+    if tail.startswith("-") and tail[1:].isdigit():
+        return int(tail[1:])
+    return None
+
+
+def _taken(model, bases, field, exclude_pk=None):
+    """{основа: множество занятых номеров} — один запрос на пачку основ."""
+    taken = {base: set() for base in bases}
+    condition = Q()
+    for base in taken:
+        # префиксный запрос использует индекс; чужие slug-и вида base-xyz
+        # отсеивает _number
+        condition |= Q(**{field: base}) | Q(**{f"{field}__startswith": f"{base}-"})
+    qs = model._default_manager.filter(condition).order_by()
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    for slug in qs.values_list(field, flat=True):
+        for base in taken:
+            number = _number(base, slug)
+            if number is not None:
+                taken[base].add(number)
+    return taken
+
+
+def _pick(base, used):
+    number = 1
+    while number in used:
+        number += 1
+    used.add(number)
+    return base if number == 1 else f"{base}-{number}"
+
+
+def allocate_slug(model, source, field="slug", exclude_pk=None):
+    """Свободный slug для source (exclude_pk — не считать slug самого объекта)."""
+    base = slug_base(model, source, field)
+    return _pick(base, _taken(model, [base], field, exclude_pk)[base])
+
+
+def allocate_slugs(model, sources, field="slug"):
+    """
+    Slug-и для списка source за один проход — уникальные и между собой.
+    Для bulk_create: гонку с параллельной вставкой ловит UNIQUE-индекс.
+    """
+    bases = [slug_base(model, source, field) for source in sources]
+    distinct = list(dict.fromkeys(bases))
+    taken = {}
+    for i in range(0, len(distinct), BATCH_BASES):
+        taken.update(_taken(model, distinct[i:i + BATCH_BASES], field))
+    return [_pick(base, taken[base]) for base in bases]
+
+
+def _slug_conflict(model, field, slug):
+    return model._default_manager.filter(**{field: slug}).exists()
+
+
+def _with_retry(model, source, field, exclude_pk, run, attempts):
+    for attempt in range(attempts):
+        slug = allocate_slug(model, source, field, exclude_pk)
+        try:
+            # savepoint: ошибка не ломает внешнюю транзакцию
+            with transaction.atomic():
+                return run(slug)
+        except IntegrityError:
+            # slug успели занять — пробуем следующий; прочие нарушения пробрасываем
+            if attempt + 1 == attempts or not _slug_conflict(model, field, slug):
+                raise
+
+
+def create_with_slug(model, source, create, field="slug", attempts=ATTEMPTS):
+    """create(slug) создаёт объект; при гонке за slug повторяется с новым."""
+    return _with_retry(model, source, field, None, create, attempts)
+
+
+def save_with_slug(instance, source, save, field="slug", attempts=ATTEMPTS):
+    """
+    Назначить instance уникальный slug и сохранить через save()
+    (обычно — родительский Model.save из переопределённого save).
+    """
+    def run(slug):
+        setattr(instance, field, slug)
+        return save()
+
+    return _with_retry(type(instance), source, field, instance.pk, run, attempts)
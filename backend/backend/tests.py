@@ -0,0 +1,37 @@
+import csv
+import io
+import zipfile
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from . import export
+
+ROWS = [
+    ["=HYPERLINK(\"http://evil\")", "+998 71 000", "-1+2", "@SUM(A1)", "\tcmd", "\rcmd"],
+    ["обычный текст", -5, Decimal("-1.5"), "a=b", "", None],
+]
+
+
+class ExportFormulaTests(SimpleTestCase):
+    """Текст, похожий на формулу, выгружается с апострофом впереди."""
+
+    def test_csv(self):
+        data = b"".join(export.csv_chunks(["a"] * 6, ROWS)).decode("utf-8-sig")
+        rows = list(csv.reader(io.StringIO(data), delimiter=export.CSV_DELIMITER))
+        self.assertEqual(rows[1], [
+            "'=HYPERLINK(\"http://evil\")", "'+998 71 000", "'-1+2", "'@SUM(A1)",
+            "'\tcmd", "'\rcmd",
+        ])
+        # числа остаются числами
+        self.assertEqual(rows[2], ["обычный текст", "-5", "-1.5", "a=b", "", ""])
+
+    def test_xlsx(self):
+        data = b"".join(export.xlsx_chunks(["a"] * 6, ROWS))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        for text in ROWS[0]:
+            self.assertIn(f'<t xml:space="preserve">\'{text}</t>', sheet)
+        self.assertIn('<c r="B3"><v>-5</v></c>', sheet)
+        self.assertIn('<c r="C3"><v>-1.5</v></c>', sheet)
+        self.assertIn('<t xml:space="preserve">a=b</t>', sheet)
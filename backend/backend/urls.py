@@ -21,6 +21,10 @@ urlpatterns = [
 
     path("api/cert-documents/", include("cert_documents.urls")),
     path("api/statistics/", include("Statistics_site.urls")),
+    path("api/search/", include("letter_search.urls")),
+    path("api/files/", include("letter_files.urls")),
+    path("api/imports/", include("directory_import.urls")),
+    path("api/jobs/", include("jobs.urls")),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL,
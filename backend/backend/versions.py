@@ -0,0 +1,47 @@
+# backend/versions.py
+"""
+Счётчики версий («поколений») для сброса кешей.
+
+Вместо удаления множества ключей увеличиваем номер версии пространства
+имён — все ключи, собранные со старой версией, просто перестают читаться
+и вытесняются по TTL. Для нескольких процессов (gunicorn) алиас кеша
+должен быть общим: file или redis — на locmem версия растёт только в
+процессе, где было изменение (см. is_shared).
+"""
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def _initial():
+    # начальное значение по времени: если ключ версии вытеснят из кеша,
+    # новая версия не совпадёт со старой и устаревшие ключи не оживут
+    return int(time.time() * 1000)
+
+
+def is_shared(alias="default"):
+    """Кеш алиаса виден всем процессам (не locmem)."""
+    return not isinstance(caches[alias], LocMemCache)
+
+
+def get_version(namespace, alias="default"):
+    cache = caches[alias]
+    key = f"version:{namespace}"
+    version = cache.get(key)
+    if version is None:
+        # add() не перетрёт значение, если другой процесс успел раньше
+        cache.add(key, _initial(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace, alias="default"):
+    cache = caches[alias]
+    key = f"version:{namespace}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # ключа ещё нет (или его вытеснили)
+        cache.add(key, _initial(), timeout=None)
+        return cache.get(key)
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class CertDocumentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cert_documents'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from backend.etag import track_collection
+        from organizations.models import Organization
+        from .models import CertLetter, CertLetterFile, CertLetterReply
+
+        # всё, что попадает в ответ списка писем (файлы, ответы, имена)
+        track_collection(
+            "cert-letters",
+            models=(CertLetter, CertLetterFile, CertLetterReply,
+                    Organization, get_user_model()),
+            m2m=(CertLetter.dest_organizations.through,),
+        )
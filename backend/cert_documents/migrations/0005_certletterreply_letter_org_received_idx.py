@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cert_documents', '0004_certletter_need_replies'),
+        ('organizations', '0004_organization_curator'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certletterreply',
+            index=models.Index(fields=['letter', 'organization', 'received_date'], name='cert_docume_letter__6182d6_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cert_documents', '0005_certletterreply_letter_org_received_idx'),
+        ('organizations', '0004_organization_curator'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certletter',
+            index=models.Index(fields=['-date', '-id'], name='cert_docume_date_4d418f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certletterreply',
+            index=models.Index(fields=['-received_date', '-id'], name='cert_docume_receive_690f67_idx'),
+        ),
+    ]
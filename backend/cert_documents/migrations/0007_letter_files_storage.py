@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:56
+
+import letter_files.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letter_files', '0003_blob_storedfile'),
+        ('cert_documents', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certletterfile',
+            name='file',
+            field=models.FileField(storage=letter_files.storage.letter_storage, upload_to='cert_letters/', verbose_name='Файл'),
+        ),
+        migrations.AlterField(
+            model_name='certletterreply',
+            name='file',
+            field=models.FileField(storage=letter_files.storage.letter_storage, upload_to='cert_letters/replies/', verbose_name='Файл ответного письма'),
+        ),
+    ]
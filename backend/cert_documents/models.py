@@ -2,6 +2,7 @@
 from django.conf import settings
 from django.db import models
 
+from letter_files.storage import letter_storage
 from organizations.models import Organization
 
 
@@ -73,6 +74,10 @@ class CertLetter(models.Model):
 
     class Meta:
         ordering = ("-date", "-id")
+        indexes = [
+            # keyset-пагинация списка писем
+            models.Index(fields=["-date", "-id"]),
+        ]
         verbose_name = "Письмо CERT-CBU"
         verbose_name_plural = "Письма CERT-CBU"
 
@@ -87,6 +92,7 @@ class CertLetterFile(models.Model):
         related_name="files"
     )
     file = models.FileField(
+        storage=letter_storage,
         upload_to="cert_letters/",
         verbose_name="Файл"
     )
@@ -139,6 +145,7 @@ class CertLetterReply(models.Model):
 
     # Файл ответа
     file = models.FileField(
+        storage=letter_storage,
         upload_to="cert_letters/replies/",
         verbose_name="Файл ответного письма",
     )
@@ -165,6 +172,12 @@ class CertLetterReply(models.Model):
         verbose_name = "Ответное письмо CERT-CBU"
         verbose_name_plural = "Ответные письма CERT-CBU"
         ordering = ("-received_date", "-id")
+        indexes = [
+            # поиск самого раннего ответа организации на письмо (статистика)
+            models.Index(fields=["letter", "organization", "received_date"]),
+            # keyset-пагинация списка ответов
+            models.Index(fields=["-received_date", "-id"]),
+        ]
 
     def __str__(self):
         org_name = getattr(self.organization, "name", "—")
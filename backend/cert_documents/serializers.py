@@ -2,6 +2,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from backend.fieldsets import SparseFieldsMixin
+
 from .models import CertLetter, CertLetterFile, CertLetterReply
 from organizations.models import Organization
 
@@ -70,7 +72,7 @@ class CertLetterReplySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class CertLetterSerializer(serializers.ModelSerializer):
+class CertLetterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     dest_organizations = serializers.PrimaryKeyRelatedField(
         many=True,
         queryset=Organization.objects.all(),
@@ -111,6 +113,8 @@ class CertLetterSerializer(serializers.ModelSerializer):
             "files",
             "replies",
         ]
+        # вложенные списки: ?fields= / ?expand= (backend.fieldsets)
+        expandable_fields = ("files", "replies")
         read_only_fields = (
             "created_by",
             "updated_by",
@@ -0,0 +1,10 @@
+# cert_documents/tasks.py
+from backend.export import CSV, export_job
+from jobs.registry import task
+
+
+@task("cert.letters_export", public=True)
+def letters_export(job, query=None, export_format=CSV):
+    """Выгрузка писем CERT-CBU файлом (фильтры и права — как у /letters/export/)."""
+    from .views import CertLetterViewSet
+    return export_job(job, CertLetterViewSet, query, export_format)
@@ -1,8 +1,17 @@
 # cert_documents/views.py
+from collections import defaultdict
+
 from rest_framework import viewsets, permissions, filters
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 
+from backend.etag import ConditionalListMixin
+from backend.export import ExportMixin, chunked, column
+from backend.fieldsets import SparseQuerysetMixin
+from letter_search.filters import FullTextSearchFilter
+from letter_search.models import SearchDocument
+
 from .models import CertLetter, CertLetterFile, CertLetterReply
 from .serializers import (
     CertLetterSerializer,
@@ -12,25 +21,47 @@ from .serializers import (
 from .filters import CertLetterFilter
 
 
-class CertLetterViewSet(viewsets.ModelViewSet):
-    queryset = (
-        CertLetter.objects
-        .all()
-        .select_related("performer", "created_by", "updated_by")
-        .prefetch_related("dest_organizations", "files", "replies")
-    )
+def _person(last_name, first_name, username):
+    return " ".join(p for p in (last_name, first_name) if p) or username
+
+
+class CertLetterViewSet(
+    ExportMixin, SparseQuerysetMixin, ConditionalListMixin, viewsets.ModelViewSet
+):
+    queryset = CertLetter.objects.all()
     serializer_class = CertLetterSerializer
+
+    # связи подгружаются только под запрошенные поля (?fields= / ?expand=)
+    field_select_related = {
+        "performer_name": ("performer",),
+    }
+    field_prefetches = {
+        "dest_organizations": ("dest_organizations",),
+        "files": ("files",),
+        "replies": (Prefetch(
+            "replies",
+            queryset=CertLetterReply.objects.select_related(
+                "organization__category", "added_by"),
+        ),),
+    }
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    # ETag для списка (304, если ничего не менялось)
+    etag_collection = "cert-letters"
+    etag_updated_field = "updated_at"
+
     # Фильтрация / поиск / сортировка
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = CertLetterFilter
 
+    # ?search= идёт через полнотекстовый индекс (letter_search);
+    # search_fields остаются для запасного варианта без индекса
+    search_kind = SearchDocument.Kind.CERT
     search_fields = [
         "number",
         "subject",
@@ -44,6 +75,43 @@ class CertLetterViewSet(viewsets.ModelViewSet):
         "updated_at",
     ]
     ordering = ["-date", "-id"]
+    # ?cursor= — keyset-пагинация (индекс по date, id)
+    keyset_ordering = ("-date", "-id")
+
+    # GET /letters/export/?export_format=csv|xlsx — с теми же фильтрами
+    export_filename = "cert-letters"
+    # ?async=1 — фоновой задачей (см. tasks.py)
+    export_task = "cert.letters_export"
+    export_columns = (
+        column("ID", "id"),
+        column("Система", "system"),
+        column("Номер", "number"),
+        column("Дата", "date"),
+        column("Тема", "subject"),
+        column("Исполнитель", "performer__last_name", "performer__first_name",
+               "performer__username", render=_person),
+        column("Описание", "description"),
+        column("Есть срок", "has_deadline"),
+        column("Срок", "deadline"),
+        column("Нужны ответы", "need_replies"),
+        column("Создано", "created_at"),
+    )
+
+    def get_export_header(self):
+        return super().get_export_header() + ["Организации"]
+
+    def get_export_rows(self, queryset):
+        # организации (M2M) — одним запросом на пачку писем
+        through = CertLetter.dest_organizations.through
+        for chunk in chunked(super().get_export_rows(queryset), self.export_chunk_size):
+            names = defaultdict(list)
+            for letter_id, name in (
+                    through.objects.filter(certletter_id__in=[row[0] for row in chunk])
+                    .order_by("organization__name")
+                    .values_list("certletter_id", "organization__name")):
+                names[letter_id].append(name)
+            for row in chunk:
+                yield row + ["; ".join(names[row[0]])]
 
     def perform_create(self, serializer):
         # created_by / updated_by ставятся в serializer.create
@@ -75,6 +143,7 @@ class CertLetterReplyViewSet(viewsets.ModelViewSet):
     serializer_class = CertLetterReplySerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    keyset_ordering = ("-received_date", "-id")
 
     def perform_create(self, serializer):
         # added_by устанавливается в serializer.create
@@ -0,0 +1,484 @@
+# directory_import/importer.py
+"""
+Массовый импорт справочника организаций.
+
+Строки читаются потоково (readers.py) и обрабатываются пачками по
+batch_size: каждая пачка — своя транзакция, запись через bulk_create /
+bulk_update, справочные данные (категории, организации, подразделения)
+подгружаются одним запросом на пачку и кешируются на весь импорт.
+Ошибочные строки не останавливают импорт — попадают в отчёт.
+В режиме dry_run пачки проверяются и пишутся как обычно, но каждая
+транзакция откатывается.
+
+Колонки (регистр не важен):
+  organizations: name*, category* (slug), slug, description, address,
+                 lotus, phone, email — строка с существующим slug обновляет
+                 организацию, без slug — slug выдаётся (backend.slugs)
+  units:         organization* (slug), path* («Дирекция / Управление / Отдел»),
+                 type, order — недостающие промежуточные узлы создаются
+  employees:     organization* (slug), unit (путь, как в units), full_name*,
+                 position_title, work_phone, email, lotus, is_head, order —
+                 повтор (организация, подразделение, ФИО) пропускается
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from backend import counters
+from backend.etag import bump_collection
+from backend.slugs import allocate_slugs
+from organizations.models import Category, Organization
+from organizationsStaff.models import PATH_SEPARATOR, OrgEmployee, OrgUnit
+from staffUsers import audit
+
+from .models import ImportRun
+
+Kind = ImportRun.Kind
+
+# сколько ошибок строк хранить в отчёте
+MAX_ERRORS = 1000
+SLUG_ATTEMPTS = 3
+UNIT_PATH_SEPARATOR = "/"
+TRUE_VALUES = {"1", "true", "yes", "y", "да", "+"}
+
+
+class RowError(Exception):
+    def __init__(self, message, field=""):
+        super().__init__(message)
+        self.field = field
+
+
+@dataclass
+class Report:
+    rows_total: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row, message, field=""):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"row": row, "field": field, "message": message})
+
+    def as_dict(self):
+        return {
+            "rows_total": self.rows_total,
+            "created": self.created,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "invalid": self.invalid,
+            "errors": self.errors,
+        }
+
+
+def _required(row, name):
+    value = row.get(name)
+    if value in (None, ""):
+        raise RowError("Обязательное поле не заполнено", name)
+    return str(value)
+
+
+def _text(row, name):
+    value = row.get(name)
+    return "" if value is None else str(value)
+
+
+def _int(row, name, default=0):
+    value = row.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        raise RowError("Ожидается целое число", name)
+
+
+def _bool(row, name):
+    return str(row.get(name) or "").strip().lower() in TRUE_VALUES
+
+
+def _validate(instance, exclude, lenient=()):
+    """
+    Проверка полей модели без запросов к БД (FK исключены).
+    lenient — поля, которые при импорте можно оставить пустыми.
+    """
+    try:
+        instance.clean_fields(exclude=exclude)
+    except ValidationError as exc:
+        for name, errors in exc.message_dict.items():
+            if name in lenient and all(
+                    e.code == "blank" for e in exc.error_dict[name]):
+                continue
+            raise RowError("; ".join(errors), name)
+
+
+def split_unit_path(value):
+    parts = tuple(p.strip() for p in str(value or "").split(UNIT_PATH_SEPARATOR))
+    return tuple(p for p in parts if p)
+
+
+def unit_paths(organization_ids):
+    """
+    Существующие подразделения организаций: {org_id: {(имена от корня): (id, path, depth)}}
+    — один запрос. При одноимённых соседях берётся первый по id.
+    """
+    rows = list(
+        OrgUnit.objects.filter(organization_id__in=list(organization_ids))
+        .order_by("depth", "id")
+        .values_list("pk", "organization_id", "parent_id", "name", "path", "depth")
+    )
+    names = {}
+    result = defaultdict(dict)
+    for pk, org_id, parent_id, name, path, depth in rows:
+        key = names.get(parent_id, ()) + (name,)
+        names[pk] = key
+        result[org_id].setdefault(key, (pk, path, depth))
+    return result
+
+
+class BaseImporter:
+    kind = None
+
+    def __init__(self, report, actor=None):
+        self.report = report
+        self.actor = actor
+        self._org_ids = {}
+
+    def process_batch(self, rows):
+        raise NotImplementedError
+
+    def finish(self):
+        """Вызывается после всех пачек (в своей транзакции)."""
+
+    def _organizations(self, slugs):
+        """{slug: id} для slug-ов пачки, с кешем на весь импорт."""
+        missing = {s for s in slugs if s not in self._org_ids}
+        if missing:
+            found = dict(
+                Organization.objects.filter(slug__in=missing).values_list("slug", "pk"))
+            for slug in missing:
+                self._org_ids[slug] = found.get(slug)
+        return self._org_ids
+
+
+class OrganizationImporter(BaseImporter):
+    kind = Kind.ORGANIZATIONS
+    fields = ("name", "description", "address", "lotus", "phone", "email", "category")
+    lenient = ("description", "address", "lotus", "phone", "email")
+
+    def __init__(self, report, actor=None):
+        super().__init__(report, actor)
+        self.categories = {}
+        self.seen_slugs = set()
+
+    def _category_ids(self, rows):
+        missing = {str(r.get("category") or "") for _, r in rows} - set(self.categories) - {""}
+        if missing:
+            found = dict(
+                Category.objects.filter(slug__in=missing).values_list("slug", "pk"))
+            for slug in missing:
+                self.categories[slug] = found.get(slug)
+
+    def _build(self, line_no, row):
+        category_id = self.categories.get(_required(row, "category"))
+        if category_id is None:
+            raise RowError("Категория с таким slug не найдена", "category")
+        org = Organization(
+            name=_required(row, "name"),
+            description=_text(row, "description"),
+            address=_text(row, "address"),
+            lotus=_text(row, "lotus"),
+            phone=_text(row, "phone"),
+            email=_text(row, "email"),
+            category_id=category_id,
+        )
+        _validate(org, exclude=["slug", "category", "logo", "curator"],
+                  lenient=self.lenient)
+        return org
+
+    def process_batch(self, rows):
+        self._category_ids(rows)
+        given = {str(r["slug"]) for _, r in rows if r.get("slug")}
+        existing = {
+            org.slug: org for org in Organization.objects.filter(slug__in=given)
+        }
+
+        to_update, with_slug, without_slug = [], [], []
+        old_parents, before = {}, {}
+        for line_no, row in rows:
+            try:
+                org = self._build(line_no, row)
+                slug = str(row.get("slug") or "")
+                if slug:
+                    try:
+                        validate_slug(slug)
+                    except ValidationError as exc:
+                        raise RowError("; ".join(exc.messages), "slug")
+                    if slug in self.seen_slugs:
+                        raise RowError("slug повторяется в файле", "slug")
+                    self.seen_slugs.add(slug)
+            except RowError as exc:
+                self.report.add_error(line_no, str(exc), exc.field)
+                continue
+            if slug in existing:
+                current = existing[slug]
+                old_parents[current.pk] = {"category_id": current.category_id}
+                before[current.pk] = audit.snapshot(current)
+                for name in self.fields:
+                    attname = "category_id" if name == "category" else name
+                    setattr(current, attname, getattr(org, attname))
+                # bulk_update не трогает auto_now
+                current.updated = timezone.now()
+                to_update.append(current)
+            elif slug:
+                org.slug = slug
+                with_slug.append(org)
+            else:
+                without_slug.append(org)
+
+        if to_update:
+            Organization.objects.bulk_update(
+                to_update, [*self.fields, "updated"])
+            counters.bulk_moved(Organization, to_update, old_parents)
+            self.report.updated += len(to_update)
+
+        created = Organization.objects.bulk_create(with_slug)
+        created += self._create_with_slugs(without_slug)
+        # bulk_create не шлёт сигналов — счётчики категорий вручную
+        counters.bulk_created(Organization, created)
+        self.report.created += len(created)
+        self._audit(created, "created")
+        self._audit(to_update, "updated", before)
+
+    def _create_with_slugs(self, orgs):
+        if not orgs:
+            return []
+        for attempt in range(SLUG_ATTEMPTS):
+            for org, slug in zip(orgs, allocate_slugs(Organization, [o.name for o in orgs])):
+                org.slug = slug
+            try:
+                with transaction.atomic():
+                    return Organization.objects.bulk_create(orgs)
+            except IntegrityError:
+                # slug-и заняли параллельно — выдаём заново
+                if attempt + 1 == SLUG_ATTEMPTS:
+                    raise
+
+    def _audit(self, orgs, action, before=None):
+        # пишется после коммита пачки; в dry_run пачка откатывается — и аудит тоже
+        staff = getattr(self.actor, "staff", None) if self.actor else None
+        audit.record_many(
+            audit.build(
+                staff, org, action, source="import",
+                changes=audit.diff(before.get(org.pk, {}) if before else {},
+                                   audit.snapshot(org)),
+            )
+            for org in orgs
+        )
+
+
+class UnitImporter(BaseImporter):
+    """
+    Подразделения собираются со всех пачек и создаются в finish() по
+    уровням: родитель всегда вставлен раньше детей, path/depth
+    проставляются сразу (без rebuild_unit_paths).
+    """
+    kind = Kind.UNITS
+
+    def __init__(self, report, actor=None):
+        super().__init__(report, actor)
+        # {org_id: {(имена): (type, order, line_no)}}
+        self.wanted = defaultdict(dict)
+        self.types = {}
+        for value, label in OrgUnit.UnitType.choices:
+            self.types[value] = value
+            self.types[label.lower()] = value
+
+    def process_batch(self, rows):
+        orgs = self._organizations({str(r.get("organization") or "") for _, r in rows})
+        for line_no, row in rows:
+            try:
+                org_id = orgs.get(_required(row, "organization"))
+                if org_id is None:
+                    raise RowError("Организация с таким slug не найдена", "organization")
+                names = split_unit_path(_required(row, "path"))
+                if not names:
+                    raise RowError("Пустой путь подразделения", "path")
+                if any(len(n) > OrgUnit._meta.get_field("name").max_length for n in names):
+                    raise RowError("Слишком длинное название подразделения", "path")
+                unit_type = self.types.get(str(row.get("type") or "other").lower())
+                if unit_type is None:
+                    raise RowError("Неизвестный тип подразделения", "type")
+                order = _int(row, "order")
+            except RowError as exc:
+                self.report.add_error(line_no, str(exc), exc.field)
+                continue
+            if names in self.wanted[org_id]:
+                self.report.add_error(line_no, "Подразделение повторяется в файле", "path")
+                continue
+            self.wanted[org_id][names] = (unit_type, order, line_no)
+
+    def finish(self):
+        if not self.wanted:
+            return
+        existing = unit_paths(self.wanted.keys())
+        to_update = []
+        # {(org_id, имена): (type, order)} — узлы, которых ещё нет
+        missing = {}
+        for org_id, units in self.wanted.items():
+            known = existing[org_id]
+            for names, (unit_type, order, _) in units.items():
+                if names in known:
+                    pk = known[names][0]
+                    to_update.append(OrgUnit(pk=pk, type=unit_type, order=order))
+                    continue
+                missing[(org_id, names)] = (unit_type, order)
+                # промежуточные узлы, не перечисленные в файле
+                for depth in range(1, len(names)):
+                    prefix = names[:depth]
+                    if prefix not in known and prefix not in units:
+                        missing.setdefault((org_id, prefix), (OrgUnit.UnitType.OTHER, 0))
+
+        if to_update:
+            OrgUnit.objects.bulk_update(to_update, ["type", "order"])
+            self.report.updated += len(to_update)
+
+        levels = defaultdict(list)
+        for (org_id, names), attrs in missing.items():
+            levels[len(names)].append((org_id, names, attrs))
+
+        for depth in sorted(levels):
+            batch = []
+            for org_id, names, (unit_type, order) in levels[depth]:
+                parent = existing[org_id].get(names[:-1]) if depth > 1 else None
+                batch.append(OrgUnit(
+                    organization_id=org_id, parent_id=parent[0] if parent else None,
+                    name=names[-1], type=unit_type, order=order,
+                    depth=depth - 1,
+                ))
+            created = OrgUnit.objects.bulk_create(batch)
+            # путь содержит собственный id — дописываем после вставки
+            for unit, (org_id, names, _) in zip(created, levels[depth]):
+                parent = existing[org_id].get(names[:-1]) if depth > 1 else None
+                unit.path = f"{parent[1] if parent else ''}{unit.pk}{PATH_SEPARATOR}"
+                existing[org_id][names] = (unit.pk, unit.path, unit.depth)
+            OrgUnit.objects.bulk_update(created, ["path"])
+            self.report.created += len(created)
+
+
+class EmployeeImporter(BaseImporter):
+    kind = Kind.EMPLOYEES
+    lenient = ("position_title", "work_phone", "email", "lotus")
+
+    def __init__(self, report, actor=None):
+        super().__init__(report, actor)
+        self.units = {}
+        # {org_id: {(unit_id, фио в нижнем регистре)}}
+        self.people = {}
+
+    def _load(self, org_ids):
+        missing = [pk for pk in org_ids if pk not in self.units]
+        if not missing:
+            return
+        paths = unit_paths(missing)
+        people = defaultdict(set)
+        for org_id, unit_id, full_name in (
+                OrgEmployee.objects.filter(organization_id__in=missing)
+                .values_list("organization_id", "unit_id", "full_name")):
+            people[org_id].add((unit_id, full_name.lower()))
+        for org_id in missing:
+            self.units[org_id] = paths.get(org_id, {})
+            self.people[org_id] = people.get(org_id, set())
+
+    def process_batch(self, rows):
+        orgs = self._organizations({str(r.get("organization") or "") for _, r in rows})
+        self._load({orgs[s] for s in orgs if orgs.get(s)})
+
+        batch = []
+        for line_no, row in rows:
+            try:
+                org_id = orgs.get(_required(row, "organization"))
+                if org_id is None:
+                    raise RowError("Организация с таким slug не найдена", "organization")
+                unit_id = None
+                names = split_unit_path(row.get("unit"))
+                if names:
+                    unit = self.units[org_id].get(names)
+                    if unit is None:
+                        raise RowError("Подразделение не найдено", "unit")
+                    unit_id = unit[0]
+                employee = OrgEmployee(
+                    organization_id=org_id, unit_id=unit_id,
+                    full_name=_required(row, "full_name"),
+                    position_title=_text(row, "position_title"),
+                    work_phone=_text(row, "work_phone") or _text(row, "phone"),
+                    email=_text(row, "email"),
+                    lotus=_text(row, "lotus"),
+                    is_head=_bool(row, "is_head"),
+                    order=_int(row, "order"),
+                )
+                _validate(employee, exclude=["organization", "unit"], lenient=self.lenient)
+            except RowError as exc:
+                self.report.add_error(line_no, str(exc), exc.field)
+                continue
+            key = (unit_id, employee.full_name.lower())
+            if key in self.people[org_id]:
+                self.report.skipped += 1
+                continue
+            self.people[org_id].add(key)
+            batch.append(employee)
+
+        OrgEmployee.objects.bulk_create(batch)
+        self.report.created += len(batch)
+
+
+IMPORTERS = {
+    Kind.ORGANIZATIONS: OrganizationImporter,
+    Kind.UNITS: UnitImporter,
+    Kind.EMPLOYEES: EmployeeImporter,
+}
+
+
+def _batches(rows, size):
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_import(rows, kind, dry_run=False, batch_size=1000, actor=None, on_progress=None):
+    """
+    rows — итератор (номер строки, dict) из readers.read_rows.
+    on_progress(report) вызывается после каждой пачки.
+    """
+    report = Report()
+    importer = IMPORTERS[kind](report, actor=actor)
+
+    for batch in _batches(rows, batch_size):
+        report.rows_total += len(batch)
+        with transaction.atomic():
+            importer.process_batch(batch)
+            if dry_run:
+                transaction.set_rollback(True)
+        if on_progress:
+            on_progress(report)
+
+    with transaction.atomic():
+        importer.finish()
+        if dry_run:
+            transaction.set_rollback(True)
+
+    if not dry_run and (report.created or report.updated):
+        # bulk-операции сигналов не шлют — сбрасываем ETag списка организаций
+        bump_collection("organizations")
+    return report
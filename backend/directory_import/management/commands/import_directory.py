@@ -0,0 +1,77 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from directory_import import runs
+from directory_import.models import ImportRun
+from directory_import.readers import FORMATS, ImportFormatError, detect_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Импорт справочника из CSV / XLSX / JSONL: организации, подразделения "
+        "(по путям «А / Б / В») или сотрудники. Пачками через bulk_create"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=ImportRun.Kind.values)
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, default=None,
+                            help="по умолчанию — по расширению файла")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="только проверить: все изменения откатываются")
+        parser.add_argument("--user", default=None,
+                            help="username автора (для аудита)")
+        parser.add_argument("--report", default=None,
+                            help="сохранить отчёт (JSON) в файл")
+
+    def handle(self, *args, **opts):
+        path = opts["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"Файл не найден: {path}")
+        try:
+            fmt = opts["format"] or detect_format(path)
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        user = None
+        if opts["user"]:
+            user = get_user_model().objects.filter(username=opts["user"]).first()
+            if user is None:
+                raise CommandError(f"Пользователь не найден: {opts['user']}")
+
+        run = ImportRun.objects.create(
+            kind=opts["kind"], file_name=os.path.basename(path), format=fmt,
+            dry_run=opts["dry_run"], batch_size=opts["batch_size"], created_by=user,
+        )
+
+        def progress(run):
+            self.stdout.write(
+                f"строк: {run.rows_total}, создано: {run.created}, "
+                f"обновлено: {run.updated}, пропущено: {run.skipped}, "
+                f"с ошибками: {run.invalid}")
+
+        with open(path, "rb") as fh:
+            runs.execute(run, fh=fh, on_progress=progress)
+
+        for error in run.errors[:20]:
+            self.stdout.write(self.style.WARNING(
+                f"строка {error['row']}: {error['field'] or '-'}: {error['message']}"))
+        if opts["report"]:
+            with open(opts["report"], "w", encoding="utf-8") as out:
+                json.dump({
+                    "status": run.status, "rows_total": run.rows_total,
+                    "created": run.created, "updated": run.updated,
+                    "skipped": run.skipped, "invalid": run.invalid,
+                    "errors": run.errors, "error": run.error,
+                }, out, ensure_ascii=False, indent=2)
+
+        if run.status == ImportRun.Status.FAILED:
+            raise CommandError(f"Импорт прерван: {run.error}")
+        prefix = "Проверка завершена (dry-run)" if run.dry_run else "Импорт завершён"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}: создано {run.created}, обновлено {run.updated}, "
+            f"пропущено {run.skipped}, с ошибками {run.invalid}"))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('organizations', 'Организации'), ('units', 'Подразделения'), ('employees', 'Сотрудники')], max_length=20)),
+                ('file', models.FileField(blank=True, upload_to='imports/%Y/%m/')),
+                ('file_name', models.CharField(blank=True, default='', max_length=255)),
+                ('format', models.CharField(max_length=10)),
+                ('dry_run', models.BooleanField(default=False)),
+                ('batch_size', models.PositiveIntegerField(default=1000)),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=10)),
+                ('rows_total', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('invalid', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Импорт справочника',
+                'verbose_name_plural': 'Импорты справочника',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
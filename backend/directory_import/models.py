@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class ImportRun(models.Model):
+    """
+    Запуск импорта справочника (организации / подразделения / сотрудники).
+    Создаётся API или командой import_directory; ход выполнения и отчёт
+    проверки пишутся сюда по мере обработки пачек.
+    """
+    class Kind(models.TextChoices):
+        ORGANIZATIONS = "organizations", "Организации"
+        UNITS = "units", "Подразделения"
+        EMPLOYEES = "employees", "Сотрудники"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    file = models.FileField(upload_to="imports/%Y/%m/", blank=True)
+    file_name = models.CharField(max_length=255, blank=True, default="")
+    format = models.CharField(max_length=10)
+    # dry-run: всё проверяется и откатывается, в БД ничего не остаётся
+    dry_run = models.BooleanField(default=False)
+    batch_size = models.PositiveIntegerField(default=1000)
+
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING)
+    rows_total = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    invalid = models.PositiveIntegerField(default=0)
+    # [{"row": N, "field": "...", "message": "..."}] — не больше MAX_ERRORS
+    errors = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name="import_runs")
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Импорт справочника"
+        verbose_name_plural = "Импорты справочника"
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} · {self.file_name} · {self.status}"
@@ -0,0 +1,98 @@
+# directory_import/readers.py
+"""
+Потоковое чтение строк импорта из CSV / XLSX / JSONL.
+
+Каждый читатель отдаёт (номер строки, {колонка: значение}) по одной,
+файл целиком в память не загружается. Имена колонок приводятся к нижнему
+регистру без пробелов по краям. XLSX читается через openpyxl в режиме
+read_only (необязательная зависимость: pip install openpyxl).
+"""
+import csv
+import io
+import json
+import os
+
+FORMATS = ("csv", "xlsx", "jsonl")
+
+
+class ImportFormatError(Exception):
+    """Файл не удаётся прочитать в заявленном формате."""
+
+
+def detect_format(name):
+    ext = os.path.splitext(name or "")[1].lower().lstrip(".")
+    if ext == "json":
+        ext = "jsonl"
+    if ext not in FORMATS:
+        raise ImportFormatError(f"Неизвестный формат файла: {name}")
+    return ext
+
+
+def _clean(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _normalize(row):
+    return {
+        str(key).strip().lower(): _clean(value)
+        for key, value in row.items() if key is not None
+    }
+
+
+def read_csv(fh):
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(text, dialect=dialect)
+    # строка 1 — заголовок
+    for line_no, row in enumerate(reader, start=2):
+        yield line_no, _normalize(row)
+
+
+def read_jsonl(fh):
+    for line_no, raw in enumerate(fh, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as exc:
+            raise ImportFormatError(f"Строка {line_no}: некорректный JSON ({exc})")
+        if not isinstance(row, dict):
+            raise ImportFormatError(f"Строка {line_no}: ожидается JSON-объект")
+        yield line_no, _normalize(row)
+
+
+def read_xlsx(fh):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("Для XLSX нужен openpyxl (pip install openpyxl)")
+    workbook = load_workbook(fh, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        for line_no, values in enumerate(rows, start=2):
+            if all(v is None for v in values):
+                continue
+            yield line_no, _normalize(dict(zip(header, values)))
+    finally:
+        workbook.close()
+
+
+READERS = {"csv": read_csv, "xlsx": read_xlsx, "jsonl": read_jsonl}
+
+
+def read_rows(fh, fmt):
+    """fh — бинарный файловый объект."""
+    return READERS[fmt](fh)
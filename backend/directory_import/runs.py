@@ -0,0 +1,58 @@
+# directory_import/runs.py
+"""
+Выполнение ImportRun: чтение файла, импорт пачками, запись хода
+выполнения и отчёта в строку ImportRun после каждой пачки.
+
+API ставит импорт фоновой задачей imports.run (см. tasks.py, выполняет
+воркер runworker), команда import_directory — синхронно (execute).
+"""
+import logging
+
+from django.utils import timezone
+
+from .importer import run_import
+from .models import ImportRun
+from .readers import read_rows
+
+logger = logging.getLogger(__name__)
+
+Status = ImportRun.Status
+
+
+def _update(run, **values):
+    ImportRun.objects.filter(pk=run.pk).update(**values)
+    for name, value in values.items():
+        setattr(run, name, value)
+
+
+def execute(run, fh=None, on_progress=None):
+    """
+    Выполняет импорт; fh — открытый бинарный файл (иначе берётся run.file).
+    Ошибки чтения/импорта не пробрасываются — run получает статус failed.
+    """
+    _update(run, status=Status.RUNNING, started_at=timezone.now())
+
+    def progress(report):
+        _update(run, **report.as_dict())
+        if on_progress:
+            on_progress(run)
+
+    own_file = fh is None
+    try:
+        if own_file:
+            fh = run.file.open("rb")
+        report = run_import(
+            read_rows(fh, run.format), run.kind,
+            dry_run=run.dry_run, batch_size=run.batch_size,
+            actor=run.created_by, on_progress=progress,
+        )
+    except Exception as exc:
+        logger.exception("Импорт %s завершился ошибкой", run.pk)
+        _update(run, status=Status.FAILED, error=str(exc), finished_at=timezone.now())
+    else:
+        _update(run, status=Status.DONE, finished_at=timezone.now(), **report.as_dict())
+    finally:
+        if own_file and fh is not None:
+            fh.close()
+    return run
+
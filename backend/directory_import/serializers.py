@@ -0,0 +1,34 @@
+from rest_framework import serializers
+
+from .models import ImportRun
+from .readers import FORMATS, ImportFormatError, detect_format
+
+
+class ImportRunSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True)
+    format = serializers.ChoiceField(choices=FORMATS, required=False)
+    batch_size = serializers.IntegerField(
+        min_value=1, max_value=10_000, required=False)
+
+    class Meta:
+        model = ImportRun
+        fields = [
+            "id", "kind", "file", "file_name", "format", "dry_run", "batch_size",
+            "status", "rows_total", "created", "updated", "skipped", "invalid",
+            "errors", "error", "created_at", "started_at", "finished_at",
+        ]
+        read_only_fields = [
+            "id", "file_name", "status", "rows_total", "created", "updated",
+            "skipped", "invalid", "errors", "error",
+            "created_at", "started_at", "finished_at",
+        ]
+
+    def validate(self, attrs):
+        upload = attrs["file"]
+        attrs["file_name"] = upload.name
+        if not attrs.get("format"):
+            try:
+                attrs["format"] = detect_format(upload.name)
+            except ImportFormatError as exc:
+                raise serializers.ValidationError({"format": str(exc)})
+        return attrs
@@ -0,0 +1,23 @@
+# directory_import/tasks.py
+from jobs.registry import task
+
+from . import runs
+from .models import ImportRun
+
+
+@task("imports.run", max_attempts=1)
+def import_run(job, import_run_id):
+    """Выполнение ImportRun (ставится из ImportRunViewSet.perform_create)."""
+    run = ImportRun.objects.select_related("created_by").get(pk=import_run_id)
+
+    def progress(run):
+        # общее число строк заранее неизвестно — только счётчики;
+        # отмена не проверяется: обработанные пачки уже закоммичены
+        job.set_progress(
+            message=f"строк {run.rows_total}: создано {run.created}, "
+                    f"обновлено {run.updated}, ошибок {run.invalid}",
+            check_cancel=False,
+        )
+
+    runs.execute(run, on_progress=progress)
+    return {"import_run": run.pk, "status": run.status}
@@ -0,0 +1,164 @@
+import io
+import json
+
+from django.test import TestCase
+
+from organizations.models import Category, Organization
+from organizationsStaff.models import OrgEmployee, OrgUnit
+
+from .importer import run_import
+from .models import ImportRun
+from .readers import read_rows
+
+Kind = ImportRun.Kind
+
+
+def csv_rows(text):
+    return read_rows(io.BytesIO(text.encode()), "csv")
+
+
+def jsonl_rows(*rows):
+    return read_rows(io.BytesIO("\n".join(json.dumps(r) for r in rows).encode()), "jsonl")
+
+
+class ImporterTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Банки", slug="banki")
+        cls.org = Organization.objects.create(
+            name="Банк", slug="bank", description="", address="", lotus="",
+            phone="", email="bank@example.com", category=cls.category,
+        )
+
+    def units(self):
+        """{(имена от корня): (path, depth)} подразделений self.org."""
+        rows = OrgUnit.objects.filter(organization=self.org).order_by("depth", "pk")
+        names, result = {}, {}
+        for unit in rows:
+            key = names.get(unit.parent_id, ()) + (unit.name,)
+            names[unit.pk] = key
+            result[key] = unit
+        return result
+
+
+class OrganizationImportTests(ImporterTestCase):
+
+    def test_create_update_and_errors(self):
+        report = run_import(csv_rows(
+            "Name;Category;Slug;Email\n"
+            "Новый банк;banki;;new@example.com\n"
+            "Фонд;banki;fund;\n"
+            "Банк (переименован);banki;bank;bank@example.com\n"
+            ";banki;;\n"
+            "Нет категории;missing;;\n"
+            "Плохой slug;banki;bad slug;\n"
+            "Повтор;banki;fund;\n"
+            "Почта;banki;;not-an-email\n"
+        ), Kind.ORGANIZATIONS, batch_size=3)
+
+        self.assertEqual(
+            (report.rows_total, report.created, report.updated, report.invalid),
+            (8, 2, 1, 5))
+        self.assertEqual(
+            [(e["row"], e["field"]) for e in report.errors],
+            [(5, "name"), (6, "category"), (7, "slug"), (8, "slug"), (9, "email")])
+        self.assertEqual(Organization.objects.get(slug="bank").name, "Банк (переименован)")
+        self.assertEqual(Organization.objects.get(slug="fund").name, "Фонд")
+        # slug выдан по названию
+        self.assertTrue(Organization.objects.filter(
+            slug="item", email="new@example.com").exists())
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.objects_count, 3)
+
+    def test_dry_run_rolls_back(self):
+        report = run_import(csv_rows(
+            "name,category,slug\n"
+            "Фонд,banki,fund\n"
+            "Банк 2,banki,bank\n"
+        ), Kind.ORGANIZATIONS, dry_run=True)
+        self.assertEqual((report.created, report.updated, report.invalid), (1, 1, 0))
+        self.assertEqual(list(Organization.objects.values_list("slug", "name")), [("bank", "Банк")])
+
+
+class UnitImportTests(ImporterTestCase):
+
+    def test_units_by_path(self):
+        existing = OrgUnit.objects.create(organization=self.org, name="Дирекция")
+        report = run_import(jsonl_rows(
+            {"organization": "bank", "path": "Дирекция / Управление / Отдел", "type": "department"},
+            {"organization": "bank", "path": "Дирекция", "type": "Дирекция", "order": 2},
+            {"organization": "bank", "path": "Сектор", "type": "section"},
+            {"organization": "bank", "path": "Сектор", "type": "section"},
+            {"organization": "missing", "path": "Дирекция"},
+            {"organization": "bank", "path": " / "},
+            {"organization": "bank", "path": "Другое", "type": "неизвестно"},
+        ), Kind.UNITS, batch_size=2)
+
+        self.assertEqual((report.created, report.updated, report.invalid), (3, 1, 4))
+        self.assertEqual(
+            [(e["row"], e["field"]) for e in report.errors],
+            [(4, "path"), (5, "organization"), (6, "path"), (7, "type")])
+
+        units = self.units()
+        self.assertEqual(set(units), {
+            ("Дирекция",), ("Дирекция", "Управление"),
+            ("Дирекция", "Управление", "Отдел"), ("Сектор",),
+        })
+        root = units[("Дирекция",)]
+        self.assertEqual((root.pk, root.type, root.order), (existing.pk, "directorate", 2))
+        # промежуточный узел не был в файле — создан с типом по умолчанию
+        middle = units[("Дирекция", "Управление")]
+        self.assertEqual(middle.type, OrgUnit.UnitType.OTHER)
+        leaf = units[("Дирекция", "Управление", "Отдел")]
+        self.assertEqual(leaf.path, f"{root.pk}/{middle.pk}/{leaf.pk}/")
+        self.assertEqual(leaf.depth, 2)
+        self.assertEqual(list(root.get_descendants()), [middle, leaf])
+
+    def test_dry_run_rolls_back(self):
+        report = run_import(jsonl_rows(
+            {"organization": "bank", "path": "Дирекция / Управление"},
+        ), Kind.UNITS, dry_run=True)
+        self.assertEqual(report.created, 2)
+        self.assertFalse(OrgUnit.objects.exists())
+
+
+class EmployeeImportTests(ImporterTestCase):
+
+    def setUp(self):
+        run_import(jsonl_rows(
+            {"organization": "bank", "path": "Дирекция / Отдел"},
+        ), Kind.UNITS)
+        self.dept = self.units()[("Дирекция", "Отдел")]
+        OrgEmployee.objects.create(organization=self.org, unit=self.dept, full_name="Иванов И.И.")
+
+    def test_dedupe_and_errors(self):
+        report = run_import(csv_rows(
+            "organization,unit,full_name,is_head,phone\n"
+            "bank,Дирекция / Отдел,иванов и.и.,,\n"
+            "bank,Дирекция / Отдел,Петров П.П.,да,123\n"
+            "bank,Дирекция / Отдел,Петров П.П.,,\n"
+            "bank,,Петров П.П.,,\n"
+            "bank,Нет такого,Сидоров С.С.,,\n"
+            "bank,Дирекция,,,\n"
+            "missing,,Сидоров С.С.,,\n"
+        ), Kind.EMPLOYEES, batch_size=2)
+
+        self.assertEqual(
+            (report.created, report.skipped, report.invalid), (2, 2, 3))
+        self.assertEqual(
+            [(e["row"], e["field"]) for e in report.errors],
+            [(6, "unit"), (7, "full_name"), (8, "organization")])
+        self.assertEqual(
+            set(OrgEmployee.objects.values_list("unit_id", "full_name", "is_head", "work_phone")),
+            {(self.dept.pk, "Иванов И.И.", False, ""),
+             (self.dept.pk, "Петров П.П.", True, "123"),
+             (None, "Петров П.П.", False, "")})
+
+    def test_dry_run_rolls_back(self):
+        report = run_import(csv_rows(
+            "organization,unit,full_name\n"
+            "bank,Дирекция,Петров П.П.\n"
+        ), Kind.EMPLOYEES, dry_run=True)
+        self.assertEqual(report.created, 1)
+        self.assertEqual(OrgEmployee.objects.count(), 1)
@@ -0,0 +1,9 @@
+# directory_import/urls.py
+from rest_framework.routers import DefaultRouter
+
+from .views import ImportRunViewSet
+
+router = DefaultRouter()
+router.register("", ImportRunViewSet, basename="import-run")
+
+urlpatterns = router.urls
@@ -0,0 +1,31 @@
+from rest_framework import mixins, parsers, viewsets
+
+from jobs import queue
+from staffUsers.permissions import IsAdminLikeStaff
+
+from .models import ImportRun
+from .serializers import ImportRunSerializer
+
+
+class ImportRunViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Импорт справочника организаций (асинхронно):
+
+      POST /api/imports/       multipart: file, kind (organizations|units|employees),
+                               format?, dry_run?, batch_size?
+      GET  /api/imports/<id>/  статус, счётчики по мере обработки и отчёт об ошибках
+    """
+    queryset = ImportRun.objects.all()
+    serializer_class = ImportRunSerializer
+    permission_classes = [IsAdminLikeStaff]
+    parser_classes = [parsers.MultiPartParser, parsers.FormParser]
+
+    def perform_create(self, serializer):
+        run = serializer.save(created_by=self.request.user)
+        # выполняет воркер (runworker); ход — и в ImportRun, и в Job
+        queue.submit("imports.run", {"import_run_id": run.pk}, user=self.request.user)
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class ExternalLettersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'external_letters'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from backend import counters
+        from backend.etag import track_collection
+        from .models import ExternalLetter, ExternalLetterReply, ExternalLettersCategory
+
+        track_collection(
+            "external-letters",
+            models=(ExternalLetter, ExternalLetterReply,
+                    ExternalLettersCategory, get_user_model()),
+        )
+
+        counters.register(counters.Counter(
+            ExternalLettersCategory, ExternalLetter, "category", "objects_count"))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('external_letters', '0004_externalletterreply'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='externalletter',
+            name='external_le_time_cr_c6bba7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='externalletter',
+            index=models.Index(fields=['-time_create', '-id'], name='external_le_time_cr_7b7567_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='externalletterreply',
+            index=models.Index(fields=['-added_at', '-id'], name='external_le_added_a_721ad7_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:56
+
+import external_letters.models
+import letter_files.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letter_files', '0003_blob_storedfile'),
+        ('external_letters', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='externalletter',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=letter_files.storage.letter_storage, upload_to=external_letters.models.letter_upload_to),
+        ),
+        migrations.AlterField(
+            model_name='externalletterreply',
+            name='file',
+            field=models.FileField(storage=letter_files.storage.letter_storage, upload_to='external_letters/replies/', verbose_name='Файл ответного письма'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:19
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    """Начальные значения счётчика (дальше его ведут сигналы, см. backend/counters.py)."""
+    Category = apps.get_model("external_letters", "ExternalLettersCategory")
+    ExternalLetter = apps.get_model("external_letters", "ExternalLetter")
+    Category.objects.update(objects_count=Coalesce(Subquery(
+        ExternalLetter.objects.filter(category=OuterRef("pk"))
+        .order_by().values("category").annotate(n=Count("pk")).values("n"),
+        output_field=IntegerField(),
+    ), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('external_letters', '0006_letter_files_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='externalletterscategory',
+            name='objects_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,9 @@ from django.utils import timezone
 import uuid
 import os
 
+from backend.slugs import save_with_slug
+from letter_files.storage import letter_storage
+
 
 def letter_upload_to(instance, filename: str) -> str:
     """
@@ -20,6 +23,8 @@ class ExternalLettersCategory(models.Model):
     slug = models.SlugField(max_length=120, unique=True, blank=True)
     badge = models.CharField(max_length=50, blank=True, default="")
     time_create = models.DateTimeField(auto_now_add=True)
+    # число писем в категории (backend/counters.py)
+    objects_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Категория письма"
@@ -32,7 +37,9 @@ class ExternalLettersCategory(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)[:120]
+            return save_with_slug(
+                self, self.name,
+                lambda: super(ExternalLettersCategory, self).save(*args, **kwargs))
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -62,7 +69,8 @@ class ExternalLetter(models.Model):
         on_delete=models.PROTECT,  # чтобы не удалить категорию с письмами
     )
 
-    file = models.FileField(upload_to=letter_upload_to, null=True, blank=True)
+    file = models.FileField(
+        upload_to=letter_upload_to, storage=letter_storage, null=True, blank=True)
 
     time_create = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -72,7 +80,8 @@ class ExternalLetter(models.Model):
         verbose_name_plural = "Письма"
         ordering = ["-time_create"]
         indexes = [
-            models.Index(fields=["-time_create"]),
+            # keyset-пагинация (time_create, id)
+            models.Index(fields=["-time_create", "-id"]),
             models.Index(fields=["slug"]),
             models.Index(fields=["letter_number"]),
             models.Index(fields=["internal_letter_number"]),
@@ -130,6 +139,7 @@ class ExternalLetterReply(models.Model):
 
     # файл ответа
     file = models.FileField(
+        storage=letter_storage,
         upload_to="external_letters/replies/",
         verbose_name="Файл ответного письма",
     )
@@ -149,6 +159,10 @@ class ExternalLetterReply(models.Model):
         verbose_name = "Ответное письмо"
         verbose_name_plural = "Ответные письма"
         ordering = ("-sent_date", "-id")
+        indexes = [
+            # keyset-пагинация
+            models.Index(fields=["-added_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"Ответ на {self.letter.letter_number or self.letter.title}"
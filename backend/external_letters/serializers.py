@@ -1,21 +1,13 @@
 from rest_framework import serializers
-from django.utils.text import slugify
-from .models import ExternalLetter, ExternalLettersCategory, ExternalLetterReply
-
 
-def unique_slugify(model, base_slug):
-    slug = slugify(base_slug) or "item"
-    original = slug
-    i = 1
-    while model.objects.filter(slug=slug).exists():
-        i += 1
-        slug = f"{original}-{i}"
-    return slug
+from backend.fieldsets import SparseFieldsMixin
+from backend.slugs import create_with_slug
+from .models import ExternalLetter, ExternalLettersCategory, ExternalLetterReply
 
 
 class ExternalLettersCategorySerializer(serializers.ModelSerializer):
-    # количество писем в категории
-    objects_count = serializers.SerializerMethodField(read_only=True)
+    # количество писем в категории — денормализованная колонка
+    objects_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = ExternalLettersCategory
@@ -23,15 +15,13 @@ class ExternalLettersCategorySerializer(serializers.ModelSerializer):
                   "time_create", "objects_count"]
         read_only_fields = ["id", "slug", "time_create", "objects_count"]
 
-    def get_objects_count(self, obj):
-        return obj.letters.count()
-
     def create(self, validated_data):
-        if not validated_data.get("slug"):
-            validated_data["slug"] = unique_slugify(
-                ExternalLettersCategory, validated_data.get("name", "")
-            )
-        return super().create(validated_data)
+        if validated_data.get("slug"):
+            return super().create(validated_data)
+        create = super().create
+        return create_with_slug(
+            ExternalLettersCategory, validated_data.get("name", ""),
+            lambda slug: create({**validated_data, "slug": slug}))
 
     def update(self, instance, validated_data):
         validated_data.pop("slug", None)
@@ -78,7 +68,7 @@ class ExternalLetterReplySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ExternalLetterSerializer(serializers.ModelSerializer):
+class ExternalLetterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # писать будем через category_id...
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=ExternalLettersCategory.objects.all(),
@@ -114,14 +104,17 @@ class ExternalLetterSerializer(serializers.ModelSerializer):
             "updated",
             "replies",  # <<< важно
         ]
+        # вложенные объекты: ?fields= / ?expand= (backend.fieldsets)
+        expandable_fields = ("category", "replies")
         read_only_fields = ["id", "slug", "time_create", "updated"]
 
     def create(self, validated_data):
-        if not validated_data.get("slug"):
-            validated_data["slug"] = unique_slugify(
-                ExternalLetter, validated_data.get("title", "")
-            )
-        return super().create(validated_data)
+        if validated_data.get("slug"):
+            return super().create(validated_data)
+        create = super().create
+        return create_with_slug(
+            ExternalLetter, validated_data.get("title", ""),
+            lambda slug: create({**validated_data, "slug": slug}))
 
     def update(self, instance, validated_data):
         validated_data.pop("slug", None)
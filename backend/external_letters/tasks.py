@@ -0,0 +1,10 @@
+# external_letters/tasks.py
+from backend.export import CSV, export_job
+from jobs.registry import task
+
+
+@task("external.letters_export", public=True)
+def letters_export(job, query=None, export_format=CSV):
+    """Выгрузка внешних писем файлом (фильтры и права — как у /letters/export/)."""
+    from .views import ExternalLetterViewSet
+    return export_job(job, ExternalLetterViewSet, query, export_format)
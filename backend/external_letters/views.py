@@ -9,6 +9,12 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
+from backend.etag import ConditionalListMixin
+from backend.export import ExportMixin, column
+from backend.fieldsets import SparseQuerysetMixin
+from letter_search.filters import FullTextSearchFilter
+from letter_search.models import SearchDocument
+
 
 class ExternalLettersCategoryViewSet(
     mixins.ListModelMixin,
@@ -29,6 +35,9 @@ class ExternalLettersCategoryViewSet(
 
 
 class ExternalLetterViewSet(
+    ExportMixin,
+    SparseQuerysetMixin,
+    ConditionalListMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -38,17 +47,27 @@ class ExternalLetterViewSet(
 ):
     queryset = (
         ExternalLetter.objects
-        .select_related("category")
-        .prefetch_related("replies", "replies__added_by")
         .all()
         .order_by("-time_create")
     )
     serializer_class = ExternalLetterSerializer
+
+    # связи подгружаются только под запрошенные поля (?fields= / ?expand=)
+    field_select_related = {
+        "category": ("category",),
+    }
+    field_prefetches = {
+        "replies": ("replies", "replies__added_by"),
+    }
     lookup_field = "slug"
     lookup_url_kwarg = "slug"
     parser_classes = [MultiPartParser, FormParser]
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # ETag для списка (304, если ничего не менялось)
+    etag_collection = "external-letters"
+    etag_updated_field = "updated"
+
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
     filterset_fields = {
         "category__slug": ["exact"],          # NQQ / MBQ / ...
         "registration_date": ["gte", "lte"],  # от / до даты регистрации
@@ -65,7 +84,28 @@ class ExternalLetterViewSet(
         "executor",
         "category__name",
     ]
+    # ?search= идёт через полнотекстовый индекс (letter_search)
+    search_kind = SearchDocument.Kind.EXTERNAL
     ordering_fields = ["time_create", "updated", "title"]
+    # ?cursor= — keyset-пагинация (индекс по time_create, id)
+    keyset_ordering = ("-time_create", "-id")
+
+    # GET /letters/export/?export_format=csv|xlsx — с теми же фильтрами
+    export_filename = "external-letters"
+    # ?async=1 — фоновой задачей (см. tasks.py)
+    export_task = "external.letters_export"
+    export_columns = (
+        column("ID", "id"),
+        column("Заголовок", "title"),
+        column("Номер письма", "letter_number"),
+        column("Внутренний номер", "internal_letter_number"),
+        column("Категория", "category__name"),
+        column("Исполнитель", "executor"),
+        column("Дата регистрации", "registration_date"),
+        column("Дата поступления", "incoming_date"),
+        column("Описание", "description"),
+        column("Создано", "time_create"),
+    )
 
 
 class ExternalLetterReplyViewSet(
@@ -95,3 +135,5 @@ class ExternalLetterReplyViewSet(
         "letter__letter_number",
     ]
     ordering_fields = ["sent_date", "added_at"]
+    # sent_date может быть пустой, поэтому keyset — по added_at
+    keyset_ordering = ("-added_at", "-id")
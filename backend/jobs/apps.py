@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+
+        # задачи объявляются в <app>/tasks.py декоратором jobs.registry.task
+        autodiscover_modules("tasks")
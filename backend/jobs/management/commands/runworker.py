@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs import queue, worker
+
+
+class Command(BaseCommand):
+    help = "Воркер фоновых задач (очередь в БД, пул процессов)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=None,
+                            help="число процессов (по умолчанию — число CPU; 1 — без пула)")
+        parser.add_argument("--poll", type=float, default=2.0,
+                            help="пауза между опросами пустой очереди, сек")
+        parser.add_argument("--once", action="store_true",
+                            help="выполнить очередь и выйти")
+        parser.add_argument("--stale-minutes", type=int, default=30,
+                            help="через сколько минут без отметки задача считается зависшей")
+        parser.add_argument("--purge-days", type=int, default=None,
+                            help="удалить завершённые задачи старше N дней и выйти")
+
+    def handle(self, *args, **opts):
+        if opts["purge_days"] is not None:
+            removed = queue.purge(timezone.now() - timedelta(days=opts["purge_days"]))
+            self.stdout.write(self.style.SUCCESS(f"Удалено задач: {removed}"))
+            return
+
+        started = time.monotonic()
+
+        def report(pk, status):
+            self.stdout.write(f"задача #{pk}: {status}")
+
+        # зависшие задачи ищутся и при старте, и раз в heartbeat секунд;
+        # отметки «жив» ставятся чаще, чем задача успела бы устареть
+        stale_after = timedelta(minutes=opts["stale_minutes"])
+        worker.run(processes=opts["processes"], poll=opts["poll"],
+                   once=opts["once"], on_event=report, stale_after=stale_after,
+                   heartbeat=min(worker.HEARTBEAT, stale_after.total_seconds() / 3))
+        self.stdout.write(self.style.SUCCESS(
+            f"Очередь пуста ({time.monotonic() - started:.1f} с)"))
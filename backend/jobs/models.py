@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Фоновая задача (очередь в БД, без брокера).
+    Ставится через jobs.queue.submit, выполняется командой runworker
+    (пул процессов); ход выполнения и результат пишутся сюда же.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+        CANCELLED = "cancelled", "Отменена"
+
+    task = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    # больше — раньше
+    priority = models.SmallIntegerField(default=0)
+
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # не запускать раньше (отложенный повтор после ошибки)
+    run_after = models.DateTimeField(default=timezone.now)
+    cancel_requested = models.BooleanField(default=False)
+
+    progress = models.PositiveSmallIntegerField(null=True, blank=True)  # 0..100
+    progress_message = models.CharField(max_length=255, blank=True, default="")
+    result = models.JSONField(null=True, blank=True)
+    result_file = models.FileField(upload_to="jobs/%Y/%m/", blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name="jobs")
+    worker = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # обновляется при каждом set_progress: по нему находятся зависшие задачи
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # выборка очереди: status='pending' AND run_after <= now
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["created_by", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+    @property
+    def finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED, self.Status.CANCELLED)
+
+    # ---- для кода задач ----
+
+    def set_progress(self, done=None, total=None, message="", check_cancel=True):
+        """
+        Записать ход выполнения (и отметку «жив»). Если задачу отменили —
+        бросает JobCancelled: задача прерывается в ближайшей точке прогресса
+        (check_cancel=False — для задач, которые нельзя бросить на середине).
+        """
+        from .queue import JobCancelled
+
+        percent = None
+        if done is not None and total:
+            percent = max(0, min(100, int(done * 100 / total)))
+        self.progress = percent
+        self.progress_message = message[:255]
+        Job.objects.filter(pk=self.pk).update(
+            progress=percent, progress_message=self.progress_message,
+            heartbeat_at=timezone.now(),
+        )
+        if check_cancel and Job.objects.filter(pk=self.pk, cancel_requested=True).exists():
+            raise JobCancelled()
+
+    def save_result_file(self, filename, chunks):
+        """Сохранить результат-файл из итератора байтовых кусков (без загрузки в память)."""
+        from .queue import save_result_file
+        save_result_file(self, filename, chunks)
@@ -0,0 +1,170 @@
+# jobs/queue.py
+"""
+Очередь фоновых задач на таблице Job.
+
+submit ставит задачу; воркер забирает её условным UPDATE
+(status='pending' → 'running' — двум воркерам одна задача не достанется),
+выполняет и пишет результат. Ошибка → повтор с экспоненциальной паузой,
+пока не исчерпаны max_attempts. Задачи, чей воркер перестал отмечаться
+(heartbeat), возвращаются в очередь requeue_stale.
+"""
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.files import File
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+Status = Job.Status
+
+# пауза перед повтором: RETRY_DELAY * 2^(попытка-1)
+RETRY_DELAY = timedelta(seconds=30)
+
+
+class JobCancelled(Exception):
+    """Задачу отменили во время выполнения (см. Job.set_progress)."""
+
+
+def submit(name, params=None, user=None, priority=0, run_after=None):
+    task = get_task(name)
+    # TypeError при неподходящих params — ошибка вызывающего кода
+    task.check_params(params or {})
+    return Job.objects.create(
+        task=name, params=params or {}, priority=priority,
+        max_attempts=task.max_attempts,
+        created_by=user if user is not None and user.is_authenticated else None,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def cancel(job):
+    """В очереди — отменяется сразу, выполняющаяся — при ближайшем set_progress."""
+    now = timezone.now()
+    if Job.objects.filter(pk=job.pk, status=Status.PENDING).update(
+            status=Status.CANCELLED, finished_at=now):
+        return True
+    return bool(Job.objects.filter(pk=job.pk, status=Status.RUNNING).update(
+        cancel_requested=True))
+
+
+def claim(limit, worker=""):
+    """Забирает до limit готовых к запуску задач; возвращает их id."""
+    now = timezone.now()
+    candidates = list(
+        Job.objects
+        .filter(status=Status.PENDING, run_after__lte=now)
+        .order_by("-priority", "run_after", "id")
+        .values_list("pk", flat=True)[:limit]
+    )
+    claimed = []
+    for pk in candidates:
+        # условный UPDATE: параллельный воркер мог забрать задачу раньше
+        if Job.objects.filter(pk=pk, status=Status.PENDING).update(
+                status=Status.RUNNING, started_at=now, heartbeat_at=now,
+                worker=worker, attempts=F("attempts") + 1):
+            claimed.append(pk)
+    return claimed
+
+
+def _finish(job, **values):
+    values.setdefault("finished_at", timezone.now())
+    # отменённую в очереди задачу не перезаписываем
+    Job.objects.filter(pk=job.pk, status=Status.RUNNING).update(**values)
+
+
+def _fail(job, message):
+    if job.attempts < job.max_attempts:
+        delay = RETRY_DELAY * (2 ** (job.attempts - 1))
+        _finish(job, status=Status.PENDING, error=message,
+                run_after=timezone.now() + delay, finished_at=None)
+        return Status.PENDING
+    _finish(job, status=Status.FAILED, error=message)
+    return Status.FAILED
+
+
+def execute(pk):
+    """Выполняет забранную задачу; возвращает итоговый статус."""
+    job = Job.objects.select_related("created_by").get(pk=pk)
+    try:
+        task = get_task(job.task)
+    except LookupError as exc:
+        _finish(job, status=Status.FAILED, error=str(exc))
+        return Status.FAILED
+    try:
+        task.check_params(job.params)
+    except TypeError as exc:
+        # повтор с теми же параметрами не поможет
+        _finish(job, status=Status.FAILED, error=f"Неверные параметры: {exc}")
+        return Status.FAILED
+
+    try:
+        result = task.func(job, **job.params)
+    except JobCancelled:
+        _finish(job, status=Status.CANCELLED, error="")
+        return Status.CANCELLED
+    except Exception as exc:
+        logger.exception("Задача %s #%s завершилась ошибкой", job.task, job.pk)
+        return _fail(job, f"{type(exc).__name__}: {exc}")
+
+    _finish(job, status=Status.DONE, result=result, error="",
+            progress=100, result_file=job.result_file.name or "")
+    return Status.DONE
+
+
+def heartbeat(ids, worker=""):
+    """Отметка «жив» для выполняющихся задач воркера (пишет родительский процесс)."""
+    if not ids:
+        return 0
+    return Job.objects.filter(pk__in=list(ids), status=Status.RUNNING, worker=worker).update(
+        heartbeat_at=timezone.now())
+
+
+def abandon(pk, message):
+    """
+    Задача осталась без исполнителя (процесс упал, не дописав статус):
+    повтор с паузой или failed, как при ошибке в коде задачи.
+    """
+    job = Job.objects.filter(pk=pk, status=Status.RUNNING).first()
+    if job is None:
+        # статус успели записать до сбоя
+        return Job.objects.filter(pk=pk).values_list("status", flat=True).first()
+    return _fail(job, message)
+
+
+def requeue_stale(older_than):
+    """Задачи, чей воркер перестал отмечаться, — обратно в очередь (или в failed)."""
+    stale = Job.objects.filter(status=Status.RUNNING, heartbeat_at__lt=older_than)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Status.FAILED, error="Воркер перестал отвечать",
+        finished_at=timezone.now())
+    requeued = stale.update(status=Status.PENDING)
+    return requeued + failed
+
+
+def save_result_file(job, filename, chunks):
+    # через временный файл: хранилище копирует его блоками
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1]) as tmp:
+        for chunk in chunks:
+            tmp.write(chunk)
+        tmp.flush()
+        tmp.seek(0)
+        job.result_file.save(filename, File(tmp, name=filename), save=False)
+
+
+def purge(older_than):
+    """Удаляет завершённые задачи старше older_than вместе с файлами результатов."""
+    removed = 0
+    finished = (Status.DONE, Status.FAILED, Status.CANCELLED)
+    for job in Job.objects.filter(status__in=finished, finished_at__lt=older_than).iterator():
+        if job.result_file:
+            job.result_file.delete(save=False)
+        job.delete()
+        removed += 1
+    return removed
@@ -0,0 +1,52 @@
+# jobs/registry.py
+"""
+Реестр фоновых задач.
+
+Задача — функция func(job, **params), объявленная декоратором @task в
+модуле tasks.py любого приложения (модули подхватываются в JobsConfig.ready).
+Возвращаемое значение (JSON) сохраняется в Job.result.
+
+    @task("stats.org_replies", public=True)
+    def org_replies(job, date_from=None, date_to=None):
+        ...
+
+public=True — задачу можно поставить через POST /api/jobs/.
+"""
+import inspect
+from dataclasses import dataclass
+
+TASKS = {}
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: object
+    max_attempts: int = 3
+    public: bool = False
+    # кто может ставить через API: None — любой авторизованный
+    permission: object = None
+
+    def allowed(self, user):
+        return self.permission is None or bool(self.permission(user))
+
+    def check_params(self, params):
+        """TypeError, если params не подходят к сигнатуре func(job, **params)."""
+        inspect.signature(self.func).bind(None, **params)
+
+
+def task(name, max_attempts=3, public=False, permission=None):
+    def decorator(func):
+        current = TASKS.get(name)
+        if current is not None and current.func.__module__ != func.__module__:
+            raise ValueError(f"Задача {name} уже зарегистрирована")
+        TASKS[name] = Task(name, func, max_attempts, public, permission)
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f"Неизвестная задача: {name}")
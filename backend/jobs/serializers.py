@@ -0,0 +1,45 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from .models import Job
+from .registry import TASKS
+
+
+class JobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id", "task", "params", "status", "attempts", "max_attempts",
+            "progress", "progress_message", "result", "download_url", "error",
+            "created_at", "started_at", "finished_at",
+        ]
+        read_only_fields = [f for f in fields if f not in ("task", "params")]
+
+    def get_download_url(self, obj):
+        if not obj.result_file:
+            return None
+        return reverse("job-download", args=[obj.pk], request=self.context.get("request"))
+
+    def validate_task(self, value):
+        task = TASKS.get(value)
+        request = self.context.get("request")
+        if task is None or not task.public:
+            raise serializers.ValidationError("Неизвестная задача")
+        if request is not None and not task.allowed(request.user):
+            raise serializers.ValidationError("Нет прав на эту задачу")
+        return value
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Ожидается объект")
+        return value
+
+    def validate(self, attrs):
+        # лишние/недостающие аргументы — 400 сразу, а не падение в воркере
+        try:
+            TASKS[attrs["task"]].check_params(attrs.get("params") or {})
+        except TypeError as exc:
+            raise serializers.ValidationError({"params": str(exc)})
+        return attrs
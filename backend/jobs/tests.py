@@ -0,0 +1,323 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models.query import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import queue, worker
+from .models import Job
+from .registry import task
+
+User = get_user_model()
+Status = Job.Status
+
+CALLS = []
+
+
+@task("tests.echo")
+def echo(job, value=None):
+    CALLS.append(value)
+    return {"value": value}
+
+
+@task("tests.fail", max_attempts=3)
+def fail(job):
+    raise RuntimeError("boom")
+
+
+@task("tests.progress")
+def progress(job):
+    job.set_progress(1, 2, "половина")
+    CALLS.append("after progress")
+    return {}
+
+
+@task("tests.public", public=True)
+def public(job, date_from=None):
+    return {}
+
+
+def make_job(name="tests.echo", params=None, **fields):
+    job = queue.submit(name, params)
+    if fields:
+        Job.objects.filter(pk=job.pk).update(**fields)
+        job.refresh_from_db()
+    return job
+
+
+class ClaimTests(TestCase):
+    """Одна задача не достаётся двум воркерам."""
+
+    def test_sequential_claims_are_disjoint(self):
+        jobs = [make_job(params={"value": n}) for n in range(5)]
+        first = queue.claim(3, worker="a")
+        second = queue.claim(10, worker="b")
+        self.assertEqual(len(first), 3)
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(set(first) | set(second), {j.pk for j in jobs})
+        self.assertEqual(queue.claim(10, worker="c"), [])
+
+    def test_concurrent_claim_of_same_candidates(self):
+        jobs = [make_job() for _ in range(3)]
+        real_values_list = QuerySet.values_list
+        competitor = []
+
+        def racing_values_list(qs, *args, **kwargs):
+            # кандидаты уже прочитаны, и тут параллельный воркер забирает всё
+            candidates = list(real_values_list(qs, *args, **kwargs))
+            if not competitor:
+                competitor.append(None)
+                competitor.extend(queue.claim(10, worker="b"))
+            return candidates
+
+        with mock.patch.object(QuerySet, "values_list", racing_values_list):
+            claimed = queue.claim(10, worker="a")
+
+        self.assertEqual(claimed, [])
+        self.assertEqual(sorted(competitor[1:]), [j.pk for j in jobs])
+        self.assertEqual(
+            set(Job.objects.values_list("worker", "attempts")), {("b", 1)})
+
+    def test_not_before_run_after_and_by_priority(self):
+        later = make_job(run_after=timezone.now() + timedelta(minutes=5))
+        low = make_job()
+        high = make_job(priority=5)
+        self.assertEqual(queue.claim(10), [high.pk, low.pk])
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Status.PENDING)
+
+
+class RetryTests(TestCase):
+
+    def run_once(self, job):
+        self.assertEqual(queue.claim(1), [job.pk])
+        return queue.execute(job.pk)
+
+    def test_backoff_then_failed(self):
+        job = make_job("tests.fail")
+        for attempt, delay in ((1, 30), (2, 60)):
+            before = timezone.now()
+            self.assertEqual(self.run_once(job), Status.PENDING)
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, attempt)
+            self.assertIn("RuntimeError: boom", job.error)
+            self.assertIsNone(job.finished_at)
+            self.assertGreaterEqual(job.run_after, before + timedelta(seconds=delay))
+            self.assertLessEqual(job.run_after, timezone.now() + timedelta(seconds=delay))
+            # до run_after воркер задачу не берёт
+            self.assertEqual(queue.claim(1), [])
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        self.assertEqual(self.run_once(job), Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Status.FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_bad_params_fail_without_retry(self):
+        with self.assertRaises(TypeError):
+            queue.submit("tests.echo", {"bogus": 1})
+        # задача, поставленная в обход submit (или до смены сигнатуры)
+        job = Job.objects.create(task="tests.echo", params={"bogus": 1})
+        self.assertEqual(self.run_once(job), Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("Неверные параметры", job.error)
+
+    def test_done(self):
+        job = make_job(params={"value": 7})
+        self.assertEqual(self.run_once(job), Status.DONE)
+        job.refresh_from_db()
+        self.assertEqual((job.result, job.progress), ({"value": 7}, 100))
+
+
+class CancelTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_cancel_pending(self):
+        job = make_job()
+        self.assertTrue(queue.cancel(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Status.CANCELLED)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(queue.claim(1), [])
+
+    def test_cancel_running_stops_at_set_progress(self):
+        job = make_job("tests.progress")
+        queue.claim(1)
+        self.assertTrue(queue.cancel(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.cancel_requested), (Status.RUNNING, True))
+
+        self.assertEqual(queue.execute(job.pk), Status.CANCELLED)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Status.CANCELLED)
+
+    def test_cancel_finished_is_noop(self):
+        job = make_job(status=Status.DONE)
+        self.assertFalse(queue.cancel(job))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Status.DONE)
+
+
+class RequeueStaleTests(TestCase):
+
+    def test_requeue_stale(self):
+        now = timezone.now()
+        old = now - timedelta(minutes=30)
+        stale = make_job(status=Status.RUNNING, heartbeat_at=old, attempts=1)
+        exhausted = make_job(status=Status.RUNNING, heartbeat_at=old, attempts=3)
+        alive = make_job(status=Status.RUNNING, heartbeat_at=now, attempts=1)
+
+        self.assertEqual(queue.requeue_stale(now - timedelta(minutes=10)), 2)
+        statuses = dict(Job.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[stale.pk], Status.PENDING)
+        self.assertEqual(statuses[exhausted.pk], Status.FAILED)
+        self.assertEqual(statuses[alive.pk], Status.RUNNING)
+
+
+class HeartbeatTests(TestCase):
+
+    def test_heartbeat_only_own_running_jobs(self):
+        old = timezone.now() - timedelta(hours=1)
+        job = make_job(status=Status.RUNNING, worker="a", heartbeat_at=old)
+        done = make_job(status=Status.DONE, worker="a", heartbeat_at=old)
+        self.assertEqual(queue.heartbeat([job.pk, done.pk], worker="b"), 0)
+        self.assertEqual(queue.heartbeat([job.pk, done.pk], worker="a"), 1)
+        job.refresh_from_db()
+        self.assertGreater(job.heartbeat_at, old)
+        self.assertEqual(queue.heartbeat([], worker="a"), 0)
+
+    def test_abandon(self):
+        job = make_job(status=Status.RUNNING, attempts=1)
+        self.assertEqual(queue.abandon(job.pk, "убит"), Status.PENDING)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (Status.PENDING, "убит"))
+        self.assertGreater(job.run_after, timezone.now())
+
+        last = make_job(status=Status.RUNNING, attempts=3)
+        self.assertEqual(queue.abandon(last.pk, "убит"), Status.FAILED)
+        # статус успели записать — не трогаем
+        finished = make_job(status=Status.DONE, attempts=1)
+        self.assertEqual(queue.abandon(finished.pk, "убит"), Status.DONE)
+
+
+class FakePool:
+    """Пул без процессов: задача выполняется в submit, broken — процесс «убит»."""
+
+    def __init__(self, broken=False, future=None):
+        self.broken = broken
+        self.future = future
+        self.submitted = []
+        self.shut_down = False
+
+    def submit(self, fn, pk):
+        self.submitted.append(pk)
+        if self.future:
+            return self.future(pk)
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("процесс убит"))
+        else:
+            future.set_result(queue.execute(pk))
+        return future
+
+    def shutdown(self, wait=True):
+        self.shut_down = True
+
+
+class LaterFuture(Future):
+    """Задача завершается на втором опросе — родитель успевает её отметить."""
+
+    def __init__(self, pk):
+        super().__init__()
+        self.pk = pk
+        self.polls = 0
+
+    def done(self):
+        self.polls += 1
+        if self.polls == 2:
+            self.set_result(queue.execute(self.pk))
+        return super().done()
+
+
+class WorkerTests(TestCase):
+
+    def run_worker(self, pools, **kwargs):
+        events = []
+        with mock.patch.object(worker, "_new_pool", side_effect=pools):
+            worker.run(processes=2, once=True, poll=0,
+                       on_event=lambda pk, st: events.append((pk, st)), **kwargs)
+        return sorted(events)
+
+    def test_run_once_drains_queue(self):
+        CALLS.clear()
+        jobs = [make_job(params={"value": n}) for n in range(3)]
+        events = []
+        worker.run(processes=1, once=True, on_event=lambda pk, st: events.append((pk, st)))
+        self.assertEqual(sorted(events), [(j.pk, Status.DONE) for j in jobs])
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+
+    def test_requeues_stale_while_running(self):
+        stale = make_job(status=Status.RUNNING, attempts=1,
+                         heartbeat_at=timezone.now() - timedelta(hours=1))
+        events = self.run_worker([FakePool()])
+        self.assertEqual(events, [(stale.pk, Status.DONE)])
+        stale.refresh_from_db()
+        self.assertEqual(stale.attempts, 2)
+
+    def test_broken_pool_retries_jobs_and_restarts(self):
+        retried = make_job()
+        last_try = make_job(max_attempts=1)
+        pools = [FakePool(broken=True), FakePool()]
+        events = self.run_worker(pools)
+
+        self.assertEqual(events, [(retried.pk, Status.PENDING), (last_try.pk, Status.FAILED)])
+        self.assertTrue(pools[0].shut_down)
+        self.assertEqual(pools[1].submitted, [])
+        retried.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), (Status.PENDING, 1))
+        self.assertIn("аварийно", retried.error)
+
+        Job.objects.filter(pk=retried.pk).update(run_after=timezone.now())
+        self.assertEqual(self.run_worker([FakePool()]), [(retried.pk, Status.DONE)])
+
+    def test_parent_heartbeats_running_jobs(self):
+        job = make_job()
+        beats = []
+        real_heartbeat = queue.heartbeat
+
+        def heartbeat(ids, worker=""):
+            beats.append((list(ids), real_heartbeat(ids, worker)))
+
+        with mock.patch.object(queue, "heartbeat", heartbeat):
+            events = self.run_worker([FakePool(future=LaterFuture)], heartbeat=0)
+        self.assertEqual(events, [(job.pk, Status.DONE)])
+        self.assertIn(([job.pk], 1), beats)
+
+
+class JobApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("u", password="x"))
+
+    def test_params_checked_against_task_signature(self):
+        response = self.client.post(
+            "/api/jobs/", {"task": "tests.public", "params": {"bogus": 1}}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("params", response.data)
+        self.assertFalse(Job.objects.exists())
+
+        response = self.client.post(
+            "/api/jobs/", {"task": "tests.public", "params": {"date_from": "2025-01-01"}},
+            format="json")
+        self.assertEqual(response.status_code, 202)
+
+    def test_private_task_rejected(self):
+        response = self.client.post("/api/jobs/", {"task": "tests.echo"}, format="json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,67 @@
+from django.http import Http404
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from letter_files import downloads
+from staffUsers.permissions import get_staff
+
+from . import queue
+from .models import Job
+from .serializers import JobSerializer
+
+
+def job_accepted(job, request):
+    """Ответ 202 на постановку задачи: клиент опрашивает /api/jobs/<id>/."""
+    return Response(JobSerializer(job, context={"request": request}).data,
+                    status=status.HTTP_202_ACCEPTED)
+
+
+class JobViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Фоновые задачи:
+
+      POST /api/jobs/                 {task, params} — только задачи с public=True
+      GET  /api/jobs/<id>/            статус, прогресс, результат
+      POST /api/jobs/<id>/cancel/     отмена
+      GET  /api/jobs/<id>/download/   файл результата (выгрузки)
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        qs = Job.objects.all()
+        staff = get_staff(self.request.user)
+        # свои задачи; администраторам — все
+        if not (staff and staff.is_admin_like()):
+            qs = qs.filter(created_by=self.request.user)
+        status_param = self.request.query_params.get("status")
+        if status_param:
+            qs = qs.filter(status=status_param)
+        return qs
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = queue.submit(serializer.validated_data["task"],
+                           serializer.validated_data.get("params"), user=request.user)
+        return job_accepted(job, request)
+
+    @action(detail=True, methods=["post"], url_path="cancel")
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        queue.cancel(job)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=True, methods=["get"], url_path="download")
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != Job.Status.DONE or not job.result_file:
+            raise Http404
+        return downloads.serve(request, job.result_file, as_attachment=True)
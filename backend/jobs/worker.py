@@ -0,0 +1,154 @@
+# jobs/worker.py
+"""
+Цикл воркера: забирает задачи из очереди и раздаёт их пулу процессов.
+
+Процессы, а не потоки: отчёты и импорты упираются в CPU и держали бы GIL.
+Каждая задача выполняется в дочернем процессе целиком (со своим
+соединением с БД); родитель забирает задачи, следит за слотами и раз в
+heartbeat секунд:
+  - отмечает heartbeat_at у выполняющихся задач — долгая задача без
+    set_progress не считается зависшей;
+  - возвращает в очередь зависшие задачи (requeue_stale) — свои и
+    упавших воркеров, не только при старте.
+Если дочерний процесс убит (OOM, kill), пул ломается (BrokenProcessPool):
+задачи сломанного пула уходят на повтор (abandon), пул создаётся заново.
+processes=1 — всё в текущем процессе, без пула; heartbeat тогда пишет
+отдельный поток.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.db import connections
+from django.utils import timezone
+
+from . import queue
+
+logger = logging.getLogger(__name__)
+
+# через сколько без отметки задача считается зависшей
+STALE_AFTER = timedelta(minutes=30)
+# как часто отмечать выполняющиеся задачи и искать зависшие, сек
+HEARTBEAT = 60.0
+
+
+def _execute_in_child(pk):
+    try:
+        return queue.execute(pk)
+    finally:
+        # процессы пула живут долго — соединение между задачами не держим
+        connections.close_all()
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _new_pool(processes):
+    # дочерние процессы не должны наследовать открытые соединения
+    connections.close_all()
+    return ProcessPoolExecutor(processes)
+
+
+def _execute_with_heartbeat(pk, name, interval):
+    """Задача в текущем процессе; поток отмечает её, пока она выполняется."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                queue.heartbeat([pk], name)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{pk}", daemon=True)
+    thread.start()
+    try:
+        return queue.execute(pk)
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _submit(pool, pk):
+    try:
+        return pool.submit(_execute_in_child, pk)
+    except BrokenProcessPool as exc:
+        # пул сломался после разбора — задачу разберёт _collect вместе с остальными
+        future = Future()
+        future.set_exception(exc)
+        return future
+
+
+def _collect(running, on_event):
+    """Разбирает завершённые задачи пула; True — пул сломан."""
+    broken = False
+    for pk, future in list(running.items()):
+        if not future.done():
+            continue
+        del running[pk]
+        try:
+            status = future.result()
+        except BrokenProcessPool:
+            # процесс пула убит — задача не дописала статус
+            broken = True
+            status = queue.abandon(pk, "Процесс воркера аварийно завершился")
+        except Exception as exc:
+            # упал сам воркер задачи (не код задачи)
+            status = queue.abandon(pk, f"{type(exc).__name__}: {exc}")
+        if on_event:
+            on_event(pk, status)
+    return broken
+
+
+def run(processes=None, poll=2.0, once=False, on_event=None,
+        stale_after=STALE_AFTER, heartbeat=HEARTBEAT):
+    """
+    Выполняет задачи, пока не остановят (once=True — пока очередь не опустеет).
+    on_event(job_id, status) вызывается по завершении каждой задачи.
+    """
+    processes = processes or os.cpu_count() or 1
+    name = worker_name()
+    pool = None
+    running = {}
+    last_beat = None
+    try:
+        if processes > 1:
+            pool = _new_pool(processes)
+
+        while True:
+            if last_beat is None or time.monotonic() - last_beat >= heartbeat:
+                last_beat = time.monotonic()
+                queue.heartbeat(running, name)
+                stale = queue.requeue_stale(timezone.now() - stale_after)
+                if stale:
+                    logger.warning("Возвращено в очередь зависших задач: %s", stale)
+
+            if _collect(running, on_event):
+                # остальные задачи сломанного пула получат то же исключение
+                wait(running.values())
+                _collect(running, on_event)
+                pool.shutdown(wait=False)
+                pool = _new_pool(processes)
+
+            ids = queue.claim(processes - len(running), worker=name)
+            for pk in ids:
+                if pool is None:
+                    status = _execute_with_heartbeat(pk, name, heartbeat)
+                    if on_event:
+                        on_event(pk, status)
+                else:
+                    running[pk] = _submit(pool, pk)
+
+            if once and not ids and not running:
+                break
+            if not ids:
+                time.sleep(poll)
+    finally:
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class LetterFilesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'letter_files'
+
+    def ready(self):
+        from . import signals  # noqa
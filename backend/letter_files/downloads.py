@@ -0,0 +1,166 @@
+# letter_files/downloads.py
+"""
+Отдача файлов писем с проверкой доступа.
+
+  - Range: bytes=a-b / a- / -n → 206 + Content-Range (один диапазон;
+    несколько диапазонов — отдаём файл целиком, это допускается RFC 9110)
+  - If-Modified-Since / If-None-Match → 304, If-Range учитывается
+  - полный файл — FileResponse (wsgi.file_wrapper / sendfile, без копирования
+    в Python), диапазон — итератор по блокам
+  - FILES_SENDFILE_BACKEND = "nginx" | "apache": Python только проверяет
+    права и отдаёт заголовок X-Accel-Redirect / X-Sendfile, файл (и Range)
+    отдаёт фронт-прокси
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+from .models import StoredFile
+
+BLOCK_SIZE = 256 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """
+    Возвращает (start, end) включительно, None — отдавать целиком,
+    или "unsatisfiable" — диапазон вне файла.
+    """
+    match = _RANGE.match((header or "").replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # последние N байт
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return "unsatisfiable"
+    if end < start:
+        return None
+    return start, end
+
+
+def file_etag(name, stat):
+    # у дедуплицированных файлов — хеш содержимого, у прочих — mtime и размер
+    sha256 = (
+        StoredFile.objects.filter(name=name)
+        .values_list("blob__sha256", flat=True).first()
+    )
+    return quote_etag(sha256 or f"{int(stat.st_mtime)}-{stat.st_size}")
+
+
+def _content_disposition(filename, as_attachment):
+    kind = "attachment" if as_attachment else "inline"
+    try:
+        filename.encode("ascii")
+    except UnicodeEncodeError:
+        return f"{kind}; filename*=utf-8''{quote(filename)}"
+    # quoted-string: кавычки и обратный слеш экранируются (как в FileResponse)
+    escaped = filename.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{kind}; filename="{escaped}"'
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        return any(c == "*" or c.removeprefix("W/") == etag for c in parse_etags(if_none_match))
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and int(mtime) <= since
+
+
+def _if_range_ok(request, etag, mtime):
+    value = request.headers.get("If-Range")
+    if not value:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    since = parse_http_date_safe(value)
+    return since is not None and int(mtime) <= since
+
+
+def _iter_range(path, start, length):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        while length > 0:
+            block = fh.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve(request, field_file, filename=None, as_attachment=False):
+    storage = field_file.storage
+    name = field_file.name
+    path = storage.path(name)
+    stat = os.stat(path)
+    filename = filename or os.path.basename(name)
+    etag = file_etag(name, stat)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Accept-Ranges": "bytes",
+        # файлы доступны только после авторизации
+        "Cache-Control": "private, no-cache",
+    }
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponse(status=304)
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    backend = getattr(settings, "FILES_SENDFILE_BACKEND", None)
+    if backend:
+        response = HttpResponse(content_type=content_type)
+        if backend == "nginx":
+            prefix = getattr(settings, "FILES_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+            response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name)
+        else:
+            response["X-Sendfile"] = path
+        headers["Content-Disposition"] = _content_disposition(filename, as_attachment)
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    size = stat.st_size
+    byte_range = None
+    if _if_range_ok(request, etag, stat.st_mtime):
+        byte_range = parse_range(request.headers.get("Range"), size)
+
+    if byte_range == "unsatisfiable":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(
+            open(path, "rb"), as_attachment=as_attachment,
+            filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(path, start, length), status=206, content_type=content_type)
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Disposition"] = _content_disposition(filename, as_attachment)
+
+    for key, value in headers.items():
+        response[key] = value
+    return response
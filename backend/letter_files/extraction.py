@@ -0,0 +1,79 @@
+# letter_files/extraction.py
+"""
+Извлечение текста из PDF / DOCX / TXT.
+
+PDF читается через pypdf (необязательная зависимость: pip install pypdf);
+без неё PDF-файлы помечаются как неподдерживаемые. DOCX разбирается
+стандартной библиотекой (zip + XML).
+"""
+import os
+import re
+import zipfile
+from xml.etree import ElementTree
+
+# ограничение на объём текста одного файла (символов)
+MAX_TEXT_LENGTH = 500_000
+
+TEXT_EXTENSIONS = {".txt", ".csv", ".md"}
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class UnsupportedFile(Exception):
+    """Формат не поддерживается — задача получает статус skipped."""
+
+
+def _normalize(text):
+    text = re.sub(r"[ \t\r\f\v]+", " ", text or "")
+    text = re.sub(r"\n\s*\n+", "\n", text)
+    return text.strip()[:MAX_TEXT_LENGTH]
+
+
+def extract_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise UnsupportedFile("pypdf не установлен")
+    reader = PdfReader(path)
+    parts, size = [], 0
+    for page in reader.pages:
+        chunk = page.extract_text() or ""
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= MAX_TEXT_LENGTH:
+            break
+    return "\n".join(parts)
+
+
+def extract_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("word/document.xml") as fh:
+            tree = ElementTree.parse(fh)
+    paragraphs = []
+    for para in tree.iter(f"{_W_NS}p"):
+        paragraphs.append("".join(node.text or "" for node in para.iter(f"{_W_NS}t")))
+    return "\n".join(paragraphs)
+
+
+def extract_plain(path):
+    with open(path, "rb") as fh:
+        raw = fh.read(MAX_TEXT_LENGTH * 4)
+    for encoding in ("utf-8", "cp1251"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="ignore")
+
+
+def extract_text(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        text = extract_pdf(path)
+    elif ext == ".docx":
+        text = extract_docx(path)
+    elif ext in TEXT_EXTENSIONS:
+        text = extract_plain(path)
+    else:
+        raise UnsupportedFile(f"формат {ext or '(без расширения)'} не поддерживается")
+    return _normalize(text)
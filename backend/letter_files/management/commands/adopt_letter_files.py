@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from letter_files.registry import SOURCES
+from letter_files.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Переводит файлы писем, загруженные до дедуплицирующего хранилища, "
+        "под учёт: одинаковые файлы заменяются жёсткими ссылками на один blob"
+    )
+
+    def handle(self, *args, **opts):
+        adopted = freed = 0
+        for source in SOURCES.values():
+            storage = source.model._meta.get_field(source.field).storage
+            if not isinstance(storage, ContentAddressedStorage):
+                continue
+            names = (
+                source.model.objects
+                .exclude(**{source.field: ""})
+                .exclude(**{f"{source.field}__isnull": True})
+                .values_list(source.field, flat=True)
+                .distinct()
+            )
+            for name in names.iterator():
+                result = storage.adopt(name)
+                if result is None:
+                    continue
+                adopted += 1
+                freed += result[1]
+            self.stdout.write(f"{source.kind}: готово")
+        self.stdout.write(self.style.SUCCESS(
+            f"Взято под учёт файлов: {adopted}, освобождено {freed / 1024 / 1024:.1f} МБ"))
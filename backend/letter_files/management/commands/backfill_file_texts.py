@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from letter_files import worker
+from letter_files.models import TextExtractionTask
+from letter_files.registry import SOURCES
+
+Status = TextExtractionTask.Status
+
+
+class Command(BaseCommand):
+    help = "Ставит в очередь все уже загруженные файлы и извлекает из них текст пулом процессов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=None,
+                            help="число процессов (по умолчанию — число CPU; 1 — без пула)")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--retry-failed", action="store_true",
+                            help="повторить задачи со статусом failed")
+        parser.add_argument("--enqueue-only", action="store_true",
+                            help="только поставить в очередь, разбор — воркером")
+
+    def handle(self, *args, **opts):
+        now = timezone.now()
+        for source in SOURCES.values():
+            rows = (
+                source.model.objects
+                .exclude(**{source.field: ""})
+                .exclude(**{f"{source.field}__isnull": True})
+                .values_list("pk", source.field)
+            )
+            tasks = [
+                TextExtractionTask(file_kind=source.kind, file_id=pk,
+                                   file_name=name, created_at=now)
+                for pk, name in rows.iterator()
+            ]
+            existing = TextExtractionTask.objects.filter(file_kind=source.kind)
+            before = existing.count()
+            # уже поставленные/обработанные файлы пропускаются (уникальность пары)
+            TextExtractionTask.objects.bulk_create(
+                tasks, batch_size=1000, ignore_conflicts=True)
+            self.stdout.write(f"{source.kind}: новых файлов {existing.count() - before}")
+
+        if opts["retry_failed"]:
+            count = TextExtractionTask.objects.filter(status=Status.FAILED).update(
+                status=Status.PENDING, attempts=0, error="")
+            self.stdout.write(f"повторно в очередь: {count}")
+
+        if opts["enqueue_only"]:
+            return
+
+        def progress(totals):
+            self.stdout.write(", ".join(f"{k}={v}" for k, v in sorted(totals.items())))
+
+        totals = worker.run(
+            processes=opts["processes"], batch_size=opts["batch_size"], on_batch=progress)
+        self.stdout.write(self.style.SUCCESS(f"Готово: {totals}"))
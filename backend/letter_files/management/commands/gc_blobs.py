@@ -0,0 +1,62 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from letter_files.models import Blob, StoredFile
+from letter_files.storage import BLOB_DIR, letter_storage
+
+
+class Command(BaseCommand):
+    help = "Удаляет содержимое файлов (blob-ы), на которое не осталось ссылок"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-hours", type=int, default=1,
+                            help="не трогать blob-ы моложе N часов (идущие загрузки)")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        storage = letter_storage()
+        dry_run = opts["dry_run"]
+
+        # счётчики сверяются с фактическими ссылками (после сбоев/откатов)
+        actual = Coalesce(Subquery(
+            StoredFile.objects.filter(blob=OuterRef("pk"))
+            .order_by().values("blob").annotate(n=Count("pk")).values("n")
+        ), Value(0))
+        if not dry_run:
+            fixed = Blob.objects.annotate(actual=actual).exclude(
+                refcount=actual).update(refcount=actual)
+            if fixed:
+                self.stdout.write(f"исправлено счётчиков: {fixed}")
+
+        cutoff = timezone.now() - timedelta(hours=opts["grace_hours"])
+        removed = freed = 0
+        for blob in Blob.objects.filter(refcount__lte=0, created_at__lt=cutoff).iterator():
+            if dry_run:
+                removed += 1
+                freed += blob.size
+                continue
+            # условное удаление: на blob могли сослаться, пока шёл обход
+            deleted, _ = Blob.objects.filter(
+                pk=blob.pk, refcount__lte=0, files__isnull=True).delete()
+            if deleted:
+                storage.delete_blob(blob)
+                removed += 1
+                freed += blob.size
+
+        # недописанные временные файлы
+        tmp_dir = storage.path(os.path.join(BLOB_DIR, "tmp"))
+        if os.path.isdir(tmp_dir) and not dry_run:
+            limit = time.time() - opts["grace_hours"] * 3600
+            for entry in os.scandir(tmp_dir):
+                if entry.is_file() and entry.stat().st_mtime < limit:
+                    os.unlink(entry.path)
+
+        verb = "будет удалено" if dry_run else "удалено"
+        self.stdout.write(self.style.SUCCESS(
+            f"blob-ов {verb}: {removed}, освобождено {freed / 1024 / 1024:.1f} МБ"))
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from letter_files import uploads
+from letter_files.models import ChunkedUpload
+
+
+class Command(BaseCommand):
+    help = "Удаляет брошенные и завершённые загрузки по частям вместе с .part-файлами"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24,
+                            help="незавершённые загрузки старше N часов удаляются")
+        parser.add_argument("--keep-days", type=int, default=7,
+                            help="сколько дней хранить записи о завершённых загрузках")
+
+    def handle(self, *args, **opts):
+        now = timezone.now()
+        # assembling дольше срока — процесс упал посреди complete
+        unfinished = (ChunkedUpload.Status.UPLOADING, ChunkedUpload.Status.ASSEMBLING)
+        stale = ChunkedUpload.objects.filter(
+            status__in=unfinished,
+            updated_at__lt=now - timedelta(hours=opts["hours"]),
+        )
+        finished = ChunkedUpload.objects.exclude(
+            status__in=unfinished,
+        ).filter(updated_at__lt=now - timedelta(days=opts["keep_days"]))
+
+        removed = 0
+        for qs in (stale, finished):
+            for upload in qs.iterator():
+                uploads.discard(upload)
+                upload.delete()
+                removed += 1
+        self.stdout.write(self.style.SUCCESS(f"Удалено загрузок: {removed}"))
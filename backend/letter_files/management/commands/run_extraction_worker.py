@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from letter_files import worker
+
+
+class Command(BaseCommand):
+    help = "Воркер очереди извлечения текста из файлов писем (пул процессов)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=None,
+                            help="число процессов (по умолчанию — число CPU; 1 — без пула)")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--sleep", type=float, default=5.0,
+                            help="пауза между опросами пустой очереди, сек")
+        parser.add_argument("--once", action="store_true",
+                            help="разобрать очередь и выйти")
+        parser.add_argument("--stale-minutes", type=int, default=30,
+                            help="через сколько минут задача в running считается зависшей")
+
+    def handle(self, *args, **opts):
+        while True:
+            stale = worker.requeue_stale(
+                timezone.now() - timedelta(minutes=opts["stale_minutes"]))
+            if stale:
+                self.stdout.write(f"возвращено в очередь зависших задач: {stale}")
+
+            totals = worker.run(processes=opts["processes"], batch_size=opts["batch_size"])
+            if totals:
+                self.stdout.write(", ".join(f"{k}={v}" for k, v in sorted(totals.items())))
+            if opts["once"]:
+                break
+            time.sleep(opts["sleep"])
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_kind', models.CharField(choices=[('cert_file', 'Файл письма CERT-CBU'), ('cert_reply', 'Ответ на письмо CERT-CBU'), ('external', 'Файл внешнего письма'), ('external_reply', 'Ответ на внешнее письмо')], max_length=20)),
+                ('file_id', models.PositiveBigIntegerField()),
+                ('file_name', models.CharField(max_length=500)),
+                ('letter_kind', models.CharField(max_length=16)),
+                ('letter_id', models.PositiveBigIntegerField()),
+                ('text', models.TextField(blank=True, default='')),
+                ('extracted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Текст файла',
+                'verbose_name_plural': 'Тексты файлов',
+                'indexes': [models.Index(fields=['letter_kind', 'letter_id'], name='letter_file_letter__3d5e06_idx')],
+                'constraints': [models.UniqueConstraint(fields=('file_kind', 'file_id'), name='uniq_file_text')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TextExtractionTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_kind', models.CharField(choices=[('cert_file', 'Файл письма CERT-CBU'), ('cert_reply', 'Ответ на письмо CERT-CBU'), ('external', 'Файл внешнего письма'), ('external_reply', 'Ответ на внешнее письмо')], max_length=20)),
+                ('file_id', models.PositiveBigIntegerField()),
+                ('file_name', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Обрабатывается'), ('done', 'Готово'), ('skipped', 'Формат не поддерживается'), ('failed', 'Ошибка')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Задача извлечения текста',
+                'verbose_name_plural': 'Задачи извлечения текста',
+                'indexes': [models.Index(fields=['status', 'id'], name='letter_file_status_edd2a3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('file_kind', 'file_id'), name='uniq_extraction_task')],
+            },
+        ),
+    ]
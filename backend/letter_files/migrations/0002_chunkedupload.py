@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:54
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letter_files', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255)),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('sha256', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('uploading', 'Загружается'), ('complete', 'Завершена'), ('failed', 'Ошибка')], default='uploading', max_length=10)),
+                ('error', models.TextField(blank=True, default='')),
+                ('target_kind', models.CharField(blank=True, choices=[('cert_file', 'Файл письма CERT-CBU'), ('cert_reply', 'Ответ на письмо CERT-CBU'), ('external', 'Файл внешнего письма'), ('external_reply', 'Ответ на внешнее письмо')], default='', max_length=20)),
+                ('target_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Загрузка по частям',
+                'verbose_name_plural': 'Загрузки по частям',
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='letter_file_status_f2f95d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letter_files', '0003_blob_storedfile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chunkedupload',
+            name='status',
+            field=models.CharField(choices=[('uploading', 'Загружается'), ('assembling', 'Собирается'), ('complete', 'Завершена'), ('failed', 'Ошибка')], default='uploading', max_length=10),
+        ),
+    ]
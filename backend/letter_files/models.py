@@ -0,0 +1,162 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .registry import FileKind
+
+
+class TextExtractionTask(models.Model):
+    """
+    Очередь извлечения текста из загруженных файлов.
+    Задачи ставятся сигналами после коммита, разбираются пулом процессов
+    (run_extraction_worker / backfill_file_texts) — загрузка их не ждёт.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Обрабатывается"
+        DONE = "done", "Готово"
+        SKIPPED = "skipped", "Формат не поддерживается"
+        FAILED = "failed", "Ошибка"
+
+    file_kind = models.CharField(max_length=20, choices=FileKind.choices)
+    file_id = models.PositiveBigIntegerField()
+    # имя файла на момент постановки: если файл заменят — задача переставится
+    file_name = models.CharField(max_length=500)
+
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Задача извлечения текста"
+        verbose_name_plural = "Задачи извлечения текста"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["file_kind", "file_id"], name="uniq_extraction_task"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.file_kind}:{self.file_id} [{self.status}]"
+
+
+class FileText(models.Model):
+    """Извлечённый текст файла (отдельно от писем, чтобы не раздувать их таблицы)."""
+    file_kind = models.CharField(max_length=20, choices=FileKind.choices)
+    file_id = models.PositiveBigIntegerField()
+    file_name = models.CharField(max_length=500)
+
+    # к какому письму относится — для сборки поискового документа
+    letter_kind = models.CharField(max_length=16)
+    letter_id = models.PositiveBigIntegerField()
+
+    text = models.TextField(blank=True, default="")
+    extracted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Текст файла"
+        verbose_name_plural = "Тексты файлов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["file_kind", "file_id"], name="uniq_file_text"),
+        ]
+        indexes = [
+            models.Index(fields=["letter_kind", "letter_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.file_kind}:{self.file_id} ({len(self.text)} симв.)"
+
+
+class ChunkedUpload(models.Model):
+    """
+    Загрузка большого файла по частям: init → PUT chunk ... → complete.
+    Части пишутся сразу в файл на диске (CHUNKED_UPLOAD_DIR/<id>.part),
+    received — сколько байт уже принято (с этого места продолжается загрузка).
+    """
+    class Status(models.TextChoices):
+        UPLOADING = "uploading", "Загружается"
+        # complete забрал загрузку: проверка суммы и перенос файла
+        ASSEMBLING = "assembling", "Собирается"
+        COMPLETE = "complete", "Завершена"
+        FAILED = "failed", "Ошибка"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="chunked_uploads",
+    )
+    file_name = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    # ожидаемый SHA-256 (hex), сверяется при завершении
+    sha256 = models.CharField(max_length=64)
+
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.UPLOADING)
+    error = models.TextField(blank=True, default="")
+
+    # куда прикреплён файл после завершения
+    target_kind = models.CharField(
+        max_length=20, choices=FileKind.choices, blank=True, default="")
+    target_id = models.PositiveBigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Загрузка по частям"
+        verbose_name_plural = "Загрузки по частям"
+        indexes = [
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.received}/{self.total_size})"
+
+
+class Blob(models.Model):
+    """
+    Уникальное содержимое файла (content-addressed): лежит один раз в
+    MEDIA_ROOT/_blobs/ab/cd/<sha256>, а файлы писем — жёсткие ссылки на него.
+    refcount — сколько StoredFile на него ссылается; blob с refcount=0
+    удаляется командой gc_blobs.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Содержимое файла"
+        verbose_name_plural = "Содержимое файлов"
+        indexes = [
+            models.Index(fields=["refcount"]),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]}… ×{self.refcount}"
+
+
+class StoredFile(models.Model):
+    """Имя файла в хранилище (то, что лежит в FileField) → его содержимое."""
+    name = models.CharField(max_length=500, unique=True)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name="files")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Файл в хранилище"
+        verbose_name_plural = "Файлы в хранилище"
+
+    def __str__(self):
+        return self.name
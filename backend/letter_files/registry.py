@@ -0,0 +1,53 @@
+# letter_files/registry.py
+"""
+Все файловые поля писем в одном месте: какая модель, какое поле
+и к какому письму (для поиска) относится файл.
+"""
+from dataclasses import dataclass
+
+from django.db import models
+
+from cert_documents.models import CertLetterFile, CertLetterReply
+from external_letters.models import ExternalLetter, ExternalLetterReply
+
+
+class FileKind(models.TextChoices):
+    CERT_FILE = "cert_file", "Файл письма CERT-CBU"
+    CERT_REPLY = "cert_reply", "Ответ на письмо CERT-CBU"
+    EXTERNAL = "external", "Файл внешнего письма"
+    EXTERNAL_REPLY = "external_reply", "Ответ на внешнее письмо"
+
+
+@dataclass(frozen=True)
+class FileSource:
+    kind: str
+    model: type
+    field: str
+    # тип письма в поиске (letter_search.SearchDocument.Kind) и путь к его id
+    letter_kind: str
+    letter_id_attr: str
+
+    def file_of(self, obj):
+        return getattr(obj, self.field)
+
+    def letter_id_of(self, obj):
+        return getattr(obj, self.letter_id_attr)
+
+
+SOURCES = {
+    FileKind.CERT_FILE: FileSource(
+        FileKind.CERT_FILE, CertLetterFile, "file", "cert", "letter_id"),
+    FileKind.CERT_REPLY: FileSource(
+        FileKind.CERT_REPLY, CertLetterReply, "file", "cert", "letter_id"),
+    FileKind.EXTERNAL: FileSource(
+        FileKind.EXTERNAL, ExternalLetter, "file", "external", "pk"),
+    FileKind.EXTERNAL_REPLY: FileSource(
+        FileKind.EXTERNAL_REPLY, ExternalLetterReply, "file", "external", "letter_id"),
+}
+
+
+def source_for_model(model):
+    for source in SOURCES.values():
+        if source.model is model:
+            return source
+    return None
@@ -0,0 +1,64 @@
+import os
+import re
+
+from rest_framework import serializers
+
+from . import uploads
+from .models import ChunkedUpload
+from .registry import FileKind
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            "id", "file_name", "total_size", "sha256",
+            "received", "status", "error",
+            "target_kind", "target_id", "chunk_size",
+            "created_at", "updated_at",
+        ]
+        read_only_fields = [
+            "id", "received", "status", "error",
+            "target_kind", "target_id", "chunk_size",
+            "created_at", "updated_at",
+        ]
+
+    def get_chunk_size(self, obj):
+        # максимальный размер части, который примет сервер
+        return uploads.max_chunk_size()
+
+    def validate_file_name(self, value):
+        name = os.path.basename(value.replace("\\", "/")).strip()
+        if not name:
+            raise serializers.ValidationError("Пустое имя файла")
+        return name
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Пустой файл")
+        if value > uploads.max_file_size():
+            raise serializers.ValidationError(
+                f"Файл больше {uploads.max_file_size()} байт")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if not re.fullmatch(r"[0-9a-f]{64}", value):
+            raise serializers.ValidationError("Ожидается SHA-256 в hex")
+        return value
+
+    def create(self, validated_data):
+        validated_data["owner"] = self.context["request"].user
+        return super().create(validated_data)
+
+
+class CompleteUploadSerializer(serializers.Serializer):
+    """
+    target: cert_file (target_id — id письма CERT, добавляется новый файл),
+            cert_reply, external, external_reply (target_id — id объекта,
+            файл заменяется).
+    """
+    target = serializers.ChoiceField(choices=FileKind.choices)
+    target_id = serializers.IntegerField(min_value=1)
@@ -0,0 +1,69 @@
+# letter_files/signals.py
+"""
+Постановка файлов в очередь извлечения текста (само извлечение — в воркере
+run_extraction_worker, запрос загрузки его не ждёт) и освобождение ссылок
+на содержимое в хранилище при удалении / замене файла.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import worker
+from .models import TextExtractionTask
+from .registry import SOURCES
+
+
+def _release(field_file, name):
+    release = getattr(field_file.storage, "release", None)
+    if release and name:
+        transaction.on_commit(partial(release, name))
+
+
+def _file_remember_old(sender, instance, raw=False, source=None, **kwargs):
+    instance._stored_old_name = None
+    if raw or not instance.pk:
+        return
+    instance._stored_old_name = (
+        source.model.objects
+        .filter(pk=instance.pk)
+        .values_list(source.field, flat=True)
+        .first()
+    )
+
+
+def _file_saved(sender, instance, raw=False, source=None, **kwargs):
+    if raw:
+        return
+    old_name = getattr(instance, "_stored_old_name", None)
+    if old_name and old_name != source.file_of(instance).name:
+        # файл заменили — старое имя больше не нужно
+        _release(source.file_of(instance), old_name)
+
+    name = source.file_of(instance).name or ""
+    current = (
+        TextExtractionTask.objects
+        .filter(file_kind=source.kind, file_id=instance.pk)
+        .values_list("file_name", flat=True)
+        .first()
+    )
+    # сохранение без замены файла не должно заново гонять извлечение
+    if current == name or (current is None and not name):
+        return
+    transaction.on_commit(partial(worker.enqueue, source, instance))
+
+
+def _file_deleted(sender, instance, source=None, **kwargs):
+    field_file = source.file_of(instance)
+    _release(field_file, field_file.name)
+    transaction.on_commit(partial(
+        worker.forget, source, instance.pk, source.letter_id_of(instance)))
+
+
+for _source in SOURCES.values():
+    pre_save.connect(partial(_file_remember_old, source=_source), sender=_source.model,
+                     weak=False, dispatch_uid=f"file_remember_old_{_source.kind}")
+    post_save.connect(partial(_file_saved, source=_source), sender=_source.model,
+                      weak=False, dispatch_uid=f"file_text_save_{_source.kind}")
+    post_delete.connect(partial(_file_deleted, source=_source), sender=_source.model,
+                        weak=False, dispatch_uid=f"file_text_delete_{_source.kind}")
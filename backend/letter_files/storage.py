@@ -0,0 +1,225 @@
+# letter_files/storage.py
+"""
+Дедуплицирующее (content-addressed) хранилище файлов писем.
+
+Один и тот же скан часто прикрепляют к письму CERT, к ответу и к внешнему
+письму — раньше на диске появлялась новая копия каждый раз. Теперь:
+
+  - при записи SHA-256 считается на лету, содержимое кладётся один раз
+    в _blobs/ab/cd/<sha256> (повтор — запись пропускается);
+  - по обычному имени (cert_letters/..., external_letters/...) создаётся
+    жёсткая ссылка на blob: path()/url()/open() работают как раньше;
+  - StoredFile связывает имя с Blob, Blob.refcount считает ссылки;
+  - delete() снимает ссылку, blob удаляет gc_blobs, когда ссылок не осталось.
+
+Файлы, записанные до перехода (без StoredFile), не трогаются — их
+подхватывает команда adopt_letter_files.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = "_blobs"
+BLOCK_SIZE = 1024 * 1024
+
+
+def _models():
+    # модели letter_files импортируют модели писем, а те — это хранилище
+    return apps.get_model("letter_files", "Blob"), apps.get_model("letter_files", "StoredFile")
+
+
+def blob_name(sha256):
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    # ---- запись ----
+
+    def _spool(self, content):
+        """Пишет содержимое во временный файл рядом с blob-ами, считая SHA-256."""
+        tmp_dir = self.path(os.path.join(BLOB_DIR, "tmp"))
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in content.chunks(BLOCK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest(), size
+
+    def _store_blob(self, content):
+        """Кладёт содержимое в blob (если такого ещё нет); возвращает Blob."""
+        Blob, _ = _models()
+        if hasattr(content, "temporary_file_path"):
+            # уже лежит на диске (загрузка по частям, TemporaryUploadedFile):
+            # blob — жёсткая ссылка на него, сам файл удалит его владелец
+            source = content.temporary_file_path()
+            sha256 = getattr(content, "sha256", None) or hash_file(source)
+            size = os.path.getsize(source)
+            tmp_path = None
+        else:
+            tmp_path, sha256, size = self._spool(content)
+            source = tmp_path
+
+        final = self.path(blob_name(sha256))
+        try:
+            if not os.path.exists(final):
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                if tmp_path:
+                    os.replace(tmp_path, final)
+                    tmp_path = None
+                else:
+                    try:
+                        os.link(source, final)
+                    except FileExistsError:
+                        pass
+                    except OSError:
+                        shutil.copyfile(source, final)
+                self._fix_permissions(final)
+        finally:
+            if tmp_path:
+                # такое содержимое уже есть — запись пропускается
+                os.unlink(tmp_path)
+
+        try:
+            with transaction.atomic():
+                blob, _ = Blob.objects.get_or_create(
+                    sha256=sha256, defaults={"size": size})
+        except IntegrityError:
+            blob = Blob.objects.get(sha256=sha256)
+        return blob
+
+    def _fix_permissions(self, full_path):
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def _link(self, blob, name):
+        """Создаёт файл name как жёсткую ссылку на blob; возвращает итоговое имя."""
+        source = self.path(blob_name(blob.sha256))
+        while True:
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                os.link(source, full_path)
+            except FileExistsError:
+                name = self.get_available_name(name)
+                continue
+            except OSError:
+                # ФС без жёстких ссылок — обычная копия (без экономии места)
+                try:
+                    with open(full_path, "xb") as out, open(source, "rb") as src:
+                        shutil.copyfileobj(src, out, BLOCK_SIZE)
+                except FileExistsError:
+                    name = self.get_available_name(name)
+                    continue
+            return name
+
+    def _save(self, name, content):
+        Blob, StoredFile = _models()
+        blob = self._store_blob(content)
+        name = self._link(blob, name)
+        StoredFile.objects.create(name=name.replace("\\", "/"), blob=blob)
+        Blob.objects.filter(pk=blob.pk).update(refcount=F("refcount") + 1)
+        return name.replace("\\", "/")
+
+    def adopt(self, name):
+        """
+        Переводит уже лежащий на диске файл (записанный до перехода) под учёт:
+        дубликат заменяется жёсткой ссылкой на существующий blob.
+        Возвращает (Blob, сколько байт освобождено) или None, если файла нет.
+        """
+        Blob, StoredFile = _models()
+        if StoredFile.objects.filter(name=name).exists():
+            return None
+        full_path = self.path(name)
+        if not os.path.isfile(full_path):
+            return None
+
+        sha256 = hash_file(full_path)
+        final = self.path(blob_name(sha256))
+        freed = 0
+        if not os.path.exists(final):
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            try:
+                os.link(full_path, final)
+            except OSError:
+                shutil.copyfile(full_path, final)
+        elif not os.path.samefile(full_path, final):
+            # то же содержимое уже есть: заменяем копию ссылкой (атомарно)
+            tmp_path = f"{full_path}.cas-tmp"
+            os.link(final, tmp_path)
+            freed = os.path.getsize(full_path)
+            os.replace(tmp_path, full_path)
+
+        try:
+            with transaction.atomic():
+                blob, _ = Blob.objects.get_or_create(
+                    sha256=sha256, defaults={"size": os.path.getsize(final)})
+        except IntegrityError:
+            blob = Blob.objects.get(sha256=sha256)
+        StoredFile.objects.create(name=name, blob=blob)
+        Blob.objects.filter(pk=blob.pk).update(refcount=F("refcount") + 1)
+        return blob, freed
+
+    # ---- удаление ----
+
+    def release(self, name):
+        """
+        Снимает ссылку name на blob (файл по имени удаляется, blob — нет).
+        Файлы, записанные до перехода на это хранилище, не трогает.
+        """
+        Blob, StoredFile = _models()
+        stored = StoredFile.objects.filter(name=name).first()
+        if stored is None:
+            return False
+        super().delete(name)
+        stored.delete()
+        Blob.objects.filter(pk=stored.blob_id).update(refcount=F("refcount") - 1)
+        return True
+
+    def delete(self, name):
+        if not self.release(name):
+            super().delete(name)
+
+    def delete_blob(self, blob):
+        path = self.path(blob_name(blob.sha256))
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+_storage = None
+
+
+def letter_storage():
+    """Хранилище для файловых полей писем (callable для FileField.storage)."""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
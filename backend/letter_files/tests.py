@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from .models import Blob, StoredFile
+from .storage import blob_name, letter_storage
+
+
+class StorageTestCase(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings = self.settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.storage = letter_storage()
+
+    def save(self, name, data):
+        return self.storage.save(name, ContentFile(data))
+
+    def blob_path(self, blob):
+        return self.storage.path(blob_name(blob.sha256))
+
+    def gc(self, *args):
+        out = StringIO()
+        call_command("gc_blobs", *args, stdout=out)
+        return out.getvalue()
+
+    def age(self, blob, hours=2):
+        Blob.objects.filter(pk=blob.pk).update(
+            created_at=blob.created_at - timedelta(hours=hours))
+
+
+class DedupeTests(StorageTestCase):
+    """Одинаковое содержимое лежит на диске один раз."""
+
+    def test_same_content_is_hardlinked(self):
+        first = self.save("cert_letters/a.pdf", b"scan" * 1000)
+        second = self.save("external_letters/b.pdf", b"scan" * 1000)
+
+        blob = Blob.objects.get()
+        self.assertEqual((blob.refcount, blob.size), (2, 4000))
+        self.assertEqual(
+            set(StoredFile.objects.values_list("name", flat=True)), {first, second})
+        path = self.blob_path(blob)
+        self.assertTrue(os.path.samefile(self.storage.path(first), path))
+        self.assertTrue(os.path.samefile(self.storage.path(second), path))
+        self.assertEqual(os.stat(path).st_nlink, 3)
+        with self.storage.open(second) as fh:
+            self.assertEqual(fh.read(), b"scan" * 1000)
+
+    def test_name_clash_gets_new_name(self):
+        first = self.save("cert_letters/a.pdf", b"one")
+        second = self.save("cert_letters/a.pdf", b"two")
+        self.assertNotEqual(first, second)
+        self.assertEqual(Blob.objects.count(), 2)
+        with self.storage.open(first) as fh:
+            self.assertEqual(fh.read(), b"one")
+
+    def test_different_content_different_blobs(self):
+        self.save("cert_letters/a.pdf", b"one")
+        self.save("cert_letters/b.pdf", b"two")
+        self.assertEqual(list(Blob.objects.values_list("refcount", flat=True)), [1, 1])
+
+
+class ReleaseTests(StorageTestCase):
+
+    def test_release_decrements_refcount_and_keeps_blob(self):
+        first = self.save("cert_letters/a.pdf", b"scan")
+        second = self.save("cert_letters/b.pdf", b"scan")
+        blob = Blob.objects.get()
+
+        self.storage.delete(first)
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+        self.assertFalse(self.storage.exists(first))
+        self.assertFalse(StoredFile.objects.filter(name=first).exists())
+        self.assertTrue(self.storage.exists(second))
+
+        self.storage.delete(second)
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 0)
+        # содержимое удаляет только gc_blobs
+        self.assertTrue(os.path.exists(self.blob_path(blob)))
+
+    def test_release_of_unknown_name(self):
+        self.assertFalse(self.storage.release("cert_letters/missing.pdf"))
+
+    def test_delete_of_legacy_file(self):
+        # файл, записанный до перехода на хранилище (без StoredFile)
+        path = self.storage.path("cert_letters/old.pdf")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as fh:
+            fh.write(b"old")
+        self.storage.delete("cert_letters/old.pdf")
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(Blob.objects.exists())
+
+
+class GcBlobsTests(StorageTestCase):
+
+    def test_removes_only_old_unreferenced_blobs(self):
+        kept = self.save("cert_letters/kept.pdf", b"kept")
+        self.save("cert_letters/gone.pdf", b"gone")
+        self.save("cert_letters/young.pdf", b"young")
+        self.storage.delete("cert_letters/gone.pdf")
+        self.storage.delete("cert_letters/young.pdf")
+        referenced = Blob.objects.get(files__name=kept)
+        gone = Blob.objects.get(size=4, refcount=0)
+        young = Blob.objects.get(size=5)
+        self.age(referenced)
+        self.age(gone)
+
+        self.assertIn("будет удалено: 1", self.gc("--dry-run"))
+        self.assertEqual(Blob.objects.count(), 3)
+
+        self.assertIn("удалено: 1", self.gc())
+        self.assertEqual(
+            set(Blob.objects.values_list("pk", flat=True)), {referenced.pk, young.pk})
+        self.assertFalse(os.path.exists(self.blob_path(gone)))
+        self.assertTrue(os.path.exists(self.blob_path(referenced)))
+        self.assertTrue(os.path.exists(self.blob_path(young)))
+        with self.storage.open(kept) as fh:
+            self.assertEqual(fh.read(), b"kept")
+
+        # после grace-периода уходит и молодой blob
+        self.age(young)
+        self.gc()
+        self.assertEqual(list(Blob.objects.values_list("pk", flat=True)), [referenced.pk])
+
+    def test_repairs_refcounts(self):
+        name = self.save("cert_letters/a.pdf", b"scan")
+        lost = self.save("cert_letters/b.pdf", b"lost")
+        blob = Blob.objects.get(files__name=name)
+        orphan = Blob.objects.get(files__name=lost)
+        # счётчики разошлись со ссылками (сбой между записью и увеличением)
+        Blob.objects.filter(pk=blob.pk).update(refcount=0)
+        StoredFile.objects.filter(name=lost).delete()
+        self.age(blob)
+        self.age(orphan)
+
+        self.assertIn("исправлено счётчиков: 2", self.gc())
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+        self.assertTrue(os.path.exists(self.blob_path(blob)))
+        self.assertFalse(Blob.objects.filter(pk=orphan.pk).exists())
+
+    def test_dry_run_does_not_repair(self):
+        self.save("cert_letters/a.pdf", b"scan")
+        Blob.objects.update(refcount=5)
+        self.gc("--dry-run")
+        self.assertEqual(Blob.objects.get().refcount, 5)
@@ -0,0 +1,222 @@
+# letter_files/uploads.py
+"""
+Загрузка файлов по частям.
+
+Части не проходят через upload handlers Django: тело PUT-запроса читается
+блоками и пишется прямо в .part-файл по смещению, так что память процесса
+не зависит от размера скана. При завершении файл сверяется по SHA-256 и
+переносится в хранилище переименованием (без копирования), после чего
+прикрепляется к письму / ответу.
+"""
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from cert_documents.models import CertLetter, CertLetterFile
+
+from .models import ChunkedUpload
+from .registry import SOURCES, FileKind
+
+BLOCK_SIZE = 1024 * 1024
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+class UploadError(Exception):
+    """Ошибка клиента; status — HTTP-код ответа."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def max_chunk_size():
+    return getattr(settings, "CHUNKED_UPLOAD_MAX_CHUNK", 16 * 1024 * 1024)
+
+
+def max_file_size():
+    return getattr(settings, "CHUNKED_UPLOAD_MAX_SIZE", 1024 * 1024 * 1024)
+
+
+def upload_dir():
+    # по умолчанию внутри MEDIA_ROOT: та же файловая система → перенос без копирования
+    return str(getattr(settings, "CHUNKED_UPLOAD_DIR", None)
+               or os.path.join(settings.MEDIA_ROOT, "chunked_uploads"))
+
+
+def part_path(upload):
+    return os.path.join(upload_dir(), f"{upload.pk}.part")
+
+
+def discard(upload):
+    try:
+        os.unlink(part_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def parse_content_range(header, upload):
+    """'bytes 0-1048575/73400320' → (start, length)."""
+    match = _CONTENT_RANGE.match((header or "").strip())
+    if not match:
+        raise UploadError("Нужен заголовок Content-Range: bytes start-end/total")
+    start, end, total = match.groups()
+    start, end = int(start), int(end)
+    if end < start:
+        raise UploadError("Неверный Content-Range")
+    if total != "*" and int(total) != upload.total_size:
+        raise UploadError("Размер в Content-Range не совпадает с заявленным")
+    if end >= upload.total_size:
+        raise UploadError("Часть выходит за пределы файла")
+    return start, end - start + 1
+
+
+def write_chunk(upload, stream, start, length):
+    """
+    Пишет часть из потока запроса по смещению start.
+    Часть должна начинаться ровно там, где закончилась принятая.
+    Повтор последней принятой части (клиент не получил ответ из-за
+    обрыва) ничего не пишет и просто подтверждает смещение.
+    Возвращает новое смещение.
+    """
+    if upload.status != ChunkedUpload.Status.UPLOADING:
+        raise UploadError("Загрузка уже завершена", status=409)
+    if start < upload.received and start + length == upload.received:
+        return upload.received
+    if start != upload.received:
+        raise UploadError(f"Ожидается часть со смещения {upload.received}", status=409)
+    if length > max_chunk_size():
+        raise UploadError(f"Часть больше {max_chunk_size()} байт", status=413)
+
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    with open(path, "r+b" if os.path.exists(path) else "wb") as fh:
+        fh.seek(start)
+        while written < length:
+            block = stream.read(min(BLOCK_SIZE, length - written))
+            if not block:
+                break
+            fh.write(block)
+            written += len(block)
+        fh.truncate()
+    if written != length:
+        raise UploadError(f"Получено {written} байт вместо {length}")
+
+    # условный UPDATE: параллельный повтор той же части не сдвинет смещение дважды
+    moved = ChunkedUpload.objects.filter(
+        pk=upload.pk, received=start, status=ChunkedUpload.Status.UPLOADING,
+    ).update(received=start + length)
+    if not moved:
+        raise UploadError("Часть уже принята другим запросом", status=409)
+    upload.received = start + length
+    return upload.received
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AssembledFile(File):
+    """
+    Собранный .part-файл. temporary_file_path() подсказывает хранилищу
+    взять файл с диска (перенос или жёсткая ссылка), а не копировать его;
+    sha256 уже проверен — хранилищу не нужно считать его заново.
+    """
+    sha256 = None
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def _attach_target(kind, target_id):
+    """Объект, в файловое поле которого кладётся загрузка."""
+    source = SOURCES[kind]
+    if kind == FileKind.CERT_FILE:
+        # для файлов письма CERT target_id — id письма: добавляется новый файл
+        letter = CertLetter.objects.filter(pk=target_id).first()
+        if letter is None:
+            raise UploadError("Письмо не найдено", status=404)
+        return source, CertLetterFile(letter=letter)
+    obj = source.model.objects.filter(pk=target_id).first()
+    if obj is None:
+        raise UploadError("Объект не найден", status=404)
+    return source, obj
+
+
+def complete(upload, kind, target_id):
+    """
+    Проверяет размер и SHA-256, переносит файл и прикрепляет к объекту.
+    Загрузка сначала забирается условным UPDATE (uploading → assembling):
+    повтор complete, пришедший параллельно с исходным, получит 409.
+    """
+    if upload.status != ChunkedUpload.Status.UPLOADING:
+        raise UploadError("Загрузка уже завершена", status=409)
+    if kind not in SOURCES:
+        raise UploadError(f"Неизвестный тип: {kind}")
+    if upload.received != upload.total_size:
+        raise UploadError(
+            f"Принято {upload.received} из {upload.total_size} байт", status=409)
+    claimed = ChunkedUpload.objects.filter(
+        pk=upload.pk, status=ChunkedUpload.Status.UPLOADING, received=upload.total_size,
+    ).update(status=ChunkedUpload.Status.ASSEMBLING, updated_at=timezone.now())
+    if not claimed:
+        raise UploadError("Загрузка уже завершается другим запросом", status=409)
+    upload.status = ChunkedUpload.Status.ASSEMBLING
+
+    try:
+        return _assemble(upload, kind, target_id)
+    except UploadError:
+        raise
+    except Exception:
+        # .part на месте — загрузку можно завершить повторно
+        _release(upload)
+        raise
+
+
+def _release(upload):
+    ChunkedUpload.objects.filter(
+        pk=upload.pk, status=ChunkedUpload.Status.ASSEMBLING,
+    ).update(status=ChunkedUpload.Status.UPLOADING)
+    upload.status = ChunkedUpload.Status.UPLOADING
+
+
+def _assemble(upload, kind, target_id):
+    path = part_path(upload)
+    digest = file_sha256(path)
+    if digest != upload.sha256:
+        upload.status = ChunkedUpload.Status.FAILED
+        upload.error = "Контрольная сумма не совпадает"
+        upload.save(update_fields=["status", "error", "updated_at"])
+        discard(upload)
+        raise UploadError(upload.error)
+
+    try:
+        source, obj = _attach_target(kind, target_id)
+    except UploadError:
+        # неверная цель — клиент может повторить complete с правильной
+        _release(upload)
+        raise
+    with transaction.atomic():
+        if isinstance(obj, CertLetterFile):
+            obj.original_name = upload.file_name
+        with open(path, "rb") as fh:
+            content = AssembledFile(fh)
+            content.sha256 = digest
+            source.file_of(obj).save(upload.file_name, content, save=True)
+        upload.status = ChunkedUpload.Status.COMPLETE
+        upload.target_kind = kind
+        upload.target_id = target_id
+        upload.save(update_fields=["status", "target_kind", "target_id", "updated_at"])
+    # на случай хранилища, которое скопировало файл, а не перенесло
+    discard(upload)
+    return obj
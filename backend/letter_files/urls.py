@@ -0,0 +1,17 @@
+# letter_files/urls.py
+from django.urls import re_path
+from rest_framework.routers import DefaultRouter
+
+from .registry import FileKind
+from .views import ChunkedUploadViewSet, FileDownloadView
+
+router = DefaultRouter()
+router.register("uploads", ChunkedUploadViewSet, basename="chunked-upload")
+
+urlpatterns = router.urls + [
+    re_path(
+        rf"^(?P<kind>{'|'.join(FileKind.values)})/(?P<pk>\d+)/$",
+        FileDownloadView.as_view(),
+        name="file-download",
+    ),
+]
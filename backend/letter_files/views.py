@@ -0,0 +1,91 @@
+# letter_files/views.py
+from django.http import Http404
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import downloads, uploads
+from .models import ChunkedUpload
+from .registry import SOURCES
+from .serializers import ChunkedUploadSerializer, CompleteUploadSerializer
+
+
+class ChunkedUploadViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Загрузка больших файлов по частям (возобновляемая):
+
+      POST   /api/files/uploads/                {file_name, total_size, sha256}
+      PUT    /api/files/uploads/<id>/chunk/     тело — байты части,
+                                                Content-Range: bytes start-end/total
+      GET    /api/files/uploads/<id>/           received — с какого байта продолжать
+      POST   /api/files/uploads/<id>/complete/  {target, target_id}
+      DELETE /api/files/uploads/<id>/           отмена
+    """
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    def get_queryset(self):
+        # чужие загрузки не видны
+        return ChunkedUpload.objects.filter(owner=self.request.user)
+
+    def perform_destroy(self, instance):
+        uploads.discard(instance)
+        instance.delete()
+
+    @action(detail=True, methods=["put"], url_path="chunk")
+    def chunk(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            start, length = uploads.parse_content_range(
+                request.headers.get("Content-Range"), upload)
+            if int(request.headers.get("Content-Length") or 0) != length:
+                raise uploads.UploadError("Content-Length не совпадает с Content-Range")
+            # request.stream — сырое тело запроса, DRF-парсеры не задействуются
+            uploads.write_chunk(upload, request.stream, start, length)
+        except uploads.UploadError as exc:
+            return Response(
+                {"detail": str(exc), "received": upload.received}, status=exc.status)
+        return Response({"received": upload.received, "total_size": upload.total_size})
+
+    @action(detail=True, methods=["post"], url_path="complete")
+    def complete(self, request, pk=None):
+        upload = self.get_object()
+        params = CompleteUploadSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            uploads.complete(
+                upload, params.validated_data["target"], params.validated_data["target_id"])
+        except uploads.UploadError as exc:
+            return Response({"detail": str(exc)}, status=exc.status)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
+
+
+class FileDownloadView(APIView):
+    """
+    GET /api/files/<kind>/<id>/   (kind: cert_file | cert_reply | external | external_reply)
+    ?download=1 — Content-Disposition: attachment (по умолчанию inline).
+    Поддерживает Range, If-Modified-Since / If-None-Match.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, kind, pk):
+        source = SOURCES.get(kind)
+        if source is None:
+            raise Http404
+        obj = source.model.objects.filter(pk=pk).first()
+        field_file = source.file_of(obj) if obj is not None else None
+        if not field_file or not field_file.storage.exists(field_file.name):
+            raise Http404
+        return downloads.serve(
+            request, field_file,
+            filename=getattr(obj, "original_name", "") or None,
+            as_attachment=request.query_params.get("download") in ("1", "true"),
+        )
@@ -0,0 +1,209 @@
+# letter_files/worker.py
+"""
+Очередь извлечения текста и пул процессов для её разбора.
+
+Разбор PDF упирается в CPU, поэтому файлы разбираются в отдельных
+процессах (multiprocessing.Pool), а не в потоках: GIL не даёт потокам
+параллелить такой код. Родитель забирает пачку задач (UPDATE ... WHERE
+status='pending' — двум воркерам одна задача не достанется), дочерние
+процессы только извлекают текст, а родитель сохраняет FileText
+и обновляет поисковый документ.
+"""
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .extraction import UnsupportedFile, extract_text
+from .models import FileText, TextExtractionTask
+from .registry import SOURCES
+
+logger = logging.getLogger(__name__)
+
+Status = TextExtractionTask.Status
+
+MAX_ATTEMPTS = 3
+
+
+# ---- постановка в очередь ----
+
+def enqueue(source, obj):
+    """Ставит (или переставляет) файл объекта в очередь. Пустой файл — убирает текст."""
+    name = source.file_of(obj).name or ""
+    if not name:
+        forget(source, obj.pk, source.letter_id_of(obj))
+        return None
+    task, _ = TextExtractionTask.objects.update_or_create(
+        file_kind=source.kind, file_id=obj.pk,
+        defaults={
+            "file_name": name,
+            "status": Status.PENDING,
+            "attempts": 0,
+            "error": "",
+            "started_at": None,
+            "finished_at": None,
+        },
+    )
+    return task
+
+
+def forget(source, file_id, letter_id):
+    """Файл удалён или очищен: убираем текст и задачу, обновляем документ письма."""
+    TextExtractionTask.objects.filter(file_kind=source.kind, file_id=file_id).delete()
+    deleted, _ = FileText.objects.filter(file_kind=source.kind, file_id=file_id).delete()
+    if deleted and letter_id:
+        _reindex_letter(source.letter_kind, letter_id)
+
+
+def _reindex_letter(letter_kind, letter_id):
+    from letter_search.indexing import reindex
+    reindex(letter_kind, ids=[letter_id])
+
+
+# ---- выполнение ----
+
+def claim(limit):
+    """Забирает до limit задач из очереди; возвращает их id."""
+    candidates = list(
+        TextExtractionTask.objects
+        .filter(status=Status.PENDING)
+        .order_by("id")
+        .values_list("pk", flat=True)[:limit]
+    )
+    claimed = []
+    now = timezone.now()
+    for pk in candidates:
+        # условный UPDATE: параллельный воркер мог забрать задачу раньше
+        if TextExtractionTask.objects.filter(pk=pk, status=Status.PENDING).update(
+                status=Status.RUNNING, started_at=now):
+            claimed.append(pk)
+    return claimed
+
+
+def _local_path(field_file):
+    """Путь к файлу на диске; для не-локальных хранилищ — временная копия."""
+    try:
+        return field_file.path, None
+    except NotImplementedError:
+        suffix = os.path.splitext(field_file.name)[1]
+        tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        with field_file.open("rb") as src, tmp:
+            shutil.copyfileobj(src, tmp)
+        return tmp.name, tmp.name
+
+
+def extract_job(path):
+    """
+    Выполняется в дочернем процессе: только разбор файла, без обращений к БД.
+    Возвращает (статус, текст или сообщение об ошибке).
+    """
+    try:
+        return Status.DONE.value, extract_text(path)
+    except UnsupportedFile as exc:
+        return Status.SKIPPED.value, str(exc)
+    except Exception as exc:
+        return Status.FAILED.value, f"{type(exc).__name__}: {exc}"
+
+
+def _prepare(task_ids):
+    """Загружает задачи и их файлы; задачи удалённых файлов снимает с очереди."""
+    jobs = []
+    for task in TextExtractionTask.objects.filter(pk__in=task_ids).order_by("pk"):
+        source = SOURCES[task.file_kind]
+        obj = source.model.objects.filter(pk=task.file_id).first()
+        field_file = source.file_of(obj) if obj is not None else None
+        if obj is None or not field_file:
+            # файл успели удалить — сигнал post_delete уже всё почистил
+            task.delete()
+            continue
+        try:
+            path, tmp_path = _local_path(field_file)
+        except Exception as exc:
+            _finish(task, Status.FAILED.value, f"{type(exc).__name__}: {exc}")
+            continue
+        jobs.append((task, source, obj, path, tmp_path))
+    return jobs
+
+
+def _finish(task, status, message, source=None, obj=None):
+    task.attempts += 1
+    if status == Status.DONE:
+        letter_id = source.letter_id_of(obj)
+        with transaction.atomic():
+            FileText.objects.update_or_create(
+                file_kind=task.file_kind, file_id=task.file_id,
+                defaults={
+                    "file_name": source.file_of(obj).name,
+                    "letter_kind": source.letter_kind,
+                    "letter_id": letter_id,
+                    "text": message,
+                    "extracted_at": timezone.now(),
+                },
+            )
+            _reindex_letter(source.letter_kind, letter_id)
+        message = ""
+    elif status == Status.FAILED:
+        logger.warning("Не удалось извлечь текст из %s: %s", task.file_name, message)
+        if task.attempts < MAX_ATTEMPTS:
+            status = Status.PENDING.value
+
+    # файл могли заменить, пока шло извлечение: тогда задачу уже переставили
+    # в pending — не затираем это состояние
+    TextExtractionTask.objects.filter(pk=task.pk, status=Status.RUNNING).update(
+        status=status, attempts=task.attempts, error=message,
+        finished_at=timezone.now(),
+    )
+    return status
+
+
+def requeue_stale(older_than):
+    """Задачи, зависшие в running (воркер упал), возвращает в очередь."""
+    return TextExtractionTask.objects.filter(
+        status=Status.RUNNING, started_at__lt=older_than,
+    ).update(status=Status.PENDING)
+
+
+def run(processes=None, batch_size=50, on_batch=None):
+    """
+    Разбирает очередь пачками, пока она не опустеет.
+    Разбор файлов — в пуле процессов, запись результатов — в текущем процессе
+    (одна пишущая сторона: без блокировок SQLite и лишних соединений с БД).
+    processes=1 — всё в текущем процессе, без пула.
+    Возвращает словарь {статус: количество}.
+    """
+    processes = processes or os.cpu_count() or 1
+    totals = {}
+    pool = None
+    try:
+        while True:
+            ids = claim(batch_size)
+            if not ids:
+                break
+            jobs = _prepare(ids)
+            paths = [job[3] for job in jobs]
+
+            if processes == 1:
+                outcomes = [extract_job(path) for path in paths]
+            else:
+                if pool is None:
+                    # дочерние процессы не должны наследовать открытые соединения
+                    connections.close_all()
+                    pool = multiprocessing.Pool(processes)
+                outcomes = pool.map(extract_job, paths, chunksize=1)
+
+            for (task, source, obj, _, tmp_path), (status, message) in zip(jobs, outcomes):
+                if tmp_path:
+                    os.unlink(tmp_path)
+                status = _finish(task, status, message, source, obj)
+                totals[status] = totals.get(status, 0) + 1
+            if on_batch:
+                on_batch(totals)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return totals
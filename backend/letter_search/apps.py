@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class LetterSearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'letter_search'
+
+    def ready(self):
+        from . import signals  # noqa
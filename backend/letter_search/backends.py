@@ -0,0 +1,173 @@
+# letter_search/backends.py
+"""
+Полнотекстовый поиск по SearchDocument для разных СУБД.
+
+  - SQLite      → FTS5 (letter_search_fts), ранжирование bm25()
+  - PostgreSQL  → tsvector (search_vector) + GIN, ранжирование ts_rank()
+  - прочие / FTS5 недоступен → запасной вариант через icontains
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import SearchDocument
+
+FTS_TABLE = "letter_search_fts"
+DOC_TABLE = SearchDocument._meta.db_table
+
+# заголовок весит больше текста
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+def tokenize(query):
+    return [t for t in re.findall(r"\w+", (query or "").lower()) if t]
+
+
+@dataclass
+class Hit:
+    id: int
+    kind: str
+    object_id: int
+    title: str
+    date: object
+    rank: float
+    snippet: str
+
+
+class SQLiteFTSBackend:
+    name = "sqlite-fts5"
+
+    def match_expression(self, tokens):
+        # каждое слово — префиксный поиск, все слова обязательны (AND)
+        return " ".join(f'"{t}"*' for t in tokens)
+
+    def search(self, query, kinds=None, limit=20, offset=0):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        sql = (
+            f"SELECT d.id, d.kind, d.object_id, d.title, d.date, "
+            f"bm25({FTS_TABLE}, %s, %s) AS rank, "
+            f"snippet({FTS_TABLE}, 1, '[', ']', '…', 12) "
+            f"FROM {FTS_TABLE} JOIN {DOC_TABLE} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [TITLE_WEIGHT, BODY_WEIGHT, self.match_expression(tokens)]
+        if kinds:
+            sql += f" AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+            params.extend(kinds)
+        # bm25: чем меньше, тем релевантнее
+        sql += " ORDER BY rank LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        return [
+            Hit(id=r[0], kind=r[1], object_id=r[2], title=r[3],
+                date=SearchDocument._meta.get_field("date").to_python(r[4]),
+                rank=-r[5], snippet=r[6] or "")
+            for r in rows
+        ]
+
+    def matching_ids(self, query, kind):
+        """Подзапрос object_id для фильтрации queryset-ов (?search=)."""
+        tokens = tokenize(query)
+        sql = (
+            f"SELECT d.object_id FROM {FTS_TABLE} "
+            f"JOIN {DOC_TABLE} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.kind = %s"
+        )
+        return RawSQL(sql, [self.match_expression(tokens), kind])
+
+
+class PostgresFTSBackend:
+    name = "postgres-tsvector"
+    config = "simple"
+
+    def tsquery(self, tokens):
+        return " & ".join(f"{t}:*" for t in tokens)
+
+    def search(self, query, kinds=None, limit=20, offset=0):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        sql = (
+            f"SELECT d.id, d.kind, d.object_id, d.title, d.date, "
+            f"ts_rank(d.search_vector, q) AS rank, "
+            f"ts_headline('{self.config}', d.body, q, "
+            f"'StartSel=[,StopSel=],MaxWords=24,MinWords=8') "
+            f"FROM {DOC_TABLE} d, to_tsquery('{self.config}', %s) q "
+            f"WHERE d.search_vector @@ q"
+        )
+        params = [self.tsquery(tokens)]
+        if kinds:
+            sql += f" AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+            params.extend(kinds)
+        sql += " ORDER BY rank DESC LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        return [
+            Hit(id=r[0], kind=r[1], object_id=r[2], title=r[3], date=r[4],
+                rank=float(r[5]), snippet=r[6] or "")
+            for r in rows
+        ]
+
+    def matching_ids(self, query, kind):
+        sql = (
+            f"SELECT object_id FROM {DOC_TABLE} "
+            f"WHERE search_vector @@ to_tsquery('{self.config}', %s) AND kind = %s"
+        )
+        return RawSQL(sql, [self.tsquery(tokenize(query)), kind])
+
+
+class FallbackBackend:
+    """Без полнотекстового индекса: LIKE по документам (медленно, но работает)."""
+    name = "icontains"
+
+    def _filter(self, tokens):
+        condition = Q()
+        for t in tokens:
+            condition &= Q(title__icontains=t) | Q(body__icontains=t)
+        return SearchDocument.objects.filter(condition)
+
+    def search(self, query, kinds=None, limit=20, offset=0):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        qs = self._filter(tokens)
+        if kinds:
+            qs = qs.filter(kind__in=kinds)
+        qs = qs.order_by("-date", "-id")[offset:offset + limit]
+        return [
+            Hit(id=d.id, kind=d.kind, object_id=d.object_id, title=d.title,
+                date=d.date, rank=0.0, snippet=d.body[:200])
+            for d in qs
+        ]
+
+    def matching_ids(self, query, kind):
+        return self._filter(tokenize(query)).filter(kind=kind).values("object_id")
+
+
+_fts5_available = {}
+
+
+def fts5_table_exists():
+    # положительный ответ запоминаем, чтобы не дёргать introspection на каждый запрос
+    name = str(connection.settings_dict["NAME"])
+    if not _fts5_available.get(name):
+        _fts5_available[name] = FTS_TABLE in connection.introspection.table_names()
+    return _fts5_available[name]
+
+
+def get_backend():
+    if connection.vendor == "postgresql":
+        return PostgresFTSBackend()
+    if connection.vendor == "sqlite" and fts5_table_exists():
+        return SQLiteFTSBackend()
+    return FallbackBackend()
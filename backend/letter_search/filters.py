@@ -0,0 +1,18 @@
+# letter_search/filters.py
+from rest_framework.filters import SearchFilter
+
+from .backends import get_backend, tokenize
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ?search= через полнотекстовый индекс вместо LIKE '%x%' по search_fields.
+    View указывает search_kind (SearchDocument.Kind); без него — обычный SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, "search_kind", None)
+        query = request.query_params.get(self.search_param, "")
+        if not kind or not tokenize(query):
+            return super().filter_queryset(request, queryset, view)
+        return queryset.filter(pk__in=get_backend().matching_ids(query, kind))
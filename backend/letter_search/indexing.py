@@ -0,0 +1,130 @@
+# letter_search/indexing.py
+"""
+Сборка поисковых документов из писем (вместе с текстом вложений) и их синхронизация.
+"""
+from cert_documents.models import CertLetter
+from external_letters.models import ExternalLetter
+from letter_files.models import FileText
+
+from .models import SearchDocument
+
+Kind = SearchDocument.Kind
+
+# сколько текста вложений попадает в документ одного письма
+MAX_FILES_TEXT = 200_000
+
+
+def _join(*parts):
+    return "\n".join(p.strip() for p in parts if p and p.strip())
+
+
+def cert_document(letter):
+    return {
+        "title": letter.subject or "",
+        "body": _join(letter.number, letter.description, letter.system),
+        "date": letter.date,
+    }
+
+
+def external_document(letter):
+    category = letter.category.name if letter.category_id else ""
+    return {
+        "title": letter.title or "",
+        "body": _join(
+            letter.letter_number,
+            letter.internal_letter_number,
+            letter.executor,
+            letter.description,
+            category,
+        ),
+        "date": letter.registration_date or letter.incoming_date or letter.time_create.date(),
+    }
+
+
+def _file_texts(kind, ids):
+    """Извлечённый текст вложений писем: {letter_id: текст} одним запросом."""
+    texts = {}
+    rows = (
+        FileText.objects
+        .filter(letter_kind=kind, letter_id__in=ids)
+        .exclude(text="")
+        .order_by("letter_id", "file_kind", "file_id")
+        .values_list("letter_id", "text")
+    )
+    for letter_id, text in rows:
+        current = texts.get(letter_id, "")
+        if len(current) < MAX_FILES_TEXT:
+            texts[letter_id] = _join(current, text)[:MAX_FILES_TEXT]
+    return texts
+
+
+def _build(kind, obj, file_texts):
+    _, build, _ = BUILDERS[kind]
+    doc = build(obj)
+    doc["body"] = _join(doc["body"], file_texts.get(obj.pk, ""))
+    return doc
+
+
+BUILDERS = {
+    Kind.CERT: (CertLetter, cert_document, ()),
+    Kind.EXTERNAL: (ExternalLetter, external_document, ("category",)),
+}
+
+
+def index_object(kind, obj):
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=obj.pk,
+        defaults=_build(kind, obj, _file_texts(kind, [obj.pk])))
+
+
+def remove_object(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def reindex(kind, ids=None, batch_size=500):
+    """
+    Пересборка документов (всех или по списку id) пачками.
+    Возвращает число проиндексированных объектов.
+    """
+    model, _, related = BUILDERS[kind]
+    qs = model.objects.select_related(*related).order_by("pk")
+    if ids is not None:
+        qs = qs.filter(pk__in=ids)
+
+    total = 0
+    batch = []
+
+    def flush():
+        existing = dict(
+            SearchDocument.objects
+            .filter(kind=kind, object_id__in=[o.pk for o in batch])
+            .values_list("object_id", "pk")
+        )
+        file_texts = _file_texts(kind, [o.pk for o in batch])
+        to_create, to_update = [], []
+        for obj in batch:
+            doc = SearchDocument(kind=kind, object_id=obj.pk, **_build(kind, obj, file_texts))
+            if obj.pk in existing:
+                doc.pk = existing[obj.pk]
+                to_update.append(doc)
+            else:
+                to_create.append(doc)
+        SearchDocument.objects.bulk_create(to_create)
+        # bulk_update идёт через UPDATE — триггеры FTS5 срабатывают так же
+        SearchDocument.objects.bulk_update(to_update, ["title", "body", "date"])
+
+    for obj in qs.iterator(chunk_size=batch_size):
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            flush()
+            total += len(batch)
+            batch = []
+    if batch:
+        flush()
+        total += len(batch)
+
+    if ids is None:
+        # документы удалённых писем
+        SearchDocument.objects.filter(kind=kind).exclude(
+            object_id__in=model.objects.values("pk")).delete()
+    return total
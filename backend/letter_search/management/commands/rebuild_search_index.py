@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from letter_search.backends import FTS_TABLE, fts5_table_exists
+from letter_search.indexing import reindex
+from letter_search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = "Пересобирает поисковые документы писем и полнотекстовый индекс"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind", choices=SearchDocument.Kind.values,
+            help="только один тип писем")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        kinds = [opts["kind"]] if opts["kind"] else SearchDocument.Kind.values
+        for kind in kinds:
+            total = reindex(kind, batch_size=opts["batch_size"])
+            self.stdout.write(f"{kind}: {total}")
+
+        if connection.vendor == "sqlite" and fts5_table_exists():
+            with connection.cursor() as cursor:
+                # на случай рассинхрона триггеров + слияние сегментов индекса
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+        self.stdout.write(self.style.SUCCESS("Индекс пересобран"))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('cert', 'Письмо CERT-CBU'), ('external', 'Внешнее письмо')], max_length=16)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(blank=True, default='', max_length=500)),
+                ('body', models.TextField(blank=True, default='')),
+                ('date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Поисковый документ',
+                'verbose_name_plural': 'Поисковые документы',
+                'indexes': [models.Index(fields=['kind', '-date'], name='letter_sear_kind_d3d948_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_search_document')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def _join(*parts):
+    return "\n".join(p.strip() for p in parts if p and p.strip())
+
+
+def backfill(apps, schema_editor):
+    """Первичная индексация существующих писем (см. также rebuild_search_index)."""
+    CertLetter = apps.get_model("cert_documents", "CertLetter")
+    ExternalLetter = apps.get_model("external_letters", "ExternalLetter")
+    SearchDocument = apps.get_model("letter_search", "SearchDocument")
+
+    docs = []
+    for letter in CertLetter.objects.all().iterator():
+        docs.append(SearchDocument(
+            kind="cert", object_id=letter.pk,
+            title=letter.subject or "",
+            body=_join(letter.number, letter.description, letter.system),
+            date=letter.date,
+        ))
+    for letter in ExternalLetter.objects.select_related("category").iterator():
+        docs.append(SearchDocument(
+            kind="external", object_id=letter.pk,
+            title=letter.title or "",
+            body=_join(
+                letter.letter_number, letter.internal_letter_number,
+                letter.executor, letter.description,
+                letter.category.name if letter.category_id else "",
+            ),
+            date=(letter.registration_date or letter.incoming_date
+                  or letter.time_create.date()),
+        ))
+    SearchDocument.objects.bulk_create(docs, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letter_search', '0002_fulltext_index'),
+        ('cert_documents', '0006_keyset_indexes'),
+        ('external_letters', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
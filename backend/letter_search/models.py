@@ -0,0 +1,38 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Единый поисковый документ по письму (CERT-CBU или внешнему).
+
+    Сама таблица — обычная; полнотекстовый индекс строится поверх неё:
+      - SQLite: FTS5-таблица letter_search_fts (external content) + триггеры;
+      - PostgreSQL: сгенерированная колонка search_vector (tsvector) + GIN.
+    См. миграцию 0002 и backends.py.
+    """
+    class Kind(models.TextChoices):
+        CERT = "cert", "Письмо CERT-CBU"
+        EXTERNAL = "external", "Внешнее письмо"
+
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+
+    title = models.CharField(max_length=500, blank=True, default="")
+    # номера, описание, исполнитель, категория и т.п.
+    body = models.TextField(blank=True, default="")
+    date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Поисковый документ"
+        verbose_name_plural = "Поисковые документы"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="uniq_search_document"),
+        ]
+        indexes = [
+            models.Index(fields=["kind", "-date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.title}"
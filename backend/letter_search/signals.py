@@ -0,0 +1,63 @@
+# letter_search/signals.py
+"""
+Синхронизация поискового индекса с письмами.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from cert_documents.models import CertLetter
+from external_letters.models import ExternalLetter, ExternalLettersCategory
+
+from . import indexing
+from .models import SearchDocument
+
+Kind = SearchDocument.Kind
+
+
+@receiver(post_save, sender=CertLetter)
+def index_cert_letter(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    indexing.index_object(Kind.CERT, instance)
+
+
+@receiver(post_delete, sender=CertLetter)
+def unindex_cert_letter(sender, instance, **kwargs):
+    indexing.remove_object(Kind.CERT, instance.pk)
+
+
+@receiver(post_save, sender=ExternalLetter)
+def index_external_letter(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    indexing.index_object(Kind.EXTERNAL, instance)
+
+
+@receiver(post_delete, sender=ExternalLetter)
+def unindex_external_letter(sender, instance, **kwargs):
+    indexing.remove_object(Kind.EXTERNAL, instance.pk)
+
+
+@receiver(pre_save, sender=ExternalLettersCategory)
+def remember_category_name(sender, instance, raw=False, **kwargs):
+    instance._search_old_name = None
+    if raw or not instance.pk:
+        return
+    instance._search_old_name = (
+        ExternalLettersCategory.objects
+        .filter(pk=instance.pk)
+        .values_list("name", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=ExternalLettersCategory)
+def reindex_category_letters(sender, instance, created=False, raw=False, **kwargs):
+    # название категории входит в текст документа — переиндексируем при переименовании
+    if raw or created:
+        return
+    if getattr(instance, "_search_old_name", None) in (None, instance.name):
+        return
+    ids = list(instance.letters.values_list("pk", flat=True))
+    if ids:
+        indexing.reindex(Kind.EXTERNAL, ids=ids)
@@ -0,0 +1,8 @@
+# letter_search/urls.py
+from rest_framework.routers import DefaultRouter
+from .views import LetterSearchViewSet
+
+router = DefaultRouter()
+router.register("letters", LetterSearchViewSet, basename="letter-search")
+
+urlpatterns = router.urls
@@ -0,0 +1,73 @@
+# letter_search/views.py
+from rest_framework import permissions, viewsets
+from rest_framework.response import Response
+
+from cert_documents.models import CertLetter
+from external_letters.models import ExternalLetter
+
+from .backends import get_backend
+from .models import SearchDocument
+
+Kind = SearchDocument.Kind
+
+
+class LetterSearchViewSet(viewsets.ViewSet):
+    """
+    Ранжированный полнотекстовый поиск по письмам CERT-CBU и внешним письмам.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 100
+
+    def list(self, request):
+        """
+        GET /api/search/letters/?q=банк отчёт
+        Опционально:
+          - kind: cert | external (можно несколько через запятую)
+          - limit (по умолчанию 20, максимум 100), offset
+        """
+        query = request.query_params.get("q", "")
+        kinds = [
+            k for k in request.query_params.get("kind", "").split(",")
+            if k in Kind.values
+        ]
+        try:
+            # отрицательный LIMIT в SQLite — «без ограничения», в PostgreSQL — ошибка
+            limit = max(1, min(int(request.query_params.get("limit", 20)), self.max_limit))
+            offset = max(int(request.query_params.get("offset", 0)), 0)
+        except ValueError:
+            limit, offset = 20, 0
+
+        backend = get_backend()
+        hits = backend.search(query, kinds=kinds or None, limit=limit, offset=offset)
+
+        # номера/slug-и для ссылок на фронте — по одному запросу на тип
+        cert_ids = [h.object_id for h in hits if h.kind == Kind.CERT]
+        ext_ids = [h.object_id for h in hits if h.kind == Kind.EXTERNAL]
+        cert_numbers = dict(
+            CertLetter.objects.filter(pk__in=cert_ids).values_list("pk", "number")
+        ) if cert_ids else {}
+        ext_slugs = dict(
+            ExternalLetter.objects.filter(pk__in=ext_ids).values_list("pk", "slug")
+        ) if ext_ids else {}
+
+        results = []
+        for h in hits:
+            item = {
+                "kind": h.kind,
+                "id": h.object_id,
+                "title": h.title,
+                "date": h.date,
+                "snippet": h.snippet,
+                "rank": h.rank,
+            }
+            if h.kind == Kind.CERT:
+                item["number"] = cert_numbers.get(h.object_id)
+            else:
+                item["slug"] = ext_slugs.get(h.object_id)
+            results.append(item)
+
+        return Response({
+            "backend": backend.name,
+            "query": query,
+            "results": results,
+        })
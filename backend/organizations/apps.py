@@ -4,3 +4,23 @@ from django.apps import AppConfig
 class OrganizationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'organizations'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from backend import counters
+        from backend.etag import track_collection
+        from organizationsStaff.models import OrgUnit
+        from staffUsers.models import StaffCuratorship, StaffProfile
+        from .models import Category, Organization
+
+        # units_tree и responsibles тоже входят в ответ списка организаций
+        track_collection(
+            "organizations",
+            models=(Organization, Category, OrgUnit, StaffCuratorship,
+                    StaffProfile, get_user_model()),
+        )
+
+        counters.register(counters.Counter(
+            Category, Organization, "category", "objects_count",
+            daily=("today_count", "today_date", "time_create"),
+        ))
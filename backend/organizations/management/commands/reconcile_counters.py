@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.counters import COUNTERS, reconcile
+
+
+class Command(BaseCommand):
+    help = ("Сверяет денормализованные счётчики (Category.objects_count и др.) "
+            "с фактическими данными и исправляет разъехавшиеся")
+
+    def add_arguments(self, parser):
+        parser.add_argument("counters", nargs="*",
+                            help="например organizations.Category.objects_count; "
+                                 "по умолчанию — все")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        selected = COUNTERS
+        if opts["counters"]:
+            known = {c.name: c for c in COUNTERS}
+            unknown = [n for n in opts["counters"] if n not in known]
+            if unknown:
+                raise CommandError(
+                    f"Неизвестные счётчики: {', '.join(unknown)}. "
+                    f"Есть: {', '.join(known)}")
+            selected = [known[n] for n in opts["counters"]]
+
+        for counter in selected:
+            fixed = reconcile(counter, batch_size=opts["batch_size"])
+            self.stdout.write(f"{counter.name}: исправлено {fixed}")
+        self.stdout.write(self.style.SUCCESS("Готово"))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:19
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill(apps, schema_editor):
+    """Начальные значения счётчиков (дальше их ведут сигналы, см. backend/counters.py)."""
+    Category = apps.get_model("organizations", "Category")
+    Organization = apps.get_model("organizations", "Organization")
+    today = timezone.localdate()
+
+    def count(**filters):
+        return Coalesce(Subquery(
+            Organization.objects.filter(category=OuterRef("pk"), **filters)
+            .order_by().values("category").annotate(n=Count("pk")).values("n"),
+            output_field=IntegerField(),
+        ), Value(0))
+
+    Category.objects.update(
+        objects_count=count(),
+        today_count=count(time_create__date=today),
+        today_date=today,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_organization_curator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='objects_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='today_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='today_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
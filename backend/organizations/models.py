@@ -10,6 +10,12 @@ class Category(models.Model):
                              default="")
     time_create = models.DateTimeField(auto_now_add=True)
 
+    # денормализованные счётчики организаций (backend/counters.py)
+    objects_count = models.PositiveIntegerField(default=0, editable=False)
+    # создано за день today_date; на другой день читается как 0
+    today_count = models.PositiveIntegerField(default=0, editable=False)
+    today_date = models.DateField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ['name']
 
@@ -1,25 +1,17 @@
-from django.utils.text import slugify
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework import serializers
+from backend.counters import daily_value
+from backend.fieldsets import SparseFieldsMixin
+from backend.slugs import create_with_slug, save_with_slug
 from .models import Category, Organization
-from organizationsStaff.models import OrgUnit
 from organizationsStaff.serializers import OrgUnitTreeSerializer
+from organizationsStaff.tree import units_forest
 from staffUsers.models import StaffProfile, StaffCuratorship
 from django.db import transaction
 User = get_user_model()
 
 
-def unique_slugify(model, base_slug):
-    slug = slugify(base_slug) or "item"
-    original = slug
-    i = 1
-    while model.objects.filter(slug=slug).exists():
-        i += 1
-        slug = f"{original}-{i}"
-    return slug
-
-
 class StaffBriefSerializer(serializers.Serializer):
     id = serializers.IntegerField(source="staff.id", read_only=True)
     username = serializers.CharField(
@@ -34,22 +26,54 @@ class StaffBriefSerializer(serializers.Serializer):
     source = serializers.CharField(read_only=True)
 
 
+def _request_staff(serializer):
+    request = serializer.context.get("request")
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated):
+        return None
+    return getattr(user, "staff", None)
+
+
+class CanEditField(serializers.ReadOnlyField):
+    """
+    Может ли текущий сотрудник редактировать объект. В списках берётся из
+    аннотации can_edit (staffUsers.access), иначе — StaffProfile.<check>.
+    """
+
+    def __init__(self, check, **kwargs):
+        self.check = check
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        value = getattr(obj, "can_edit", None)
+        if value is not None:
+            return bool(value)
+        staff = _request_staff(self.parent)
+        return bool(staff and getattr(staff, self.check)(obj))
+
+
 class CategorySerializer(serializers.ModelSerializer):
     slug = serializers.SlugField(read_only=True)
     objects_count = serializers.IntegerField(read_only=True)
-    today_count = serializers.IntegerField(read_only=True)
+    today_count = serializers.SerializerMethodField()
+    can_edit = CanEditField("can_edit_category")
 
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'badge', 'time_create',
-                  'objects_count', 'today_count']
+                  'objects_count', 'today_count', 'can_edit']
         read_only_fields = ['slug', 'time_create',
                             'objects_count', 'today_count']
 
+    def get_today_count(self, obj):
+        return daily_value(obj.today_count, obj.today_date)
+
     def create(self, validated_data):
-        validated_data['slug'] = unique_slugify(
-            Category, validated_data.get('name', ''))
-        return super().create(validated_data)
+        create = super().create
+        return create_with_slug(
+            Category, validated_data.get('name', ''),
+            lambda slug: create({**validated_data, 'slug': slug}))
 
 
 class UserMiniSerializer(serializers.ModelSerializer):
@@ -58,7 +82,23 @@ class UserMiniSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email"]
 
 
-class OrganizationSerializer(serializers.ModelSerializer):
+class OrganizationListSerializer(serializers.ListSerializer):
+    """
+    Список организаций: деревья подразделений всех организаций страницы
+    читаются одним запросом и раздаются до сериализации.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        # units_tree могли исключить через ?fields= / ?expand=
+        if "units_tree" in self.child.fields:
+            forest = units_forest(org.pk for org in items)
+            for org in items:
+                org._units_forest = forest.get(org.pk, [])
+        return super().to_representation(items)
+
+
+class OrganizationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(
         source="category.name", read_only=True)
     category_slug = serializers.CharField(
@@ -73,6 +113,7 @@ class OrganizationSerializer(serializers.ModelSerializer):
     slug = serializers.SlugField(read_only=True)
     units_tree = serializers.SerializerMethodField()
     responsibles = serializers.SerializerMethodField()
+    can_edit = CanEditField("can_edit_org")
     # primary_responsible = serializers.SerializerMethodField()
 
     class Meta:
@@ -81,17 +122,19 @@ class OrganizationSerializer(serializers.ModelSerializer):
             "id", "slug", "name", "description", "address", "lotus", "phone", "email",
             "category", "category_name", "category_slug", "category_slug_in", "logo",
             "time_create", "updated", "responsibles", "units_tree", "curator",
+            "can_edit",
             # "structure",
         ]
+        # тяжёлые поля: ?fields= / ?expand= (backend.fieldsets)
+        expandable_fields = ("units_tree", "responsibles")
         read_only_fields = ["slug", "time_create", "updated"]
+        list_serializer_class = OrganizationListSerializer
 
     def get_units_tree(self, obj):
-        roots = (
-            OrgUnit.objects
-            .filter(organization=obj, parent__isnull=True)
-            .prefetch_related("children", "employees")
-            .order_by("order", "name")
-        )
+        roots = getattr(obj, "_units_forest", None)
+        if roots is None:
+            # одиночная организация (retrieve / create / update)
+            roots = units_forest([obj.pk]).get(obj.pk, [])
         return OrgUnitTreeSerializer(roots, many=True).data
 
     def _apply_curator(self, org: Organization, curator_id):
@@ -128,9 +171,10 @@ class OrganizationSerializer(serializers.ModelSerializer):
         if curator_id is None:
             curator_id = self.initial_data.get("curator")
 
-        validated_data["slug"] = unique_slugify(
-            Organization, validated_data.get("name", ""))
-        org = super().create(validated_data)
+        create = super().create
+        org = create_with_slug(
+            Organization, validated_data.get("name", ""),
+            lambda slug: create({**validated_data, "slug": slug}))
 
         # применим куратора
         if curator_id is not None:
@@ -144,11 +188,14 @@ class OrganizationSerializer(serializers.ModelSerializer):
             curator_id = self.initial_data.get("curator")
 
         # обновим слаг при смене имени (как было)
+        update = super().update
         if "name" in validated_data and validated_data["name"] and validated_data["name"] != instance.name:
-            validated_data["slug"] = unique_slugify(
-                Organization, validated_data["name"])
-
-        org = super().update(instance, validated_data)
+            # при гонке двух переименований — повтор со следующим slug
+            org = save_with_slug(
+                instance, validated_data["name"],
+                lambda: update(instance, validated_data))
+        else:
+            org = update(instance, validated_data)
 
         # если фронт прислал curator — применяем (в т.ч. очистку)
         if "curator" in (self.initial_data or {}):
@@ -160,10 +207,13 @@ class OrganizationSerializer(serializers.ModelSerializer):
         return {"staff": link.staff, "can_edit": link.can_edit, "source": source}
 
     def get_responsibles(self, obj: Organization):
-        org_links = getattr(obj, "curator_links_all_org",
-                            None) or obj.curator_links.all()
-        cat_links = getattr(obj, "curator_links_all_cat",
-                            None) or obj.category.curator_links.all()
+        # пустой prefetch — тоже результат (не повод идти в БД ещё раз)
+        org_links = getattr(obj, "curator_links_all_org", None)
+        if org_links is None:
+            org_links = obj.curator_links.all()
+        cat_links = getattr(obj.category, "curator_links_all_cat", None)
+        if cat_links is None:
+            cat_links = obj.category.curator_links.all()
         data = [self._map_link(l, "organization") for l in org_links] + \
                [self._map_link(l, "category") for l in cat_links]
         return StaffBriefSerializer(data, many=True).data
@@ -1,3 +1,321 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend import counters, slugs
+from organizationsStaff.models import OrgUnit
+
+from .models import Category, Organization
+
+User = get_user_model()
+
+
+class OrganizationUnitsTreeTests(TestCase):
+    """Деревья подразделений в списке организаций собираются без N+1."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Банки", slug="banki")
+        cls.user = User.objects.create_user("viewer", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def make_org(self, n, depth=4, width=2):
+        org = Organization.objects.create(
+            name=f"Банк {n}", slug=f"bank-{n}", description="", address="",
+            lotus="", phone="", email=f"bank{n}@example.com",
+            category=self.category,
+        )
+        level = [None]
+        for d in range(depth):
+            next_level = []
+            for parent in level:
+                for i in range(width):
+                    next_level.append(OrgUnit.objects.create(
+                        organization=org, parent=parent,
+                        name=f"Узел {d}.{i}", order=width - i,
+                    ))
+            level = next_level
+        return org
+
+    def list_orgs(self):
+        response = self.client.get("/api/organizations/list/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_query_count_does_not_grow_with_orgs_and_depth(self):
+        self.make_org(1)
+        with self.assertNumQueries(5):
+            # COUNT, страница, 2 prefetch кураторов, подразделения
+            # (ETag-агрегата нет: кеш версий в тестах — locmem)
+            self.list_orgs()
+
+        for n in range(2, 6):
+            self.make_org(n, depth=5)
+        with self.assertNumQueries(5):
+            results = self.list_orgs()
+        self.assertEqual(len(results), 5)
+
+    def test_tree_shape_and_order(self):
+        org = self.make_org(1, depth=3, width=2)
+        tree = next(o for o in self.list_orgs() if o["id"] == org.pk)["units_tree"]
+
+        self.assertEqual(len(tree), 2)
+        # сестринские узлы — по order
+        self.assertEqual([u["name"] for u in tree], ["Узел 0.1", "Узел 0.0"])
+        leaf = tree[0]["children"][0]["children"][0]
+        self.assertEqual(leaf["children"], [])
+        self.assertEqual(leaf["parent_id"], tree[0]["children"][0]["id"])
+
+    def test_detail_uses_single_tree_query(self):
+        org = self.make_org(1, depth=4)
+        with self.assertNumQueries(4):
+            # организация, 2 prefetch кураторов, подразделения
+            response = self.client.get(f"/api/organizations/{org.slug}/")
+        self.assertEqual(len(response.data["units_tree"]), 2)
+
+
+class CategoryCountersTests(TestCase):
+    """Category.objects_count / today_count совпадают с реальным COUNT."""
+
+    def setUp(self):
+        self.a = Category.objects.create(name="A", slug="a")
+        self.b = Category.objects.create(name="B", slug="b")
+        self.counter = next(c for c in counters.COUNTERS if c.name == "organizations.Category.objects_count")
+        self.n = 0
+
+    def make_org(self, category, save=True):
+        self.n += 1
+        org = Organization(
+            name=f"Орг {self.n}", slug=f"org-{self.n}", description="", address="",
+            lotus="", phone="", email=f"org{self.n}@example.com", category=category,
+        )
+        if save:
+            org.save()
+        return org
+
+    def assertCounts(self, *categories):
+        today = timezone.localdate()
+        for category in categories:
+            category.refresh_from_db()
+            orgs = Organization.objects.filter(category=category)
+            self.assertEqual(category.objects_count, orgs.count(), category.slug)
+            self.assertEqual(
+                counters.daily_value(category.today_count, category.today_date),
+                orgs.filter(time_create__date=today).count(), category.slug)
+
+    def test_create_move_delete(self):
+        first, second = self.make_org(self.a), self.make_org(self.a)
+        self.make_org(self.b)
+        self.assertCounts(self.a, self.b)
+        self.assertEqual((self.a.objects_count, self.a.today_count), (2, 2))
+
+        second.category = self.b
+        second.save()
+        self.assertCounts(self.a, self.b)
+        self.assertEqual(self.b.objects_count, 2)
+
+        # сохранение без смены категории счётчики не трогает
+        second.name = "Другое имя"
+        second.save()
+        first.delete()
+        self.assertCounts(self.a, self.b)
+        self.assertEqual((self.a.objects_count, self.a.today_count), (0, 0))
+
+    def test_queryset_delete_and_cascade(self):
+        for category in (self.a, self.a, self.b, self.b, self.b):
+            self.make_org(category)
+        Organization.objects.filter(category=self.b).exclude(
+            pk=Organization.objects.filter(category=self.b).first().pk).delete()
+        self.assertCounts(self.a, self.b)
+        self.assertEqual(self.b.objects_count, 1)
+
+        # каскад: удаление категории удаляет её организации, чужие счётчики целы
+        self.a.delete()
+        self.assertCounts(self.b)
+        self.assertEqual(self.b.objects_count, 1)
+
+    def test_bulk_created_and_bulk_moved(self):
+        orgs = Organization.objects.bulk_create(
+            [self.make_org(self.a, save=False) for _ in range(3)]
+            + [self.make_org(self.b, save=False)])
+        # bulk_create сигналов не шлёт — счётчики ещё не знают
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.objects_count, 0)
+        counters.bulk_created(Organization, orgs)
+        self.assertCounts(self.a, self.b)
+
+        moved = orgs[:2]
+        old_values = {org.pk: {"category_id": org.category_id} for org in moved}
+        for org in moved:
+            org.category = self.b
+        Organization.objects.bulk_update(moved, ["category"])
+        counters.bulk_moved(Organization, moved, old_values)
+        self.assertCounts(self.a, self.b)
+        self.assertEqual((self.a.objects_count, self.b.objects_count), (1, 3))
+
+    def test_today_count_rolls_over(self):
+        self.make_org(self.a)
+        self.make_org(self.a)
+        yesterday = timezone.localdate() - timedelta(days=1)
+        # прошли сутки: сохранённое число относится ко вчерашнему дню
+        Category.objects.filter(pk=self.a.pk).update(today_date=yesterday)
+        self.a.refresh_from_db()
+        self.assertEqual(counters.daily_value(self.a.today_count, self.a.today_date), 0)
+
+        # первая организация нового дня начинает отсчёт с 1
+        Organization.objects.filter(category=self.a).update(
+            time_create=timezone.now() - timedelta(days=1))
+        self.make_org(self.a)
+        self.assertCounts(self.a)
+        self.assertEqual((self.a.objects_count, self.a.today_count), (3, 1))
+
+        # удаление вчерашней организации сегодняшний счётчик не уменьшает
+        Organization.objects.filter(time_create__date=yesterday).first().delete()
+        self.assertCounts(self.a)
+        self.assertEqual((self.a.objects_count, self.a.today_count), (2, 1))
+
+    def test_reconcile_fixes_drift(self):
+        org = self.make_org(self.a)
+        self.make_org(self.a)
+        # в обход сигналов
+        Organization.objects.filter(pk=org.pk).update(category=self.b)
+        Category.objects.filter(pk=self.b.pk).update(today_count=7, today_date=timezone.localdate())
+
+        self.assertEqual(counters.reconcile(self.counter), 2)
+        self.assertCounts(self.a, self.b)
+        self.assertEqual(counters.reconcile(self.counter), 0)
+
+
+class OrganizationListETagTests(TestCase):
+    """ETag списка — только при общем для процессов кеше версий."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("viewer", password="x"))
+        self.category = Category.objects.create(name="Банки", slug="banki")
+
+    def shared_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        return override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": location,
+        }})
+
+    def test_disabled_on_locmem(self):
+        response = self.client.get("/api/organizations/list/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        response = self.client.get("/api/organizations/list/", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_until_nested_change(self):
+        with self.shared_cache():
+            etag = self.client.get("/api/organizations/list/")["ETag"]
+            response = self.client.get("/api/organizations/list/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+            # подразделения входят в ответ, но MAX(updated)/COUNT не меняют
+            org = Organization.objects.create(
+                name="Банк", slug="bank", description="", address="", lotus="",
+                phone="", email="bank@example.com", category=self.category)
+            etag = self.client.get("/api/organizations/list/")["ETag"]
+            with self.captureOnCommitCallbacks(execute=True):
+                OrgUnit.objects.create(organization=org, name="Узел")
+            response = self.client.get("/api/organizations/list/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+
+class SlugAllocatorTests(TestCase):
+    """backend/slugs.py: разбор номеров, обрезка основы и повтор при гонке."""
+
+    def make(self, *slugs):
+        for slug in slugs:
+            Category.objects.create(name=slug, slug=slug)
+
+    def create(self, name, calls=None):
+        def run(slug):
+            if calls is not None:
+                calls.append(slug)
+            return Category.objects.create(name=name, slug=slug)
+        return slugs.create_with_slug(Category, name, run)
+
+    def test_number(self):
+        self.assertEqual(slugs._number("bank", "bank"), 1)
+        self.assertEqual(slugs._number("bank", "bank-12"), 12)
+        for slug in ("bank-", "bank-xyz", "bank-2a", "bank2", "banker", "bank-2-3"):
+            self.assertIsNone(slugs._number("bank", slug), slug)
+
+    def test_taken_ignores_foreign_slugs(self):
+        self.make("bank", "bank-3", "bank-xyz", "bank-2a", "bank-nord-2", "banker")
+        taken = slugs._taken(Category, ["bank", "bank-nord", "other"], "slug")
+        self.assertEqual(taken, {"bank": {1, 3}, "bank-nord": {2}, "other": set()})
+        self.assertEqual(slugs.allocate_slug(Category, "Bank"), "bank-2")
+
+    def test_exclude_own_slug(self):
+        self.make("bank", "bank-2")
+        own = Category.objects.get(slug="bank")
+        self.assertEqual(slugs.allocate_slug(Category, "Bank", exclude_pk=own.pk), "bank")
+
+    def test_base_truncated_to_max_length(self):
+        max_length = Category._meta.get_field("slug").max_length
+        base = slugs.slug_base(Category, "Very long name " * 10)
+        self.assertLessEqual(len(base), max_length - slugs.SUFFIX_RESERVE)
+        self.assertFalse(base.endswith("-"))
+        self.make(base)
+        self.make(*(f"{base}-{n}" for n in range(2, 100)))
+        slug = slugs.allocate_slug(Category, "Very long name " * 10)
+        self.assertEqual(slug, f"{base}-100")
+        self.assertLessEqual(len(slug), max_length)
+
+    def test_empty_base(self):
+        self.assertEqual(slugs.slug_base(Category, "Банки"), slugs.DEFAULT_BASE)
+        self.assertEqual(slugs.slug_base(Category, None), slugs.DEFAULT_BASE)
+
+    def test_allocate_slugs_unique_within_batch(self):
+        self.make("bank")
+        self.assertEqual(
+            slugs.allocate_slugs(Category, ["Bank", "Bank", "Fund", "Bank"]),
+            ["bank-2", "bank-3", "fund", "bank-4"])
+
+    def test_retry_after_race(self):
+        self.make("bank")
+        calls = []
+        # проверка «заранее» не видит slug, занятый параллельным запросом
+        with mock.patch.object(slugs, "_taken", side_effect=[{"bank": set()}, {"bank": {1}}]):
+            category = self.create("Bank", calls)
+        self.assertEqual(calls, ["bank", "bank-2"])
+        self.assertEqual(category.slug, "bank-2")
+
+    def test_gives_up_after_attempts(self):
+        self.make("bank")
+        calls = []
+        with mock.patch.object(slugs, "_taken", side_effect=lambda *a, **kw: {"bank": set()}):
+            with self.assertRaises(IntegrityError):
+                self.create("Bank", calls)
+        self.assertEqual(len(calls), slugs.ATTEMPTS)
+
+    def test_other_integrity_error_not_retried(self):
+        calls = []
+        with self.assertRaises(IntegrityError):
+            # NOT NULL на name — не конфликт slug-а
+            self.create(None, calls)
+        self.assertEqual(calls, ["item"])
+        self.assertFalse(Category.objects.exists())
+
+    def test_save_with_slug(self):
+        self.make("bank", "fund")
+        category = Category.objects.get(slug="fund")
+        category.name = "Bank"
+        slugs.save_with_slug(category, category.name, lambda: Category.save(category))
+        self.assertEqual(Category.objects.get(pk=category.pk).slug, "bank-2")
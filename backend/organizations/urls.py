@@ -14,6 +14,7 @@ organization_list = OrganizationViewSet.as_view({'get': 'list'})
 organization_detail = OrganizationViewSet.as_view(
     {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'})
 organization_create = OrganizationViewSet.as_view({'post': 'create'})
+organization_audit = OrganizationViewSet.as_view({'get': 'audit'})
 
 urlpatterns = [
     # Categories
@@ -26,4 +27,6 @@ urlpatterns = [
     path('organizations/create/', organization_create, name='organization-create'),
     path('organizations/<slug:slug>/',
          organization_detail, name='organization-detail'),
+    path('organizations/<slug:slug>/audit/',
+         organization_audit, name='organization-audit'),
 ]
@@ -1,17 +1,58 @@
-from django.utils import timezone
-from django.db.models import Count, Q, Prefetch
+from django.db import transaction
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, mixins, filters, permissions, parsers
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from backend.etag import ConditionalListMixin
+from backend.fieldsets import SparseQuerysetMixin
+
 from .serializer import CategorySerializer, OrganizationSerializer
 from .models import Category, Organization
 
-from staffUsers.permissions import IsStaffOrReadOnly, CanEditCategory, CanEditOrganization
+from staffUsers import audit, audit_archive
+from staffUsers.access import annotate_category_can_edit, annotate_org_can_edit
+from staffUsers.permissions import IsStaffOrReadOnly, CanEditCategory, CanEditOrganization, get_staff
 from staffUsers.models import AuditEntry, StaffProfile, StaffCuratorship
 
-from organizationsStaff.models import OrgUnit
 from organizationsStaff.serializers import OrgUnitTreeSerializer
+from organizationsStaff.tree import units_forest
+
+
+def _staff(request):
+    return getattr(request.user, "staff", None)
+
+
+# perform_* для CategoryViewSet / OrganizationViewSet: аудит с диффом полей,
+# запись — одним bulk_create после коммита (staffUsers/audit.py)
+@transaction.atomic
+def audited_create(self, serializer):
+    obj = serializer.save()
+    audit.record(_staff(self.request), obj, "created",
+                 changes=audit.diff({}, audit.snapshot(obj)))
+
+
+@transaction.atomic
+def audited_update(self, serializer):
+    before = audit.snapshot(serializer.instance)
+    obj = serializer.save()
+    audit.record(_staff(self.request), obj, "updated",
+                 changes=audit.diff(before, audit.snapshot(obj)))
+
+
+@transaction.atomic
+def audited_destroy(self, instance):
+    audit.record(_staff(self.request), instance, "deleted",
+                 changes=audit.diff(audit.snapshot(instance), {}))
+    instance.delete()
+
+
+def editable_only(request):
+    """?editable=true — только то, что текущий сотрудник может редактировать."""
+    return request.query_params.get("editable") in ("1", "true")
 
 
 class CategoryViewSet(
@@ -24,40 +65,23 @@ class CategoryViewSet(
     lookup_url_kwarg = "slug"
     permission_classes = [IsStaffOrReadOnly, CanEditCategory]
 
-    def perform_create(self, serializer):
-        obj = serializer.save()
-        staff = getattr(self.request.user, "staff", None)
-        AuditEntry.objects.create(
-            actor=staff, target=AuditEntry.Target.CAT, category=obj, action="created")
-
-    def perform_update(self, serializer):
-        obj = serializer.save()
-        staff = getattr(self.request.user, "staff", None)
-        AuditEntry.objects.create(
-            actor=staff, target=AuditEntry.Target.CAT, category=obj, action="updated")
-
-    def perform_destroy(self, instance):
-        staff = getattr(self.request.user, "staff", None)
-        AuditEntry.objects.create(
-            actor=staff, target=AuditEntry.Target.CAT, category=instance, action="deleted")
-        return super().perform_destroy(instance)
+    perform_create = audited_create
+    perform_update = audited_update
+    perform_destroy = audited_destroy
 
     def get_queryset(self):
-        today = timezone.localdate()
-        return (
-            Category.objects
-            .annotate(
-                objects_count=Count('organizations'),
-                today_count=Count('organizations', filter=Q(
-                    organizations__time_create__date=today))
-            )
-            .order_by('name')
-        )
+        # objects_count / today_count — денормализованные колонки, без JOIN
+        qs = Category.objects.order_by('name')
+        # can_edit для каждой строки — одним запросом, без проверок по объектам
+        qs = annotate_category_can_edit(qs, get_staff(self.request.user))
+        if editable_only(self.request):
+            qs = qs.filter(can_edit=True)
+        return qs
 
 # если нужно — аналогичный ViewSet для организаций:
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(SparseQuerysetMixin, ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Organization.objects.select_related("category").all()
     serializer_class = OrganizationSerializer
     lookup_field = "slug"
@@ -76,54 +100,65 @@ class OrganizationViewSet(viewsets.ModelViewSet):
     ordering_fields = ["time_create", "updated", "name"]
     ordering = ["-time_create"]
 
+    # ETag для списка (304, если ничего не менялось)
+    etag_collection = "organizations"
+    etag_updated_field = "updated"
+
+    # кураторы (responsibles) подгружаются, только если поле запрошено
+    field_prefetches = {
+        "responsibles": (
+            Prefetch(
+                "curator_links",
+                # чтобы были fio/phone/username
+                queryset=StaffCuratorship.objects.select_related("staff", "staff__user")
+                .filter(organization__isnull=False),
+                to_attr="curator_links_all_org",
+            ),
+            Prefetch(
+                "category__curator_links",
+                queryset=StaffCuratorship.objects.select_related("staff", "staff__user")
+                .filter(category__isnull=False),
+                to_attr="curator_links_all_cat",
+            ),
+        ),
+    }
+
     def get_queryset(self):
-        org_links_qs = (
-            StaffCuratorship.objects
-            # чтобы были fio/phone/username
-            .select_related("staff", "staff__user")
-            .filter(organization__isnull=False)
-        )
-        cat_links_qs = (
-            StaffCuratorship.objects
-            .select_related("staff", "staff__user")
-            .filter(category__isnull=False)
-        )
-        return (
-            Organization.objects
-            .select_related("category")
-            .prefetch_related(
-                Prefetch("curator_links", queryset=org_links_qs,
-                         to_attr="curator_links_all_org"),
-                Prefetch("category__curator_links", queryset=cat_links_qs,
-                         to_attr="curator_links_all_cat"),
-            )
-        )
+        qs = annotate_org_can_edit(super().get_queryset(), get_staff(self.request.user))
+        if editable_only(self.request):
+            qs = qs.filter(can_edit=True)
+        return qs
 
     @action(detail=True, methods=["get"], url_path="structure")
     def structure(self, request, *args, **kwargs):
         org = self.get_object()
-        roots = (OrgUnit.objects
-                 .filter(organization=org, parent__isnull=True)
-                 .prefetch_related("children", "children__children", "employees")
-                 .order_by("order", "name"))
+        roots = units_forest([org.pk]).get(org.pk, [])
         data = OrgUnitTreeSerializer(roots, many=True, context={
                                      "request": request}).data
         return Response({"organization": org.slug, "units": data})
 
-    def perform_create(self, serializer):
-        obj = serializer.save()
-        staff = getattr(self.request.user, "staff", None)
-        AuditEntry.objects.create(
-            actor=staff, target=AuditEntry.Target.ORG, org=obj, action="created")
-
-    def perform_update(self, serializer):
-        obj = serializer.save()
-        staff = getattr(self.request.user, "staff", None)
-        AuditEntry.objects.create(
-            actor=staff, target=AuditEntry.Target.ORG, org=obj, action="updated")
-
-    def perform_destroy(self, instance):
-        staff = getattr(self.request.user, "staff", None)
-        AuditEntry.objects.create(
-            actor=staff, target=AuditEntry.Target.ORG, org=instance, action="deleted")
-        return super().perform_destroy(instance)
+    perform_create = audited_create
+    perform_update = audited_update
+    perform_destroy = audited_destroy
+
+    @action(detail=True, methods=["get"], url_path="audit")
+    def audit(self, request, *args, **kwargs):
+        """
+        GET /api/organizations/<slug>/audit/?cursor=... — история изменений организации,
+        новые сверху; keyset по (created, id) — сначала живая таблица (индекс
+        target, object_id, -created, -id), дальше архивные сегменты.
+        """
+        org = self.get_object()
+        cursor = request.query_params.get("cursor")
+        try:
+            cursor = audit_archive.decode_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            raise NotFound(str(exc))
+        rows, next_cursor = audit_archive.history(
+            AuditEntry.Target.ORG, org.pk,
+            limit=self.paginator.get_page_size(request), cursor=cursor)
+        next_link = None
+        if next_cursor:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), "cursor", next_cursor)
+        return Response({"next": next_link, "results": rows})
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from organizationsStaff.tree import rebuild_paths
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает материализованные пути (path/depth) подразделений"
+
+    def handle(self, *args, **opts):
+        changed, detached = rebuild_paths()
+        if detached:
+            self.stdout.write(self.style.WARNING(
+                f"Разорваны циклы, стали корнями: {detached}"))
+        self.stdout.write(self.style.SUCCESS(f"Обновлено путей: {changed}"))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_organization_curator'),
+        ('organizationsStaff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orgunit',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='orgunit',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='orgunit',
+            index=models.Index(fields=['organization', 'path'], name='organizatio_organiz_af68f1_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """
+    Первичный расчёт path/depth. Узлы, зациклившиеся через parent
+    (раньше от этого защищал сериализатор), становятся корнями.
+    """
+    OrgUnit = apps.get_model("organizationsStaff", "OrgUnit")
+    rows = list(OrgUnit.objects.values_list("pk", "parent_id"))
+    ids = {pk for pk, _ in rows}
+    children = defaultdict(list)
+    for pk, parent_id in rows:
+        children[parent_id].append(pk)
+
+    result = {}
+
+    def walk(root):
+        stack = [(root, "", 0)]
+        while stack:
+            pk, prefix, depth = stack.pop()
+            path = f"{prefix}{pk}/"
+            result[pk] = (path, depth)
+            for child in children.get(pk, ()):
+                if child not in result:
+                    stack.append((child, path, depth + 1))
+
+    for pk, parent_id in sorted(rows):
+        if parent_id is None or parent_id not in ids:
+            walk(pk)
+    detached = []
+    for pk in sorted(ids):
+        if pk not in result:
+            detached.append(pk)
+            walk(pk)
+    if detached:
+        OrgUnit.objects.filter(pk__in=detached).update(parent=None)
+
+    OrgUnit.objects.bulk_update(
+        [OrgUnit(pk=pk, path=path, depth=depth) for pk, (path, depth) in result.items()],
+        ["path", "depth"], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizationsStaff', '0002_orgunit_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
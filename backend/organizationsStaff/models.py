@@ -1,8 +1,23 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 from organizations.models import Organization
 
+PATH_SEPARATOR = "/"
+
+
 class OrgUnit(models.Model):
+    """
+    Подразделение. Кроме parent хранится материализованный путь:
+    path = "<id корня>/.../<id узла>/", depth — уровень (0 у корня).
+    Поддерево — один запрос path LIKE 'path%', предки — id из path.
+    Путь поддерживается в save(): перенос узла одним UPDATE переписывает
+    пути всех потомков (и организацию, если узел перенесён в другую);
+    перенос внутрь собственного поддерева отклоняется.
+    bulk_create/update() путь не считают — см. команду rebuild_unit_paths.
+    """
     class UnitType(models.TextChoices):
         DIRECTORATE = "directorate", "Дирекция"
         MANAGEMENT  = "management",  "Управление"
@@ -21,12 +36,115 @@ class OrgUnit(models.Model):
     order = models.PositiveIntegerField(default=0)  # для сортировки сестринских узлов
     created_at = models.DateTimeField(default=timezone.now)
 
+    path = models.CharField(max_length=255, blank=True, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["organization", "parent__id", "order", "name"]
+        indexes = [
+            models.Index(fields=["organization", "path"]),
+        ]
 
     def __str__(self):
         return f"{self.organization.name} :: {self.name}"
 
+    # ---- дерево ----
+
+    @property
+    def ancestor_ids(self):
+        """id предков от корня к родителю (по path, без запросов)."""
+        return [int(x) for x in self.path.split(PATH_SEPARATOR) if x][:-1]
+
+    def get_ancestors(self, include_self=False):
+        ids = self.ancestor_ids + ([self.pk] if include_self else [])
+        return OrgUnit.objects.filter(pk__in=ids).order_by("depth")
+
+    def get_descendants(self, include_self=False):
+        qs = OrgUnit.objects.filter(
+            organization_id=self.organization_id, path__startswith=self.path)
+        if not include_self:
+            qs = qs.exclude(pk=self.pk)
+        return qs
+
+    def _parent_row(self):
+        if not self.parent_id:
+            return "", -1
+        row = (
+            OrgUnit.objects.filter(pk=self.parent_id)
+            .values_list("path", "depth", "organization_id").first()
+        )
+        if row is None:
+            raise ValidationError({"parent": "Родительское подразделение не найдено"})
+        path, depth, organization_id = row
+        if organization_id != self.organization_id:
+            raise ValidationError(
+                {"parent": "Родитель должен принадлежать той же организации"})
+        return path, depth
+
+    def _check_parent(self, parent_path, old_path):
+        # текущий путь узла берём из БД: объект в памяти мог устареть
+        if self.pk and (self.parent_id == self.pk
+                        or (old_path and parent_path.startswith(old_path))):
+            raise ValidationError(
+                {"parent": "Нельзя перенести подразделение внутрь самого себя"})
+
+    def _stored_path(self):
+        if not self.pk:
+            return None
+        return (
+            OrgUnit.objects.filter(pk=self.pk)
+            .values_list("path", "depth", "organization_id").first()
+        )
+
+    def clean(self):
+        super().clean()
+        parent_path, _ = self._parent_row()
+        stored = self._stored_path()
+        self._check_parent(parent_path, stored[0] if stored else "")
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"parent", "organization"} & set(update_fields):
+            # родитель и организация не менялись — путь тот же
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            parent_path, parent_depth = self._parent_row()
+            stored = self._stored_path()
+            if stored is None:
+                # новый узел: путь содержит собственный id — дописываем после INSERT
+                super().save(*args, **kwargs)
+                self.path = f"{parent_path}{self.pk}{PATH_SEPARATOR}"
+                self.depth = parent_depth + 1
+                OrgUnit.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+                return
+
+            old_path, old_depth, old_organization_id = stored
+            self._check_parent(parent_path, old_path)
+            self.path = f"{parent_path}{self.pk}{PATH_SEPARATOR}"
+            self.depth = parent_depth + 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "path", "depth"}
+            super().save(*args, **kwargs)
+
+            moved = old_path and self.path != old_path
+            changed_org = self.organization_id != old_organization_id
+            if not old_path or not (moved or changed_org):
+                return
+            # перенос: пути, глубины и организация всего поддерева — одним UPDATE
+            subtree = OrgUnit.objects.filter(path__startswith=old_path).exclude(pk=self.pk)
+            changes = {}
+            if moved:
+                changes["path"] = Concat(Value(self.path), Substr("path", len(old_path) + 1))
+                changes["depth"] = F("depth") + (self.depth - old_depth)
+            if changed_org:
+                changes["organization_id"] = self.organization_id
+                # сотрудники поддерева переходят вместе с подразделениями
+                OrgEmployee.objects.filter(
+                    Q(unit_id=self.pk) | Q(unit__path__startswith=old_path),
+                ).update(organization_id=self.organization_id)
+            subtree.update(**changes)
+
 
 class OrgEmployee(models.Model):
 
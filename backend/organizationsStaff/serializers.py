@@ -1,6 +1,7 @@
 
 from rest_framework import serializers
 from .models import OrgUnit, OrgEmployee
+from .tree import attach_subtree
 
 
 class OrgEmployeeSerializer(serializers.ModelSerializer):
@@ -40,6 +41,7 @@ class OrgUnitTreeSerializer(serializers.ModelSerializer):
             "name",
             "type",
             "parent_id",
+            "depth",
             "children",
         ]
 
@@ -47,23 +49,13 @@ class OrgUnitTreeSerializer(serializers.ModelSerializer):
         return getattr(obj, "parent_id", None)
 
     def get_children(self, obj):
-        # защита от зацикливания + лимит глубины
-        ctx = self.context
-        visited = ctx.setdefault("visited", set())
-        max_depth = ctx.get("max_depth", 20)
-        depth = ctx.setdefault("_depth", 0)
-
-        if obj.pk in visited or depth >= max_depth:
-            return []
-
-        visited.add(obj.pk)
-        try:
-            ctx["_depth"] = depth + 1
-            # thanks to related_name="children"
-            qs = obj.children.all().order_by("order", "name")
-            return OrgUnitTreeSerializer(qs, many=True, context=ctx).data
-        finally:
-            ctx["_depth"] = depth
+        # дети, заранее собранные в памяти (organizationsStaff.tree);
+        # иначе — всё поддерево узла одним запросом по path.
+        # Циклов нет: перенос внутрь своего поддерева отклоняется при записи
+        children = getattr(obj, "_tree_children", None)
+        if children is None:
+            children = attach_subtree(obj)
+        return OrgUnitTreeSerializer(children, many=True, context=self.context).data
 
 
 class OrgUnitWriteSerializer(serializers.ModelSerializer):
@@ -85,7 +77,23 @@ class OrgUnitFlatSerializer(serializers.ModelSerializer):
             "name",
             "type",            # одна из: directorate/management/department/section/other
             "parent_id",       # только ID родителя
+            "order",
+            "depth",
+            "path",            # "<id корня>/.../<id узла>/"
         ]
 
     def get_parent_id(self, obj):
         return getattr(obj, "parent_id", None)
+
+
+class OrgUnitMoveSerializer(serializers.Serializer):
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=OrgUnit.objects.all(), allow_null=True)
+    order = serializers.IntegerField(min_value=0, required=False)
+
+
+class OrgUnitReorderSerializer(serializers.Serializer):
+    """Новый порядок сестринских узлов: ids в нужной последовательности."""
+    organization = serializers.IntegerField()
+    parent = serializers.IntegerField(allow_null=True, required=False, default=None)
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
@@ -1,3 +1,78 @@
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from organizations.models import Category, Organization
+
+from .models import OrgEmployee, OrgUnit
+
+
+class OrgUnitOrganizationChangeTests(TestCase):
+    """Смена организации узла переносит всё его поддерево."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Банки", slug="banki")
+        cls.old, cls.new = (
+            Organization.objects.create(
+                name=f"Банк {n}", slug=f"bank-{n}", description="", address="",
+                lotus="", phone="", email=f"bank{n}@example.com", category=category,
+            )
+            for n in (1, 2)
+        )
+
+    def setUp(self):
+        self.root = OrgUnit.objects.create(organization=self.old, name="Дирекция")
+        self.child = OrgUnit.objects.create(
+            organization=self.old, name="Управление", parent=self.root)
+        self.leaf = OrgUnit.objects.create(
+            organization=self.old, name="Отдел", parent=self.child)
+        self.other = OrgUnit.objects.create(organization=self.old, name="Другое")
+        self.head = OrgEmployee.objects.create(
+            organization=self.old, unit=self.root, full_name="Руководитель")
+        self.clerk = OrgEmployee.objects.create(
+            organization=self.old, unit=self.leaf, full_name="Сотрудник")
+
+    def organizations(self, model):
+        return dict(model.objects.values_list("pk", "organization_id"))
+
+    def test_root_moves_with_subtree(self):
+        self.root.organization = self.new
+        self.root.save()
+
+        units = self.organizations(OrgUnit)
+        self.assertEqual(
+            {pk: units[pk] for pk in (self.root.pk, self.child.pk, self.leaf.pk)},
+            dict.fromkeys((self.root.pk, self.child.pk, self.leaf.pk), self.new.pk))
+        self.assertEqual(units[self.other.pk], self.old.pk)
+        self.assertEqual(
+            self.organizations(OrgEmployee),
+            {self.head.pk: self.new.pk, self.clerk.pk: self.new.pk})
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.path, f"{self.root.pk}/{self.child.pk}/{self.leaf.pk}/")
+        self.assertEqual(list(self.root.get_descendants()), [self.child, self.leaf])
+
+    def test_update_fields_organization(self):
+        self.root.organization = self.new
+        self.root.save(update_fields=["organization"])
+        self.assertEqual(OrgUnit.objects.get(pk=self.leaf.pk).organization_id, self.new.pk)
+
+    def test_move_to_other_organization_with_new_parent(self):
+        target = OrgUnit.objects.create(organization=self.new, name="Новая дирекция")
+        self.child.organization = self.new
+        self.child.parent = target
+        self.child.save()
+
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.organization_id, self.new.pk)
+        self.assertEqual(self.leaf.path, f"{target.pk}/{self.child.pk}/{self.leaf.pk}/")
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual(
+            self.organizations(OrgEmployee),
+            {self.head.pk: self.old.pk, self.clerk.pk: self.new.pk})
+
+    def test_parent_from_old_organization_rejected(self):
+        self.child.organization = self.new
+        with self.assertRaises(ValidationError):
+            self.child.save()
+        self.assertEqual(
+            set(OrgUnit.objects.values_list("organization_id", flat=True)), {self.old.pk})
@@ -0,0 +1,104 @@
+# organizationsStaff/tree.py
+"""
+Сборка деревьев подразделений в памяти.
+
+Все OrgUnit нужных организаций (или поддерево узла — по path) читаются
+одним запросом, дети раскладываются по родителям в атрибут _tree_children
+(уже отсортированными) — OrgUnitTreeSerializer берёт детей оттуда и не
+ходит в БД на каждый узел. Плюс пересчёт материализованных путей.
+"""
+from collections import defaultdict
+
+from .models import OrgUnit
+
+TREE_ORDERING = ("order", "name", "id")
+
+
+def build_forest(units):
+    """
+    Раскладывает узлы по родителям. Возвращает {organization_id: [корни]}.
+    Узлы, чей родитель не попал в выборку, считаются корнями.
+    """
+    by_id = {u.pk: u for u in units}
+    forest = defaultdict(list)
+    for unit in units:
+        unit._tree_children = []
+    for unit in units:
+        parent = by_id.get(unit.parent_id)
+        if parent is not None:
+            parent._tree_children.append(unit)
+        else:
+            forest[unit.organization_id].append(unit)
+    return forest
+
+
+def attach_subtree(unit):
+    """Поддерево узла одним запросом (по path); возвращает детей узла."""
+    descendants = list(unit.get_descendants().order_by(*TREE_ORDERING))
+    build_forest([unit] + descendants)
+    return unit._tree_children
+
+
+def units_forest(organization_ids):
+    """Деревья подразделений для нескольких организаций — одним запросом."""
+    units = list(
+        OrgUnit.objects
+        .filter(organization_id__in=list(organization_ids))
+        .order_by(*TREE_ORDERING)
+    )
+    return build_forest(units)
+
+
+def compute_paths(rows):
+    """
+    rows: [(id, parent_id)] → ({id: (path, depth)}, [id узлов, отцепленных от цикла]).
+    Узлы, недостижимые от корней (циклы в parent), становятся корнями:
+    берётся наименьший id среди оставшихся, и обход продолжается от него.
+    """
+    children = defaultdict(list)
+    ids = set()
+    for pk, parent_id in rows:
+        ids.add(pk)
+        children[parent_id].append(pk)
+
+    result = {}
+    detached = []
+
+    def walk(root, prefix, depth):
+        stack = [(root, prefix, depth)]
+        while stack:
+            pk, prefix, depth = stack.pop()
+            path = f"{prefix}{pk}/"
+            result[pk] = (path, depth)
+            for child in children.get(pk, ()):
+                if child not in result:
+                    stack.append((child, path, depth + 1))
+
+    for pk, parent_id in sorted(rows):
+        if parent_id is None or parent_id not in ids:
+            walk(pk, "", 0)
+    for pk in sorted(ids):
+        if pk not in result:
+            detached.append(pk)
+            walk(pk, "", 0)
+    return result, detached
+
+
+def rebuild_paths(batch_size=1000):
+    """Пересчитывает path/depth всех подразделений (после bulk-операций, импорта)."""
+    rows = list(OrgUnit.objects.values_list("pk", "parent_id"))
+    paths, detached = compute_paths(rows)
+    if detached:
+        OrgUnit.objects.filter(pk__in=detached).update(parent=None)
+
+    current = dict(
+        (pk, (path, depth))
+        for pk, path, depth in OrgUnit.objects.values_list("pk", "path", "depth")
+    )
+    changed = [
+        OrgUnit(pk=pk, path=path, depth=depth)
+        for pk, (path, depth) in paths.items()
+        if current.get(pk) != (path, depth)
+    ]
+    OrgUnit.objects.bulk_update(changed, ["path", "depth"], batch_size=batch_size)
+    return len(changed), detached
@@ -1,8 +1,14 @@
-from rest_framework import viewsets, permissions
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
-from staffUsers.permissions import IsStaffOrReadOnly, CanEditOrgObject
+from staffUsers.permissions import IsStaffOrReadOnly, CanEditOrgObject, get_staff
+from organizations.models import Organization
 from .models import OrgUnit, OrgEmployee
 from .serializers import *
+from .tree import TREE_ORDERING, attach_subtree, build_forest
 from rest_framework.decorators import action
 
 
@@ -22,16 +28,77 @@ class OrgUnitViewSet(viewsets.ReadOnlyModelViewSet):
     def tree(self, request, *args, **kwargs):
         org_id = request.query_params.get(
             "organization_id") or request.query_params.get("organization")
-        roots = self.get_queryset().filter(parent__isnull=True)
+        units = OrgUnit.objects.all()
         if org_id:
-            roots = roots.filter(organization_id=org_id)
+            units = units.filter(organization_id=org_id)
+
+        # все узлы одним запросом, дерево собирается в памяти
+        forest = build_forest(list(units.order_by("organization", *TREE_ORDERING)))
+        roots = [root for org_roots in forest.values() for root in org_roots]
+        return Response(OrgUnitTreeSerializer(roots, many=True).data)
+
+    @action(detail=True, methods=["get"], url_path="subtree")
+    def subtree(self, request, *args, **kwargs):
+        unit = self.get_object()
+        attach_subtree(unit)
+        return Response(OrgUnitTreeSerializer(unit).data)
+
+    @action(detail=True, methods=["get"], url_path="ancestors")
+    def ancestors(self, request, *args, **kwargs):
+        unit = self.get_object()
+        include_self = request.query_params.get("include_self") in ("1", "true")
+        qs = unit.get_ancestors(include_self=include_self)
+        return Response(OrgUnitFlatSerializer(qs, many=True).data)
 
-        # подтягиваем детей заранее, если есть related_name='children'
-        roots = roots.prefetch_related("children")
+    @action(detail=True, methods=["post"], url_path="move",
+            permission_classes=[IsStaffOrReadOnly, CanEditOrgObject])
+    def move(self, request, *args, **kwargs):
+        """
+        POST {parent: id | null, order?: N} — перенос узла вместе с поддеревом.
+        Перенос внутрь собственного поддерева → 400.
+        """
+        unit = self.get_object()
+        params = OrgUnitMoveSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
 
-        ser = OrgUnitTreeSerializer(roots, many=True, context={
-                                    "visited": set(), "max_depth": 20})
-        return Response(ser.data)
+        unit.parent = params.validated_data["parent"]
+        if "order" in params.validated_data:
+            unit.order = params.validated_data["order"]
+        try:
+            unit.save()
+        except DjangoValidationError as exc:
+            return Response(exc.message_dict, status=status.HTTP_400_BAD_REQUEST)
+        return Response(OrgUnitFlatSerializer(unit).data)
+
+    @action(detail=False, methods=["post"], url_path="reorder",
+            permission_classes=[IsStaffOrReadOnly])
+    def reorder(self, request, *args, **kwargs):
+        """POST {organization, parent: id | null, ids: [...]} — порядок сестринских узлов."""
+        params = OrgUnitReorderSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        org = Organization.objects.filter(pk=data["organization"]).first()
+        if org is None:
+            return Response({"organization": "Организация не найдена"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        staff = get_staff(request.user)
+        if not (staff and staff.can_edit_org(org)):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        ids = list(dict.fromkeys(data["ids"]))
+        siblings = {
+            u.pk: u for u in OrgUnit.objects.filter(
+                organization=org, parent_id=data["parent"], pk__in=ids)
+        }
+        if len(siblings) != len(ids):
+            return Response({"ids": "Узлы должны быть детьми одного родителя"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        for position, pk in enumerate(ids):
+            siblings[pk].order = position
+        with transaction.atomic():
+            OrgUnit.objects.bulk_update(siblings.values(), ["order"])
+        return Response({"ids": ids})
 
 
 class OrgEmployeeViewSet(viewsets.ModelViewSet):
@@ -43,3 +110,25 @@ class OrgEmployeeViewSet(viewsets.ModelViewSet):
     #     if self.request.method in permissions.SAFE_METHODS:
     #         return [permissions.AllowAny()]
     #     return [permissions.IsAuthenticated(), IsStaffOrReadOnly()]
+
+    @action(detail=True, methods=["get"], url_path="chain")
+    def chain(self, request, *args, **kwargs):
+        """
+        Цепочка подчинения сотрудника: подразделения от корня до его узла
+        и руководители (is_head) каждого — двумя запросами.
+        """
+        employee = self.get_object()
+        if employee.unit is None:
+            return Response([])
+        units = list(employee.unit.get_ancestors(include_self=True))
+        heads = defaultdict(list)
+        for head in OrgEmployee.objects.filter(
+                unit__in=units, is_head=True).order_by("order", "full_name"):
+            heads[head.unit_id].append(head)
+        return Response([
+            {
+                "unit": OrgUnitFlatSerializer(unit).data,
+                "heads": OrgEmployeeBriefSerializer(heads[unit.pk], many=True).data,
+            }
+            for unit in units
+        ])
@@ -0,0 +1,152 @@
+# staffUsers/access.py
+"""
+Индекс прав сотрудника на редактирование организаций и категорий.
+
+Все кураторские связи с can_edit загружаются одним запросом, дальше
+can_edit_org / can_edit_category отвечают по множествам id без обращений
+к БД. Индекс кешируется:
+  - на экземпляре StaffProfile (user.staff живёт в пределах запроса);
+  - в кеше default между запросами, если STAFF_PERMISSIONS_CACHE_TIMEOUT > 0
+    и кеш общий для процессов. Ключ привязан к версии «staff-perms:<id>»,
+    её увеличивают сигналы при изменении StaffCuratorship и роли/должности
+    сотрудника (signals.py). На locmem версия растёт только в процессе, где
+    была правка, и другие воркеры до TTL отдавали бы старые права — поэтому
+    там индекс между запросами не кешируется.
+
+Для списков те же правила считаются в SQL (annotate_org_can_edit /
+annotate_category_can_edit): флаг can_edit у каждой строки через Exists()
+по StaffCuratorship — без проверки объект за объектом.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Value
+
+from backend.versions import bump_version, get_version, is_shared
+
+INSTANCE_ATTR = "_permission_index"
+
+
+@dataclass(frozen=True)
+class PermissionIndex:
+    admin_like: bool
+    # замдиректор: право на любые организации при наличии хотя бы одной связи
+    any_edit_link: bool
+    deputy: bool
+    org_ids: frozenset
+    category_ids: frozenset
+
+    def can_edit_org(self, org):
+        if self.admin_like:
+            return True
+        if self.deputy:
+            return self.any_edit_link
+        return org.pk in self.org_ids or org.category_id in self.category_ids
+
+    def can_edit_category(self, cat):
+        if self.admin_like:
+            return True
+        return cat.pk in self.category_ids
+
+
+def _namespace(staff_id):
+    return f"staff-perms:{staff_id}"
+
+
+def _cache_timeout():
+    if not is_shared():
+        return 0
+    return getattr(settings, "STAFF_PERMISSIONS_CACHE_TIMEOUT", 0)
+
+
+def _load(staff):
+    from .models import StaffCuratorship
+
+    org_ids, category_ids = set(), set()
+    if not staff.is_admin_like():
+        rows = StaffCuratorship.objects.filter(
+            staff_id=staff.pk, can_edit=True,
+        ).values_list("organization_id", "category_id")
+        for org_id, category_id in rows:
+            if org_id is not None:
+                org_ids.add(org_id)
+            if category_id is not None:
+                category_ids.add(category_id)
+    return PermissionIndex(
+        admin_like=staff.is_admin_like(),
+        any_edit_link=bool(org_ids or category_ids),
+        deputy=staff.position == staff.Position.DEPUTY_DIRECTOR,
+        org_ids=frozenset(org_ids),
+        category_ids=frozenset(category_ids),
+    )
+
+
+def permission_index(staff):
+    index = getattr(staff, INSTANCE_ATTR, None)
+    if index is not None:
+        return index
+
+    timeout = _cache_timeout()
+    if timeout:
+        # роль и должность входят в ключ: несохранённые правки экземпляра
+        # не смешиваются с закешированным индексом
+        key = "staff-perms:{}:{}:{}:{}".format(
+            staff.pk, get_version(_namespace(staff.pk)), staff.role, staff.position)
+        index = cache.get(key)
+        if index is None:
+            index = _load(staff)
+            cache.set(key, index, timeout)
+    else:
+        index = _load(staff)
+
+    setattr(staff, INSTANCE_ATTR, index)
+    return index
+
+
+def reset_permission_index(staff):
+    """Сбросить индекс на экземпляре (после изменения связей в том же запросе)."""
+    staff.__dict__.pop(INSTANCE_ATTR, None)
+
+
+def invalidate_permissions(staff_id):
+    """Сбросить закешированные между запросами индексы сотрудника."""
+    bump_version(_namespace(staff_id))
+
+
+# ---- флаг can_edit в SQL для списков ----
+
+def _edit_links(staff):
+    from .models import StaffCuratorship
+    return StaffCuratorship.objects.filter(staff_id=staff.pk, can_edit=True)
+
+
+def _can_edit_expression(staff, condition):
+    if staff is None:
+        return Value(False)
+    if staff.is_admin_like():
+        return Value(True)
+    return ExpressionWrapper(condition, output_field=BooleanField())
+
+
+def annotate_org_can_edit(queryset, staff, name="can_edit"):
+    """Организации + булево поле name по правилам StaffProfile.can_edit_org."""
+    if staff is not None and staff.position == staff.Position.DEPUTY_DIRECTOR:
+        condition = Exists(_edit_links(staff))
+    elif staff is not None:
+        # два Exists вместо одного с OR — каждый идёт по своему уникальному индексу
+        condition = (
+            Exists(_edit_links(staff).filter(organization=OuterRef("pk")))
+            | Exists(_edit_links(staff).filter(category=OuterRef("category_id")))
+        )
+    else:
+        condition = None
+    return queryset.annotate(**{name: _can_edit_expression(staff, condition)})
+
+
+def annotate_category_can_edit(queryset, staff, name="can_edit"):
+    """Категории + булево поле name по правилам StaffProfile.can_edit_category."""
+    condition = None
+    if staff is not None:
+        condition = Exists(_edit_links(staff).filter(category=OuterRef("pk")))
+    return queryset.annotate(**{name: _can_edit_expression(staff, condition)})
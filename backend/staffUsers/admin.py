@@ -1,6 +1,8 @@
 # staffUsers/admin.py
 from django.contrib import admin
-from .models import StaffProfile, StaffCuratorship, AuditEntry, ManagementUnit, Department, Center
+from .models import (
+    AuditArchive, AuditEntry, Center, Department, ManagementUnit, StaffCuratorship, StaffProfile,
+)
 
 
 @admin.register(Center)
@@ -48,4 +50,14 @@ class StaffCuratorshipAdmin(admin.ModelAdmin):
 class AuditEntryAdmin(admin.ModelAdmin):
     list_display = ("created", "actor", "target", "org", "category", "action")
     list_filter = ("target", "action", "created")
+    list_select_related = ("actor", "org", "category")
+    # сортировка -created идёт по индексу; точный COUNT(*) всей таблицы не считаем
+    show_full_result_count = False
     autocomplete_fields = ("actor", "org", "category")
+
+
+@admin.register(AuditArchive)
+class AuditArchiveAdmin(admin.ModelAdmin):
+    list_display = ("month", "part", "rows", "first_id", "last_id", "created_at")
+    readonly_fields = ("month", "part", "file", "rows", "first_id", "last_id",
+                       "object_keys", "created_at")
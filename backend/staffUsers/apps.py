@@ -6,4 +6,13 @@ class StaffusersConfig(AppConfig):
     name = 'staffUsers'
 
     def ready(self):
+        from backend import counters
         from . import signals  # noqa
+        from .models import StaffCuratorship, StaffProfile
+
+        counters.register(counters.Counter(
+            StaffProfile, StaffCuratorship, "staff", "curated_orgs_count",
+            when={"organization__isnull": False}))
+        counters.register(counters.Counter(
+            StaffProfile, StaffCuratorship, "staff", "curated_cats_count",
+            when={"category__isnull": False}))
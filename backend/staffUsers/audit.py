@@ -0,0 +1,93 @@
+# staffUsers/audit.py
+"""
+Запись аудита (AuditEntry) с диффом полей.
+
+record() / record_many() не пишут в БД сразу: записи одного вызова уходят
+одним bulk_create после коммита транзакции (transaction.on_commit).
+Откат транзакции или savepoint-а, внутри которого был вызов, выбрасывает
+и его записи аудита. Вне транзакции on_commit срабатывает сразу — запись
+уходит немедленно. Много записей (импорт) — одним record_many.
+
+    before = audit.snapshot(org)
+    ... сохранение ...
+    audit.record(staff, org, "updated", changes=audit.diff(before, audit.snapshot(org)))
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.fields.files import FieldFile
+
+from organizations.models import Category, Organization
+
+from .models import AuditEntry
+
+# служебные поля, изменение которых в дифф не попадает
+IGNORED_FIELDS = {"id", "updated", "time_create", "objects_count", "today_count", "today_date"}
+
+_TARGETS = {
+    Organization: (AuditEntry.Target.ORG, "org"),
+    Category: (AuditEntry.Target.CAT, "category"),
+}
+
+
+def _json(value):
+    if isinstance(value, FieldFile):
+        return value.name or None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def snapshot(instance):
+    """{attname: значение} конкретных полей модели — для diff."""
+    return {
+        field.attname: _json(getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields
+        if field.attname not in IGNORED_FIELDS
+    }
+
+
+def diff(before, after):
+    """{поле: [было, стало]} только для изменившихся полей."""
+    changes = {}
+    for name in before.keys() | after.keys():
+        old, new = before.get(name), after.get(name)
+        if old != new:
+            changes[name] = [old, new]
+    return changes
+
+
+def build(actor, instance, action, changes=None, **extra):
+    """
+    Несохранённая AuditEntry. Для удаления FK на объект не ставится
+    (объекта к моменту записи уже нет) — остаётся object_id.
+    """
+    target, fk = _TARGETS[type(instance)]
+    fields = dict(extra)
+    if changes:
+        fields["changes"] = changes
+    entry = AuditEntry(
+        actor=actor, target=target, object_id=instance.pk,
+        action=action, fields=fields,
+    )
+    if action != "deleted":
+        setattr(entry, fk, instance)
+    return entry
+
+
+def record_many(entries, using=DEFAULT_DB_ALIAS):
+    entries = list(entries)
+    if not entries:
+        return
+    # свой on_commit на каждый вызов: Django отбросит его вместе
+    # с откатанным savepoint-ом
+    transaction.on_commit(
+        lambda: AuditEntry.objects.using(using).bulk_create(entries, batch_size=500),
+        using=using)
+
+
+def record(actor, instance, action, changes=None, **extra):
+    record_many([build(actor, instance, action, changes, **extra)])
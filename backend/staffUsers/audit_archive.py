@@ -0,0 +1,231 @@
+# staffUsers/audit_archive.py
+"""
+Хранение аудита: архивирование старых записей и чтение истории
+поверх «живой» таблицы и архива.
+
+archive(): месяцы, целиком старше AUDIT_RETENTION_DAYS, выгружаются в
+файлы JSONL.gz (по одному сегменту AuditArchive на месяц) и удаляются из
+AuditEntry пачками по AUDIT_ARCHIVE_BATCH_SIZE — каждая пачка в своей
+короткой транзакции, без долгих блокировок таблицы. Сначала сохраняется
+файл и строка сегмента, потом удаляются записи: если процесс прервётся,
+повторный запуск дочистит уже заархивированное (id <= last_id сегмента).
+
+history(): история объекта новыми сверху — сначала из AuditEntry (индекс
+target, object_id, -created, -id), затем из сегментов архива, в
+которых объект встречается. Формат записей — как у AuditEntrySerializer.
+"""
+import base64
+import gzip
+import json
+import tempfile
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditArchive, AuditEntry
+from .serializers import AuditEntrySerializer
+
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month):
+    return date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+
+def _aware(day):
+    return timezone.make_aware(datetime(day.year, day.month, day.day))
+
+
+def retention_cutoff(days=None, now=None):
+    """Начало первого месяца, который ещё хранится в БД (None — архив выключен)."""
+    days = settings.AUDIT_RETENTION_DAYS if days is None else days
+    if not days:
+        return None
+    edge = timezone.localtime(now) - timedelta(days=days)
+    return _month_start(edge)
+
+
+def object_key(target, object_id):
+    return f"{target}:{object_id}"
+
+
+def _row(entry):
+    data = AuditEntrySerializer(entry).data
+    data["org"] = entry.org_id
+    data["category"] = entry.category_id
+    return data
+
+
+def _cleanup(segment, batch_size):
+    """Удаляет из AuditEntry записи, уже лежащие в сегменте."""
+    start, end = _aware(segment.month), _aware(_next_month(segment.month))
+    live = AuditEntry.objects.filter(
+        created__gte=start, created__lt=end,
+        pk__gte=segment.first_id, pk__lte=segment.last_id,
+    )
+    removed = 0
+    while True:
+        ids = list(live.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return removed
+        # у AuditEntry нет сигналов и обратных связей — это один DELETE
+        with transaction.atomic():
+            removed += AuditEntry.objects.filter(pk__in=ids).delete()[0]
+
+
+def _archive_month(month, batch_size):
+    start, end = _aware(month), _aware(_next_month(month))
+    entries = (
+        AuditEntry.objects
+        .filter(created__gte=start, created__lt=end)
+        .select_related("actor")
+        .order_by("pk")
+    )
+    rows, first_id, last_id, keys = 0, None, None, set()
+    with tempfile.NamedTemporaryFile(suffix=".jsonl.gz") as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode="wb") as gz:
+            for entry in entries.iterator(chunk_size=batch_size):
+                gz.write(json.dumps(_row(entry), ensure_ascii=False).encode("utf-8") + b"\n")
+                rows += 1
+                first_id = entry.pk if first_id is None else first_id
+                last_id = entry.pk
+                if entry.object_id is not None:
+                    keys.add(object_key(entry.target, entry.object_id))
+        if not rows:
+            return None
+
+        tmp.flush()
+        tmp.seek(0)
+        part = (
+            AuditArchive.objects.filter(month=month)
+            .order_by("-part").values_list("part", flat=True).first() or 0
+        ) + 1
+        name = f"audit-{month:%Y-%m}" + (f"-{part}" if part > 1 else "") + ".jsonl.gz"
+        segment = AuditArchive(
+            month=month, part=part, rows=rows,
+            first_id=first_id, last_id=last_id, object_keys=sorted(keys),
+        )
+        segment.file.save(name, File(tmp, name=name), save=False)
+        segment.save()
+    return segment
+
+
+def archive(days=None, batch_size=None, now=None, dry_run=False, on_month=None):
+    """
+    Архивирует месяцы старше срока хранения. Возвращает
+    [(месяц, записей в архиве, удалено из БД)]; dry_run — только подсчёт.
+    """
+    batch_size = batch_size or settings.AUDIT_ARCHIVE_BATCH_SIZE
+    cutoff = retention_cutoff(days, now)
+    if cutoff is None:
+        return []
+
+    # дочистить сегменты, прерванные между записью файла и удалением
+    done = []
+    for segment in AuditArchive.objects.filter(month__lt=cutoff):
+        removed = 0 if dry_run else _cleanup(segment, batch_size)
+        if removed:
+            done.append((segment.month, 0, removed))
+
+    old = AuditEntry.objects.filter(created__lt=_aware(cutoff))
+    oldest = old.order_by("created").values_list("created", flat=True).first()
+    if oldest is None:
+        return done
+
+    month = _month_start(timezone.localtime(oldest))
+    while month < cutoff:
+        if dry_run:
+            count = old.filter(created__gte=_aware(month),
+                               created__lt=_aware(_next_month(month))).count()
+            if count:
+                done.append((month, count, 0))
+        else:
+            segment = _archive_month(month, batch_size)
+            if segment is not None:
+                done.append((month, segment.rows, _cleanup(segment, batch_size)))
+                if on_month:
+                    on_month(*done[-1])
+        month = _next_month(month)
+    return done
+
+
+# ---- чтение ----
+
+def _encode_cursor(row):
+    raw = json.dumps([row["created"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """(created, id) из курсора; ValueError — если курсор испорчен."""
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        created, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created = parse_datetime(created)
+    except Exception:
+        raise ValueError("Неверный курсор")
+    if created is None:
+        raise ValueError("Неверный курсор")
+    return created, int(pk)
+
+
+def _before(row_created, row_id, cursor):
+    if cursor is None:
+        return True
+    return (row_created, row_id) < cursor
+
+
+def _read_segment(segment, key):
+    with segment.file.open("rb") as fh, gzip.GzipFile(fileobj=fh, mode="rb") as gz:
+        for line in gz:
+            row = json.loads(line)
+            if object_key(row["target"], row["object_id"]) == key:
+                yield row
+
+
+def history(target, object_id, limit=50, cursor=None):
+    """
+    Записи объекта новыми сверху: (rows, next_cursor).
+    cursor — (created, id) последней записи предыдущей страницы.
+    """
+    live = (
+        AuditEntry.objects
+        .filter(target=target, object_id=object_id)
+        .select_related("actor")
+        .order_by("-created", "-id")
+    )
+    if cursor is not None:
+        created, pk = cursor
+        live = live.filter(created__lte=created).exclude(created=created, id__gte=pk)
+    rows = [_row(e) for e in live[:limit + 1]]
+
+    if len(rows) <= limit:
+        seen = {row["id"] for row in rows}
+        key = object_key(target, object_id)
+        bound = cursor[0] if cursor else None
+        # сегментов — по одному на месяц, фильтр по object_keys — в Python
+        segments = AuditArchive.objects.all()
+        if bound is not None:
+            segments = segments.filter(month__lte=_month_start(timezone.localtime(bound)))
+        for segment in segments.order_by("-month", "-part"):
+            if key not in segment.object_keys:
+                continue
+            archived = [
+                row for row in _read_segment(segment, key)
+                if row["id"] not in seen
+                and _before(parse_datetime(row["created"]), row["id"], cursor)
+            ]
+            archived.sort(key=lambda r: (parse_datetime(r["created"]), r["id"]), reverse=True)
+            rows.extend(archived)
+            if len(rows) > limit:
+                break
+
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from staffUsers.audit_archive import archive, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = ("Переносит записи аудита старше срока хранения (целыми месяцами) "
+            "в архив JSONL.gz и удаляет их из БД")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="срок хранения в БД, дней (по умолчанию AUDIT_RETENTION_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="записей на одну транзакцию удаления")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="только показать, что будет перенесено")
+
+    def handle(self, *args, **opts):
+        cutoff = retention_cutoff(opts["days"])
+        if cutoff is None:
+            self.stdout.write("Архивирование выключено (AUDIT_RETENTION_DAYS=0)")
+            return
+
+        result = archive(days=opts["days"], batch_size=opts["batch_size"],
+                         dry_run=opts["dry_run"])
+        for month, archived, removed in result:
+            self.stdout.write(f"{month:%Y-%m}: в архив {archived}, удалено из БД {removed}")
+        verb = "Будет перенесено" if opts["dry_run"] else "Перенесено"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} записей: {sum(r[1] for r in result)} (всё раньше {cutoff:%Y-%m})"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:23
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    AuditEntry = apps.get_model("staffUsers", "AuditEntry")
+    AuditEntry.objects.filter(target="org", org__isnull=False).update(object_id=F("org_id"))
+    AuditEntry.objects.filter(target="cat", category__isnull=False).update(
+        object_id=F("category_id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0005_category_counters'),
+        ('staffUsers', '0003_center_alter_managementunit_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditentry',
+            name='object_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auditentry',
+            index=models.Index(fields=['created'], name='audit_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditentry',
+            index=models.Index(fields=['target', 'object_id', '-created', '-id'], name='audit_object_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditentry',
+            index=models.Index(fields=['org', '-created'], name='audit_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditentry',
+            index=models.Index(fields=['category', '-created'], name='audit_cat_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staffUsers', '0004_audit_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('part', models.PositiveSmallIntegerField(default=1)),
+                ('file', models.FileField(upload_to='audit_archive/%Y/')),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('first_id', models.BigIntegerField()),
+                ('last_id', models.BigIntegerField()),
+                ('object_keys', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-month', '-part'],
+                'constraints': [models.UniqueConstraint(fields=('month', 'part'), name='uniq_audit_archive_part')],
+            },
+        ),
+    ]
@@ -3,21 +3,12 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
-from django.utils.text import slugify
 
+from backend.counters import CountedQuerySet
+from backend.slugs import save_with_slug
 from organizations.models import Organization, Category
 
 
-def unique_slug(model, base):
-    base = slugify(base or "") or "item"
-    slug = base
-    i = 1
-    while model.objects.filter(slug=slug).exists():
-        i += 1
-        slug = f"{base}-{i}"
-    return slug
-
-
 class Center(models.Model):
     """Центр (верхний уровень иерархии)."""
     name = models.CharField(max_length=200, unique=True)
@@ -31,7 +22,8 @@ class Center(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = unique_slug(Center, self.name)
+            return save_with_slug(
+                self, self.name, lambda: super(Center, self).save(*args, **kwargs))
         return super().save(*args, **kwargs)
 
 
@@ -55,7 +47,8 @@ class ManagementUnit(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = unique_slug(ManagementUnit, self.name)
+            return save_with_slug(
+                self, self.name, lambda: super(ManagementUnit, self).save(*args, **kwargs))
         return super().save(*args, **kwargs)
 
 
@@ -79,8 +72,9 @@ class Department(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = unique_slug(
-                Department, f"{self.management.name}-{self.name}")
+            return save_with_slug(
+                self, f"{self.management.name}-{self.name}",
+                lambda: super(Department, self).save(*args, **kwargs))
         return super().save(*args, **kwargs)
 
 
@@ -136,7 +130,7 @@ class StaffProfile(models.Model):
     # если нужно оставить ваш прежний флаг
     management_flag = models.BooleanField(default=False)
 
-    # кеш-счётчики кураторств
+    # кеш-счётчики кураторств (backend/counters.py, сверка — reconcile_counters)
     curated_orgs_count = models.PositiveIntegerField(default=0)
     curated_cats_count = models.PositiveIntegerField(default=0)
 
@@ -198,40 +192,37 @@ class StaffProfile(models.Model):
     def is_admin_like(self):
         return self.role in (self.Role.ADMIN, self.Role.MANAGER) or self.position == self.Position.DIRECTOR
 
+    def permission_index(self):
+        """Индекс прав на редактирование (один запрос, см. staffUsers/access.py)."""
+        from .access import permission_index
+        return permission_index(self)
+
     def can_edit_org(self, org: Organization):
-        if self.is_admin_like():
-            return True
-        # замдиректор может редактировать всё в своём управлении (по договорённости),
-        # если организация помечена его управлением через кураторство категории/организации
-        if self.position == self.Position.DEPUTY_DIRECTOR:
-            return self.curator_links.filter(can_edit=True).exists()
-        # начальник отдела — если есть кураторство на категорию или орг
-        if self.position == self.Position.HEAD_OF_DEPT:
-            return (
-                self.curator_links.filter(organization=org, can_edit=True).exists() or
-                self.curator_links.filter(
-                    category=org.category, can_edit=True).exists()
-            )
-        # прочие — только явные кураторские связи
-        return (
-            self.curator_links.filter(organization=org, can_edit=True).exists() or
-            self.curator_links.filter(
-                category=org.category, can_edit=True).exists()
-        )
+        # администраторы/директор — всё; замдиректор — всё при наличии хотя бы
+        # одной кураторской связи с правом редактирования; прочие (в т.ч.
+        # начальник отдела) — по кураторству организации или её категории
+        return self.permission_index().can_edit_org(org)
 
     def can_edit_category(self, cat: Category):
-        if self.is_admin_like():
-            return True
-        if self.position == self.Position.DEPUTY_DIRECTOR:
-            return self.curator_links.filter(category=cat, can_edit=True).exists()
-        if self.position == self.Position.HEAD_OF_DEPT:
-            return self.curator_links.filter(category=cat, can_edit=True).exists()
-        return self.curator_links.filter(category=cat, can_edit=True).exists()
+        return self.permission_index().can_edit_category(cat)
+
+
+class CuratorshipQuerySet(CountedQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # счётчики ведёт CountedQuerySet; сигналов нет — индекс прав сбрасываем сами
+        from .access import invalidate_permissions
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+        for staff_id in {obj.staff_id for obj in objs}:
+            invalidate_permissions(staff_id)
+        return objs
 
 
 class StaffCuratorship(models.Model):
     """
     Связь «сотрудник — организация ИЛИ категория».
+    Счётчики StaffProfile.curated_orgs_count / curated_cats_count ведёт
+    backend/counters.py (+1/-1 на создание, удаление и перенос связи).
     """
     staff = models.ForeignKey(
         StaffProfile, on_delete=models.CASCADE, related_name="curator_links")
@@ -242,6 +233,8 @@ class StaffCuratorship(models.Model):
     can_edit = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=timezone.now)
 
+    objects = CuratorshipQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -255,24 +248,23 @@ class StaffCuratorship(models.Model):
         ]
 
     def clean(self):
-        if bool(self.organization) == bool(self.category):
+        if (self.organization_id is None) == (self.category_id is None):
             raise ValidationError(
                 "Укажите ИЛИ organization, ИЛИ category (но не оба).")
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        # уникальность и ссылки проверяют ограничения БД — full_clean
+        # здесь стоил бы нескольких лишних запросов на каждое сохранение
+        self.clean()
         super().save(*args, **kwargs)
-        # обновим счётчики
-        StaffProfile.objects.filter(pk=self.staff_id).update(
-            curated_orgs_count=StaffCuratorship.objects.filter(
-                staff_id=self.staff_id, organization__isnull=False).count(),
-            curated_cats_count=StaffCuratorship.objects.filter(
-                staff_id=self.staff_id, category__isnull=False).count(),
-        )
 
 
 class AuditEntry(models.Model):
-    """Простой аудит."""
+    """
+    Аудит изменений организаций и категорий.
+    Пишется пачками после коммита (staffUsers/audit.py); fields["changes"] —
+    дифф {поле: [было, стало]}.
+    """
     class Target(models.TextChoices):
         ORG = "org", "Организация"
         CAT = "cat", "Категория"
@@ -284,9 +276,46 @@ class AuditEntry(models.Model):
         Organization, on_delete=models.SET_NULL, null=True, blank=True)
     category = models.ForeignKey(
         Category, on_delete=models.SET_NULL, null=True, blank=True)
+    # id объекта — остаётся и после его удаления (org/category станут NULL)
+    object_id = models.BigIntegerField(null=True, blank=True)
     action = models.CharField(max_length=32)  # created/updated/deleted
     fields = models.JSONField(default=dict, blank=True)
     created = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            # выборки и очистка по периодам
+            models.Index(fields=["created"], name="audit_created_idx"),
+            # история объекта, keyset (-created, -id)
+            models.Index(fields=["target", "object_id", "-created", "-id"],
+                         name="audit_object_history_idx"),
+            models.Index(fields=["org", "-created"], name="audit_org_created_idx"),
+            models.Index(fields=["category", "-created"], name="audit_cat_created_idx"),
+        ]
+
+
+class AuditArchive(models.Model):
+    """
+    Сегмент архива аудита: записи AuditEntry одного месяца в файле
+    JSONL.gz (staffUsers/audit_archive.py). object_keys — ключи "org:<id>" /
+    "cat:<id>" объектов сегмента, чтобы история объекта не распаковывала
+    лишние файлы.
+    """
+    month = models.DateField()  # первое число месяца
+    part = models.PositiveSmallIntegerField(default=1)
+    file = models.FileField(upload_to="audit_archive/%Y/")
+    rows = models.PositiveIntegerField(default=0)
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    object_keys = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-month", "-part"]
+        constraints = [
+            models.UniqueConstraint(fields=["month", "part"], name="uniq_audit_archive_part"),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} #{self.part} ({self.rows})"
@@ -43,3 +43,9 @@ class CanEditOrgObject(BasePermission):
             if unit is not None:
                 org = getattr(unit, "organization", None)
         return bool(org and staff.can_edit_org(org))
+
+class IsAdminLikeStaff(BasePermission):
+    """Администратор, менеджер или директор (StaffProfile.is_admin_like)."""
+    def has_permission(self, request, view):
+        staff = get_staff(request.user)
+        return bool(staff and staff.is_admin_like())
@@ -1,6 +1,6 @@
 # staffUsers/serializers.py
 from rest_framework import serializers
-from .models import StaffProfile, StaffCuratorship, ManagementUnit, Department, Center
+from .models import AuditEntry, StaffProfile, StaffCuratorship, ManagementUnit, Department, Center
 from organizations.models import Organization
 from organizations.serializer import OrganizationSerializer
 
@@ -106,3 +106,21 @@ class StaffProfileSerializer(serializers.ModelSerializer):
         qs = Organization.objects.filter(
             category_id__in=cat_ids).select_related("category")
         return BriefOrgSerializer(qs, many=True).data
+
+
+class AuditEntrySerializer(serializers.ModelSerializer):
+    actor_fio = serializers.CharField(source="actor.fio", read_only=True, default=None)
+    changes = serializers.SerializerMethodField()
+    # откуда изменение: None — через API, "import" — массовый импорт
+    source = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AuditEntry
+        fields = ["id", "created", "action", "target", "object_id",
+                  "actor", "actor_fio", "source", "changes"]
+
+    def get_changes(self, obj):
+        return (obj.fields or {}).get("changes", {})
+
+    def get_source(self, obj):
+        return (obj.fields or {}).get("source")
@@ -3,7 +3,8 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from organizations.models import Organization, Category
-from .models import StaffProfile, AuditEntry
+from .access import invalidate_permissions, reset_permission_index
+from .models import StaffProfile, StaffCuratorship, AuditEntry
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -22,3 +23,19 @@ def audit_org_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Organization)
 def audit_org_delete(sender, instance, **kwargs):
     pass
+
+
+# индекс прав (staffUsers/access.py): сброс при изменении кураторств и роли
+@receiver(post_save, sender=StaffCuratorship)
+@receiver(post_delete, sender=StaffCuratorship)
+def invalidate_curatorship_permissions(sender, instance, **kwargs):
+    invalidate_permissions(instance.staff_id)
+
+
+@receiver(post_save, sender=StaffProfile)
+def invalidate_profile_permissions(sender, instance, created, update_fields=None, **kwargs):
+    # новый профиль тоже сбрасывает версию: id мог достаться от удалённого
+    if not created and update_fields is not None and not {"role", "position"} & set(update_fields):
+        return
+    reset_permission_index(instance)
+    invalidate_permissions(instance.pk)
@@ -0,0 +1,14 @@
+# staffUsers/tasks.py
+from jobs.registry import task
+
+from .audit_archive import archive
+
+
+@task("audit.archive", max_attempts=1)
+def archive_audit(job, days=None):
+    """Архивирование старого аудита (то же, что команда archive_audit)."""
+    def progress(month, archived, removed):
+        job.set_progress(message=f"{month:%Y-%m}: {archived}", check_cancel=False)
+
+    result = archive(days=days, on_month=progress)
+    return {"months": [[f"{m:%Y-%m}", a, r] for m, a, r in result]}
@@ -1,3 +1,275 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from organizations.models import Category, Organization
+from organizations.serializer import OrganizationSerializer
+
+from . import audit, audit_archive
+from .models import AuditArchive, AuditEntry, StaffCuratorship, StaffProfile
+
+User = get_user_model()
+
+
+def shared_cache(testcase):
+    """Файловый кеш default — общий для процессов, в отличие от locmem."""
+    location = tempfile.mkdtemp()
+    testcase.addCleanup(shutil.rmtree, location, ignore_errors=True)
+    return override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": location,
+    }}, STAFF_PERMISSIONS_CACHE_TIMEOUT=300)
+
+
+def make_org(category, n):
+    return Organization.objects.create(
+        name=f"Орг {n}", slug=f"org-{n}", description="", address="", lotus="",
+        phone="", email=f"org{n}@example.com", category=category,
+    )
+
+
+class CuratorshipCountersTests(TestCase):
+    """curated_orgs_count / curated_cats_count совпадают с реальным COUNT."""
+
+    def setUp(self):
+        self.s1 = User.objects.create_user("s1").staff
+        self.s2 = User.objects.create_user("s2").staff
+        self.cat = Category.objects.create(name="Банки", slug="banki")
+        self.cat2 = Category.objects.create(name="Страховые", slug="strakhovye")
+        self.orgs = [make_org(self.cat, n) for n in range(4)]
+
+    def assertCounts(self, *staff_list):
+        for staff in staff_list:
+            staff.refresh_from_db()
+            links = StaffCuratorship.objects.filter(staff=staff)
+            self.assertEqual(
+                (staff.curated_orgs_count, staff.curated_cats_count),
+                (links.filter(organization__isnull=False).count(),
+                 links.filter(category__isnull=False).count()),
+                staff.user.username)
+
+    def test_create_retarget_delete(self):
+        link = StaffCuratorship.objects.create(staff=self.s1, organization=self.orgs[0])
+        StaffCuratorship.objects.create(staff=self.s1, category=self.cat)
+        self.assertCounts(self.s1)
+        self.assertEqual((self.s1.curated_orgs_count, self.s1.curated_cats_count), (1, 1))
+
+        # организация → категория: -1 у одного счётчика, +1 у другого
+        link.organization, link.category = None, self.cat2
+        link.save()
+        self.assertCounts(self.s1)
+        self.assertEqual((self.s1.curated_orgs_count, self.s1.curated_cats_count), (0, 2))
+
+        # перенос на другого сотрудника
+        link.staff = self.s2
+        link.save()
+        self.assertCounts(self.s1, self.s2)
+
+        link.delete()
+        StaffCuratorship.objects.filter(staff=self.s1).delete()
+        self.assertCounts(self.s1, self.s2)
+        self.assertEqual((self.s1.curated_orgs_count, self.s1.curated_cats_count), (0, 0))
+
+    def test_cascade(self):
+        StaffCuratorship.objects.create(staff=self.s1, organization=self.orgs[0])
+        StaffCuratorship.objects.create(staff=self.s1, organization=self.orgs[1])
+        StaffCuratorship.objects.create(staff=self.s2, category=self.cat2)
+        self.orgs[0].delete()
+        self.cat2.delete()
+        self.assertCounts(self.s1, self.s2)
+        self.assertEqual((self.s1.curated_orgs_count, self.s2.curated_cats_count), (1, 0))
+
+    def test_bulk_create_and_ignore_conflicts(self):
+        StaffCuratorship.objects.bulk_create([
+            StaffCuratorship(staff=self.s1, organization=self.orgs[0]),
+            StaffCuratorship(staff=self.s1, category=self.cat),
+            StaffCuratorship(staff=self.s2, organization=self.orgs[0]),
+        ])
+        self.assertCounts(self.s1, self.s2)
+
+        # orgs[0] у s1 уже есть — вставится только orgs[1]
+        StaffCuratorship.objects.bulk_create([
+            StaffCuratorship(staff=self.s1, organization=self.orgs[0]),
+            StaffCuratorship(staff=self.s1, organization=self.orgs[1]),
+        ], ignore_conflicts=True)
+        self.assertCounts(self.s1, self.s2)
+        self.assertEqual(self.s1.curated_orgs_count, 2)
+
+    def test_bulk_create_invalidates_permissions(self):
+        org = self.orgs[0]
+        with shared_cache(self):
+            self.assertFalse(StaffProfile.objects.get(pk=self.s1.pk).can_edit_org(org))
+            StaffCuratorship.objects.bulk_create(
+                [StaffCuratorship(staff=self.s1, organization=org)])
+            self.assertTrue(StaffProfile.objects.get(pk=self.s1.pk).can_edit_org(org))
+
+    def test_apply_curator_from_serializer(self):
+        org = self.orgs[0]
+
+        def set_curator(value):
+            serializer = OrganizationSerializer(org, data={"curator": value}, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        set_curator(self.s1.pk)
+        self.assertCounts(self.s1, self.s2)
+        self.assertEqual(self.s1.curated_orgs_count, 1)
+
+        # повтор того же куратора не накручивает счётчик
+        set_curator(self.s1.pk)
+        set_curator(self.s2.pk)
+        self.assertCounts(self.s1, self.s2)
+        self.assertEqual((self.s1.curated_orgs_count, self.s2.curated_orgs_count), (0, 1))
+
+        set_curator(None)
+        self.assertCounts(self.s1, self.s2)
+        self.assertEqual(self.s2.curated_orgs_count, 0)
+
+
+class PermissionCacheTests(TestCase):
+    """Индекс прав кешируется между запросами только в общем кеше."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user("s1").staff
+        self.org = make_org(Category.objects.create(name="Банки", slug="banki"), 1)
+
+    def queries_for_check(self):
+        # новый экземпляр — как user.staff в следующем запросе
+        staff = StaffProfile.objects.get(pk=self.staff.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            staff.can_edit_org(self.org)
+        return len(ctx)
+
+    @override_settings(STAFF_PERMISSIONS_CACHE_TIMEOUT=300)
+    def test_locmem_not_cached(self):
+        self.assertEqual(self.queries_for_check(), 1)
+        self.assertEqual(self.queries_for_check(), 1)
+
+    def test_shared_cache_hit_and_invalidation(self):
+        with shared_cache(self):
+            self.assertEqual(self.queries_for_check(), 1)
+            self.assertEqual(self.queries_for_check(), 0)
+            StaffCuratorship.objects.create(
+                staff=self.staff, organization=self.org, can_edit=True)
+            self.assertEqual(self.queries_for_check(), 1)
+            self.assertTrue(StaffProfile.objects.get(pk=self.staff.pk).can_edit_org(self.org))
+
+
+class AuditBufferTests(TestCase):
+    """Записи аудита уходят после коммита и только из неоткатанных блоков."""
+
+    def setUp(self):
+        self.cat = Category.objects.create(name="Банки", slug="banki")
+
+    def actions(self):
+        return sorted(AuditEntry.objects.values_list("action", flat=True))
+
+    def test_written_after_commit_in_one_insert(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                audit.record_many(
+                    audit.build(None, self.cat, "updated", changes={"n": [i, i + 1]})
+                    for i in range(5))
+                self.assertFalse(AuditEntry.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(AuditEntry.objects.count(), 5)
+
+    def test_savepoint_rollback_drops_its_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                audit.record(None, self.cat, "outer")
+                try:
+                    with transaction.atomic():
+                        audit.record(None, self.cat, "inner")
+                        raise ValueError
+                except ValueError:
+                    pass
+                audit.record(None, self.cat, "after")
+        self.assertEqual(self.actions(), ["after", "outer"])
+
+    def test_outer_rollback_drops_everything(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    audit.record(None, self.cat, "outer")
+                    with transaction.atomic():
+                        audit.record(None, self.cat, "inner")
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(self.actions(), [])
+
+
+class AuditArchiveTests(TestCase):
+    """Архив по месяцам и история объекта поверх БД и архива."""
+
+    NOW = timezone.make_aware(datetime(2025, 6, 15, 12, 0))
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+
+        cat = Category.objects.create(name="Банки", slug="banki")
+        self.org, self.other = make_org(cat, 1), make_org(cat, 2)
+        entries = []
+        for day in range(0, 200, 5):
+            org = self.org if day % 10 == 0 else self.other
+            entries.append(self.entry(org, self.NOW - timedelta(days=day), day))
+        # одинаковое время по обе стороны границы архива — порядок по id
+        for created in (timezone.make_aware(datetime(2025, 3, 31, 23, 0)),
+                        timezone.make_aware(datetime(2025, 4, 1, 1, 0))):
+            entries += [self.entry(self.org, created, "same"), self.entry(self.org, created, "same")]
+        AuditEntry.objects.bulk_create(entries)
+        self.expected = list(
+            AuditEntry.objects.filter(target="org", object_id=self.org.pk)
+            .order_by("-created", "-id").values_list("id", flat=True))
+
+    def entry(self, org, created, mark):
+        return AuditEntry(target="org", org=org, object_id=org.pk, action="updated",
+                          fields={"mark": mark}, created=created)
+
+    def archive(self):
+        # срок 60 дней от 15.06 — в БД остаются месяцы с апреля
+        return audit_archive.archive(days=60, batch_size=7, now=self.NOW)
+
+    def page_all(self, limit):
+        ids, cursor = [], None
+        while True:
+            rows, token = audit_archive.history("org", self.org.pk, limit=limit, cursor=cursor)
+            ids += [row["id"] for row in rows]
+            if token is None:
+                return ids
+            cursor = audit_archive.decode_cursor(token)
+
+    def test_archive_and_history_across_segments(self):
+        total = AuditEntry.objects.count()
+        result = self.archive()
+        cutoff = timezone.make_aware(datetime(2025, 4, 1))
+
+        self.assertFalse(AuditEntry.objects.filter(created__lt=cutoff).exists())
+        self.assertEqual(sum(r[1] for r in result), total - AuditEntry.objects.count())
+        self.assertEqual(
+            sorted(AuditArchive.objects.values_list("month", flat=True)),
+            [r[0] for r in result])
+        self.assertEqual(self.archive(), [])
+
+        for limit in (1, 3, 4, 50):
+            self.assertEqual(self.page_all(limit), self.expected, limit)
+
+    def test_interrupted_run_is_cleaned_up(self):
+        # сегмент записан, а удаление из БД не успело
+        march = datetime(2025, 3, 1).date()
+        segment = audit_archive._archive_month(march, batch_size=7)
+        self.assertEqual(self.page_all(4), self.expected)
+
+        result = self.archive()
+        self.assertIn((march, 0, segment.rows), result)
+        self.assertEqual(AuditArchive.objects.filter(month=march).count(), 1)
+        self.assertEqual(self.page_all(4), self.expected)